@@ -0,0 +1,898 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Clawdia Monet's GenAI agents, usable with or without Streamlit
+#
+
+import asyncio
+import functools
+import logging
+from typing import Callable, Optional, Union
+from PIL import Image
+from jinja2 import Template
+from google import genai
+from google.genai import types
+from pydantic import BaseModel
+from config import settings
+from governor import Governor
+from resilience import Resilience
+from router import ModelRouter
+from imaging import VariantCache
+from storage.artifacts import Artifact
+from storage.cache import ResultCache, image_digest, make_key
+from telemetry import span
+from streaming import StreamMetrics, collect_stream, collect_stream_async, partial_json_string
+
+
+# ========================
+# === Shared Resources ===
+# ========================
+
+@functools.cache
+def result_cache(name: str) -> ResultCache:
+    """
+    Shared result cache for an agent, one per process across all sessions.
+
+    :param name: Name of the cache, also used as its directory on disk
+    :return: ResultCache
+    """
+
+    return ResultCache(name=name,
+                       max_entries=settings.CACHE_MAX_ENTRIES,
+                       ttl_seconds=settings.CACHE_TTL_SECONDS,
+                       directory=settings.CACHE_DIR)
+
+
+@functools.cache
+def stream_metrics() -> StreamMetrics:
+    """
+    Shared time-to-first-chunk and total time of streamed agent calls.
+
+    :return: StreamMetrics
+    """
+
+    return StreamMetrics()
+
+
+@functools.cache
+def image_variants() -> VariantCache:
+    """
+    Shared cache of images encoded for each agent, one per process across all sessions.
+
+    :return: VariantCache
+    """
+
+    return VariantCache(tiers=settings.IMAGE_VARIANTS, max_entries=settings.IMAGE_VARIANTS_MAX_ENTRIES)
+
+
+@functools.cache
+def governor() -> Governor:
+    """
+    Shared rate limiter and concurrency governor for every model, one per process across all sessions.
+
+    :return: Governor
+    """
+
+    return Governor(limits=settings.MODEL_LIMITS, default=settings.MODEL_LIMIT_DEFAULT)
+
+
+@functools.cache
+def resilience() -> Resilience:
+    """
+    Shared retry and hedging policy for the agents, one per process across all sessions.
+
+    :return: Resilience
+    """
+
+    return Resilience(max_attempts=settings.RETRY_MAX_ATTEMPTS,
+                      base_delay=settings.RETRY_BASE_DELAY,
+                      max_delay=settings.RETRY_MAX_DELAY,
+                      deadline=settings.RETRY_DEADLINE_SECONDS,
+                      hedge_agents=settings.HEDGE_AGENTS,
+                      hedge_min_delay=settings.HEDGE_MIN_DELAY)
+
+
+@functools.cache
+def router() -> ModelRouter:
+    """
+    Shared model router with each agent's fallback chain, one per process across all sessions.
+
+    Model names in the routes may name a Settings field, e.g. "GEMINI_MODEL_LITE".
+
+    :return: ModelRouter
+    """
+
+    return ModelRouter(routes=settings.MODEL_ROUTES,
+                       resolve=lambda name: getattr(settings, name, name),
+                       window_seconds=settings.ROUTER_WINDOW_SECONDS,
+                       min_samples=settings.ROUTER_MIN_SAMPLES,
+                       max_error_rate=settings.ROUTER_MAX_ERROR_RATE)
+
+
+def _usage_tokens(_response: types.GenerateContentResponse) -> Optional[int]:
+    """
+    Total tokens used by a response, if the response reports it.
+
+    :param _response:
+    :return: Token count or None
+    """
+
+    if _response is not None and _response.usage_metadata is not None:
+        return _response.usage_metadata.total_token_count
+
+    return None
+
+
+def image_digest_of(_image: Union[Image, Artifact]) -> str:
+    """
+    Content digest of an image for the cache keys, read from an Artifact instead of hashing its pixels.
+
+    :param _image: A Pillow image or a storage.artifacts.Artifact
+    :return: The hex digest
+    """
+
+    return _image.digest if isinstance(_image, Artifact) else image_digest(_image)
+
+
+def image_part(_image: Union[Image, Artifact], tier: str, _digest: str = None) -> types.Part:
+    """
+    Encode an image once at the resolution, format and quality of an agent's tier.
+
+    :param _image: The image to send to the agent, a Pillow image or an Artifact
+    :param tier: Name of the tier, usually the agent's name
+    :param _digest: The image's digest if the caller already has it, so the pixels are not hashed again
+    :return: types.Part
+    """
+
+    if isinstance(_image, Artifact):
+        data, mime_type = image_variants().get_artifact(_image, tier=tier)
+    else:
+        data, mime_type = image_variants().get(_image, tier=tier, digest=_digest)
+
+    return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+
+# ===================
+# === Data Models ===
+# ===================
+
+class CatCheck(BaseModel):
+    is_cat: bool  # True or False
+    observation: str  # Your observations of the image
+
+
+# Bump when CatCheck or the cat check prompt changes so cached results are not reused
+CAT_CHECK_SCHEMA_VERSION = 1
+
+
+# ======================
+# === Agent Requests ===
+# ======================
+
+def _cat_check_request(_digest: str) -> tuple:
+    """
+    Model, config, prompt and cache key for the cat check.
+
+    :param _digest: Digest of the image, see image_digest_of
+    :return: (model, config, prompt, key)
+    """
+
+    _model = router().primary("cat_check")
+
+    _sys_inst = Template("""You are Clawdia Monet, an artist that draws and paints cats.
+    You have been commissioned to paint someone's adored cat or cats.
+    Your patron has given you an image of their cat or cats, you must wow them with your artistic nature.
+    
+    You are first checking their image for the presence of cats before you paint them.
+    
+    # Rules
+    
+    * I give you an image, you tell me if there's a cat in it.
+    * If there's a cat in the image, then you will be able to begin by sketching a picture from the image.
+    * If there is not a cat in the image, then the photo is no use to you, since you only paint cats.
+    * Send a short message to the patron about their image and what you'll do next.
+    * Be creative with your message.
+    * Comment about the appearance of their cat and say something you like about it.
+    * If there's no cat in the image, express disappointment in receiving a photo with no cats.
+
+    # Structured Response
+
+    Return a structure json response with the following attributes.
+
+    * 'is_cat': True if there is a cat False if no cat is present.
+
+    Example 1: True
+    Example 2: False
+
+    * 'observation': Brief message to the patron about your observations of their image.
+
+    Example 1: I couldn't find a cat in this image. I only paint cats.
+    Example 2: What cute cats! This will be a beautiful painting of a cat!
+    Example 3: Adorable kitten :-) I'll get started on a sketch first.
+    Example 4: This is an interesting photo, but I don't see any cats! Do you have any photos of cats?
+    Example 5: Your cat looks so sweet! 
+
+    """)
+
+    _config = types.GenerateContentConfig(system_instruction=_sys_inst.render(),
+                                          temperature=1.5,
+                                          top_p=0.95,
+                                          response_mime_type='application/json',
+                                          response_schema=CatCheck
+                                          )
+
+    _key = make_key(_digest, _model, CAT_CHECK_SCHEMA_VERSION, image_variants().spec("cat_check"))
+
+    return _model, _config, "Is there a cat in this image?", _key
+
+
+def _instruct_sketch_request(_digest: str) -> tuple:
+    """
+    Model, config, prompt and cache key for the sketch instructions.
+
+    :param _digest: Digest of the image, see image_digest_of
+    :return: (model, config, prompt, key)
+    """
+
+    _model = router().primary("instruct_sketch")
+
+    _sys_inst = Template("""You are an art instructor and excel at writing step-by-step instructions for artists to follow.
+
+    I give you an image, you must write detailed instructions for how to transform the image into a drawing.
+
+    # Rules
+
+    * Focus on instructing how to make a drawing from the image.
+    * Adhere to a traditional style of drawing.
+    * The draw should be done with pencil on brown paper.
+    * Be sure to describe the entire scene and background for the artist to draw.
+    * Instruct the artist to draw all of the details in the composition.
+    * Describe the cat's fur and markings so the artist can draw how the cat looks in real life.
+    * Return only the finished instructions for the artist.
+
+    """)
+
+    _prompt = "Write detailed step-by-step instructions for how to draw this image from observation."
+
+    _config = types.GenerateContentConfig(system_instruction=_sys_inst.render(),
+                                          temperature=0.3,
+                                          top_p=0.90,
+                                          response_modalities=['Text'],
+                                          )
+
+    _key = make_key(_digest, make_key(_config.system_instruction, _prompt),
+                    _model, _config.temperature, _config.top_p, image_variants().spec("instruct_sketch"))
+
+    return _model, _config, _prompt, _key
+
+
+def _instruct_artist_request(_digest: str, _sketch_digest: str) -> tuple:
+    """
+    Model, config, prompt and cache key for the painting instructions.
+
+    :param _digest: Digest of the image, see image_digest_of
+    :param _sketch_digest: Digest of the sketch
+    :return: (model, config, prompt, key)
+    """
+
+    _model = router().primary("instruct_artist")
+
+    _sys_inst = Template("""You are an artist's assistant and excel at writing instructions for the artist to follow.
+    You work for Clawdia Monet, an artist that draws and paints cats.
+    Clawdia has been commissioned to paint someone's adored cat or cats.
+    The patron has given Clawdia an image of their cat or cats, Clawdia must wow them with their artistic nature.
+
+    Before Clawdia begins painting, you must write detailed instructions for how to transform the image into a painting.
+    
+    Use the provided images of the cat as a reference.
+
+    # Rules
+
+    * I give you two images, the original image, and a sketch of the image.
+    * Focus on explaining how to turn the drawing into a painting.
+    * Choose an artistic style to adhere to.
+    * Instruct Clawdia to paint the cat(s) with such detail that the patron will be able to recognize their cat(s).
+    * Describe the cat's fur and markings so Clawdia can paint how the cat looks in real life.
+    * Be sure to describe the entire scene and background.
+    * Return the finished instructions for Clawdia Monet.
+
+    """)
+
+    _prompt = "Write detailed instructions for Clawdia Monet to make a painting from these images."
+
+    _config = types.GenerateContentConfig(system_instruction=_sys_inst.render(),
+                                          temperature=1.3,
+                                          top_p=0.95,
+                                          response_modalities=['Text'],
+                                          )
+
+    _key = make_key(_digest, _sketch_digest, make_key(_config.system_instruction, _prompt),
+                    _model, _config.temperature, _config.top_p, image_variants().spec("instruct_artist"))
+
+    return _model, _config, _prompt, _key
+
+
+def _cat_sketch_request(_instructions: str) -> tuple:
+    """
+    Model, config and prompt for the sketch.
+
+    :param _instructions:
+    :return: (model, config, prompt)
+    """
+
+    _prompt = Template("""You are Clawdia Monet, an artist that loves drawing cat-themed pictures.
+    You have been commissioned to make a new drawing, your patron has given you a photo to draw from.
+    
+    Observe this photo and generate a hand drawn image from it .
+    
+    # Rules
+    
+    * Be sure to draw the entire scene and background.
+    * Draw what you observe in the reference photo .
+    
+    # Response
+    
+    * Return the finished drawing.
+    * Send a short message to the patron along with your finished work, no more than a sentence.
+    
+    Example 1: Here is the initial sketch of your beautiful cat; I look forward to bringing this composition to life with paint.
+    Example 2: Here is the initial pencil sketch of your elegant white cat, set against the textured blanket, ready for the color to be added.
+    
+    # Instructions you must follow from your assistant
+    
+    {{instructions}}
+    
+    """)
+
+    _config = types.GenerateContentConfig(response_modalities=['Text', 'Image'],
+                                          temperature=0.6,
+                                          top_p=0.95)
+
+    return router().primary("cat_sketch"), _config, _prompt.render(instructions=_instructions)
+
+
+def _cat_paint_request(_instructions: str) -> tuple:
+    """
+    Model, config and prompt for the painting.
+
+    :param _instructions:
+    :return: (model, config, prompt)
+    """
+
+    _prompt = Template("""You are Clawdia Monet, an artist that draws and paints cats.
+    You have been commissioned to paint someone's adored cat(s).
+    Your patron has given you an image of their cat(s), you must wow them with your artistic nature.
+    
+    You just finished sketching out the cat(s) for your painting, so its time to paint!
+    Use this sketch of a cat(s) as a reference and turn it into a painting.
+    
+    # Rules
+    
+    * Paint a picture of the cat(s)!
+    * Be sure to paint the entire scene and background.
+    * Return the finished painting.
+    
+    # Response
+    
+    * Send a short message to the patron along with your finished work, no more than a sentence.
+    
+    Example 1: Here is the finished painting of your beautiful cat, I hope you adore it!
+    Example 2: I finished the painting of your cats enjoying a winter skate with many friends on a crisp, snowy day!
+    
+    # Instructions you must follow from your assistant
+    
+    {{instructions}}
+    
+    """)
+
+    _config = types.GenerateContentConfig(response_modalities=['Text', 'Image'],
+                                          temperature=0.6,
+                                          top_p=0.95)
+
+    return router().primary("cat_paint"), _config, _prompt.render(instructions=_instructions)
+
+
+def _observation_reader(_on_text: Callable[[str], None]) -> Callable[[str], None]:
+    """
+    Hands on the observation from a streamed, partial CatCheck JSON document.
+
+    :param _on_text: Called with the observation received so far
+    :return: Callback for the streamed JSON text
+    """
+
+    def _on_json(_text: str) -> None:
+        if _on_text is not None and (_observation := partial_json_string(_text, "observation")):
+            _on_text(_observation)
+
+    return _on_json
+
+
+# ===================
+# === Agent Calls ===
+# ===================
+
+class _AgentCall:
+    """
+    One agent request and how its response becomes the agent's result, the same for the sync and async agents.
+
+    A call answered from the result cache holds its result and is not sent.
+    """
+
+    def __init__(self,
+                 agent: str,
+                 config: types.GenerateContentConfig = None,
+                 contents: list = None,
+                 hedge: bool = False,
+                 chat: bool = False,
+                 on_text: Callable[[str], None] = None,
+                 finish: Callable = None,
+                 result=None):
+        self.agent = agent
+        self.config = config
+        self.contents = contents
+        self.hedge = hedge
+        self.chat = chat  # sent as a message in a new chat instead of a single request
+        self.on_text = on_text
+        self.finish = finish  # turns the response into the result, called off the event loop
+        self.result = result
+
+    @property
+    def answered(self) -> bool:
+        return self.finish is None
+
+
+def _cat_check_call(_image: Union[Image, Artifact], _on_text: Callable[[str], None] = None) -> _AgentCall:
+    """
+    Build the cat check, answered from the result cache if the image was checked before.
+
+    :param _image: The image, a Pillow image or an Artifact
+    :param _on_text: Called with the observation received so far when streaming
+    :return: _AgentCall
+    """
+
+    _digest = image_digest_of(_image)
+    _model, _config, _prompt, _key = _cat_check_request(_digest)
+    _cache = result_cache("cat_check")
+
+    if (_cached := _cache.get(_key)) is not None:
+        logging.info(f"Cat check cache hit {_cache.stats()}")
+        return _AgentCall("cat_check", result=CatCheck.model_validate_json(_cached))
+
+    def _finish(_response: types.GenerateContentResponse) -> BaseModel:
+        _parsed = CatCheck.model_validate_json(_response.text) if settings.STREAMING else _response.parsed
+        if _parsed is not None:
+            _cache.put(_key, _parsed.model_dump_json())
+            logging.info(f"Cat check cache miss {_cache.stats()}")
+        return _parsed
+
+    return _AgentCall("cat_check",
+                      config=_config,
+                      contents=[_prompt, image_part(_image, tier="cat_check", _digest=_digest)],
+                      hedge=not settings.STREAMING,
+                      on_text=_observation_reader(_on_text),
+                      finish=_finish)
+
+
+def _instructions_call(agent: str,
+                       _request: Callable,
+                       _images: list,
+                       _refresh: bool,
+                       _on_text: Callable[[str], None],
+                       _reuse_message: str,
+                       _error_message: str) -> _AgentCall:
+    """
+    Build a request for instructions, answered from the result cache when they may be reused.
+
+    :param agent: Name of the agent, also its result cache and image tier
+    :param _request: Builds the model, config, prompt and cache key from the digests of the images
+    :param _images: The images to send, Pillow images or Artifacts
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :param _reuse_message: Logged when cached instructions are reused
+    :param _error_message: Raised when the response has no text
+    :return: _AgentCall
+    """
+
+    _digests = [image_digest_of(_image) for _image in _images]
+    _model, _config, _prompt, _key = _request(*_digests)
+    _cache = result_cache(agent)
+
+    if settings.REUSE_INSTRUCTIONS and not _refresh and (_cached := _cache.get(_key)) is not None:
+        logging.info(f"{_reuse_message} {_cache.stats()}")
+        return _AgentCall(agent, result=_cached)
+
+    def _finish(_response: types.GenerateContentResponse) -> str:
+        if not _response.text:
+            raise Exception(_error_message)
+        _cache.put(_key, _response.text)
+        return _response.text
+
+    return _AgentCall(agent,
+                      config=_config,
+                      contents=[_prompt, *(image_part(_image, tier=agent, _digest=_digest)
+                                           for _image, _digest in zip(_images, _digests))],
+                      hedge=not settings.STREAMING,
+                      on_text=_on_text,
+                      finish=_finish)
+
+
+def _instruct_sketch_call(_image: Union[Image, Artifact],
+                          _refresh: bool = False,
+                          _on_text: Callable[[str], None] = None) -> _AgentCall:
+    """
+    Build the request for the sketch instructions.
+
+    :param _image: The image, a Pillow image or an Artifact
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :return: _AgentCall
+    """
+
+    return _instructions_call("instruct_sketch", _instruct_sketch_request, [_image], _refresh, _on_text,
+                              _reuse_message="Reusing cached sketch instructions",
+                              _error_message="Drawing instructions error")
+
+
+def _instruct_artist_call(_image: Union[Image, Artifact],
+                          _sketch: Union[Image, Artifact],
+                          _refresh: bool = False,
+                          _on_text: Callable[[str], None] = None) -> _AgentCall:
+    """
+    Build the request for the painting instructions.
+
+    :param _image: The image, a Pillow image or an Artifact
+    :param _sketch: The sketch of the image
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :return: _AgentCall
+    """
+
+    return _instructions_call("instruct_artist", _instruct_artist_request, [_image, _sketch], _refresh, _on_text,
+                              _reuse_message="Reusing cached painting instructions",
+                              _error_message="Painting instructions error")
+
+
+def _artwork_call(agent: str,
+                  _request: Callable,
+                  _instructions: str,
+                  _image: Union[Image, Artifact],
+                  _on_text: Callable[[str], None]) -> _AgentCall:
+    """
+    Build a request for a sketch or painting, sent as a chat message and never hedged.
+
+    :param agent: Name of the agent, also its image tier
+    :param _request: Builds the model, config and prompt from the instructions
+    :param _instructions: Instructions for the artist
+    :param _image: The image to work from, a Pillow image or an Artifact
+    :param _on_text: Called with the message received so far when streaming
+    :return: _AgentCall
+    """
+
+    _model, _config, _prompt = _request(_instructions)
+
+    return _AgentCall(agent,
+                      config=_config,
+                      contents=[_prompt, image_part(_image, tier=agent)],
+                      chat=True,
+                      on_text=_on_text,
+                      finish=lambda _response: _response)
+
+
+# =======================
+# === Agent Transport ===
+# =======================
+
+def _send(_client: genai.Client, _call: _AgentCall, _model: str, _config: types.GenerateContentConfig):
+    """
+    Send an agent call's request to one model, collecting the stream when streaming.
+
+    :param _client: The genai client
+    :param _call: The agent call
+    :param _model: The model to send it to
+    :param _config: The request config
+    :return: The response
+    """
+
+    if _call.chat:
+        _chat = _client.chats.create(model=_model, config=_config)
+        if not settings.STREAMING:
+            return _chat.send_message(message=_call.contents)
+        _chunks = _chat.send_message_stream(message=_call.contents)
+    else:
+        if not settings.STREAMING:
+            return _client.models.generate_content(model=_model, config=_config, contents=_call.contents)
+        _chunks = _client.models.generate_content_stream(model=_model, config=_config, contents=_call.contents)
+
+    return collect_stream(_chunks, agent=_call.agent, metrics=stream_metrics(), on_text=_call.on_text)
+
+
+async def _send_async(_client: genai.Client, _call: _AgentCall, _model: str, _config: types.GenerateContentConfig):
+    """
+    Async variant of _send on the client's asyncio API.
+
+    :param _client: The genai client
+    :param _call: The agent call
+    :param _model: The model to send it to
+    :param _config: The request config
+    :return: The response
+    """
+
+    if _call.chat:
+        _chat = _client.aio.chats.create(model=_model, config=_config)
+        if not settings.STREAMING:
+            return await _chat.send_message(message=_call.contents)
+        _chunks = await _chat.send_message_stream(message=_call.contents)
+    else:
+        if not settings.STREAMING:
+            return await _client.aio.models.generate_content(model=_model, config=_config, contents=_call.contents)
+        _chunks = await _client.aio.models.generate_content_stream(model=_model, config=_config,
+                                                                   contents=_call.contents)
+
+    return await collect_stream_async(_chunks, agent=_call.agent, metrics=stream_metrics(), on_text=_call.on_text)
+
+
+def _routed(_call: _AgentCall, _client: genai.Client):
+    """
+    Run an agent call on its model chain, retrying the last model and failing over between the others.
+
+    Each attempt holds a governor slot for its model and the call is timed in the agent's span.
+
+    :param _call: The agent call
+    :param _client: The genai client
+    :return: The agent's result
+    """
+
+    if _call.answered:
+        return _call.result
+
+    def _generate(_model: str, _config: types.GenerateContentConfig):
+        with governor().slot(_model) as _permit:
+            _response = _send(_client, _call, _model, _config)
+            _permit.used_tokens = _usage_tokens(_response)
+        return _response
+
+    _config = router().with_deadline(_call.agent, _call.config)
+
+    with span(_call.agent) as _span:
+        def _attempt(_model: str, _final: bool):
+            _span.set(model=_model)
+            return resilience().call(_call.agent,
+                                     functools.partial(_generate, _model, _config),
+                                     hedge=_call.hedge,
+                                     max_attempts=None if _final else 1)
+
+        _response = router().call(_call.agent, _attempt)
+        _span.usage(_response)
+
+    return _call.finish(_response)
+
+
+async def _routed_async(_call: _AgentCall, _client: genai.Client):
+    """
+    Async variant of _routed, the call's result is finished off the event loop.
+
+    :param _call: The agent call
+    :param _client: The genai client
+    :return: The agent's result
+    """
+
+    if _call.answered:
+        return _call.result
+
+    async def _generate(_model: str, _config: types.GenerateContentConfig):
+        async with governor().slot_async(_model) as _permit:
+            _response = await _send_async(_client, _call, _model, _config)
+            _permit.used_tokens = _usage_tokens(_response)
+        return _response
+
+    _config = router().with_deadline(_call.agent, _call.config)
+
+    with span(_call.agent) as _span:
+        async def _attempt(_model: str, _final: bool):
+            _span.set(model=_model)
+            return await resilience().call_async(_call.agent,
+                                                 functools.partial(_generate, _model, _config),
+                                                 hedge=_call.hedge,
+                                                 max_attempts=None if _final else 1)
+
+        _response = await router().call_async(_call.agent, _attempt)
+        _span.usage(_response)
+
+    return await asyncio.to_thread(_call.finish, _response)
+
+
+# ====================
+# === GenAI Agents ===
+# ====================
+
+def cat_check(_image: Union[Image, Artifact],
+              _client: genai.Client,
+              _on_text: Callable[[str], None] = None) -> BaseModel:
+    """
+    Check if there's a cat in the uploaded image.
+
+    Results are cached by image content, model and schema version, so the same
+    photo is only checked once.
+
+    :param _image:
+    :param _client: The genai client
+    :param _on_text: Called with the observation received so far when streaming
+    :return:
+    """
+
+    return _routed(_cat_check_call(_image, _on_text), _client)
+
+
+def instruct_sketch(_image: Union[Image, Artifact],
+                    _client: genai.Client,
+                    _refresh: bool = False,
+                    _on_text: Callable[[str], None] = None) -> str:
+    """
+    Write instructions for the artist to sketch the cat in the image.
+
+    Instructions are memoized by image, system instruction, model and sampling
+    parameters, so "Sketch Again" goes straight to the artist.
+
+    :param _image:
+    :param _client: The genai client
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :return:
+    """
+
+    return _routed(_instruct_sketch_call(_image, _refresh, _on_text), _client)
+
+
+def instruct_artist(_image: Union[Image, Artifact],
+                    _sketch: Union[Image, Artifact],
+                    _client: genai.Client,
+                    _refresh: bool = False,
+                    _on_text: Callable[[str], None] = None) -> str:
+    """
+    Write instructions for the artist to paint the cat in the image.
+
+    Instructions are memoized by both images, system instruction, model and
+    sampling parameters, so "Paint Again" goes straight to the artist.
+
+    :param _image:
+    :param _sketch:
+    :param _client: The genai client
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :return:
+    """
+
+    return _routed(_instruct_artist_call(_image, _sketch, _refresh, _on_text), _client)
+
+
+def cat_sketch(_instructions: str,
+               _image: Union[Image, Artifact],
+               _client: genai.Client,
+               _on_text: Callable[[str], None] = None) -> types.GenerateContentResponse:
+    """
+    Sketch the cat in the uploaded image.
+
+    :param _instructions:
+    :param _image:
+    :param _client: The genai client
+    :param _on_text: Called with the message received so far when streaming
+    :return:
+    """
+
+    return _routed(_artwork_call("cat_sketch", _cat_sketch_request, _instructions, _image, _on_text), _client)
+
+
+def cat_paint(_instructions: str,
+              _image: Union[Image, Artifact],
+              _client: genai.Client,
+              _on_text: Callable[[str], None] = None) -> types.GenerateContentResponse:
+    """
+    Paint the cat in the sketched image.
+
+    :param _instructions:
+    :param _image:
+    :param _client: The genai client
+    :param _on_text: Called with the message received so far when streaming
+    :return:
+    """
+
+    return _routed(_artwork_call("cat_paint", _cat_paint_request, _instructions, _image, _on_text), _client)
+
+
+# ==========================
+# === Async GenAI Agents ===
+# ==========================
+#
+# The calls are built off the event loop, since building them hashes and
+# encodes images and reads the result cache.
+
+async def cat_check_async(_image: Union[Image, Artifact],
+                          _client: genai.Client,
+                          _on_text: Callable[[str], None] = None) -> BaseModel:
+    """
+    Async variant of cat_check on the client's asyncio API.
+
+    :param _image:
+    :param _client: The genai client
+    :param _on_text: Called with the observation received so far when streaming
+    :return:
+    """
+
+    return await _routed_async(await asyncio.to_thread(_cat_check_call, _image, _on_text), _client)
+
+
+async def instruct_sketch_async(_image: Union[Image, Artifact],
+                                _client: genai.Client,
+                                _refresh: bool = False,
+                                _on_text: Callable[[str], None] = None) -> str:
+    """
+    Async variant of instruct_sketch on the client's asyncio API.
+
+    :param _image:
+    :param _client: The genai client
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :return:
+    """
+
+    return await _routed_async(await asyncio.to_thread(_instruct_sketch_call, _image, _refresh, _on_text), _client)
+
+
+async def instruct_artist_async(_image: Union[Image, Artifact],
+                                _sketch: Union[Image, Artifact],
+                                _client: genai.Client,
+                                _refresh: bool = False,
+                                _on_text: Callable[[str], None] = None) -> str:
+    """
+    Async variant of instruct_artist on the client's asyncio API.
+
+    :param _image:
+    :param _sketch:
+    :param _client: The genai client
+    :param _refresh: Ignore cached instructions and write new ones
+    :param _on_text: Called with the instructions received so far when streaming
+    :return:
+    """
+
+    _call = await asyncio.to_thread(_instruct_artist_call, _image, _sketch, _refresh, _on_text)
+
+    return await _routed_async(_call, _client)
+
+
+async def cat_sketch_async(_instructions: str,
+                           _image: Union[Image, Artifact],
+                           _client: genai.Client,
+                           _on_text: Callable[[str], None] = None) -> types.GenerateContentResponse:
+    """
+    Async variant of cat_sketch on the client's asyncio API.
+
+    :param _instructions:
+    :param _image:
+    :param _client: The genai client
+    :param _on_text: Called with the message received so far when streaming
+    :return:
+    """
+
+    _call = await asyncio.to_thread(_artwork_call, "cat_sketch", _cat_sketch_request, _instructions, _image, _on_text)
+
+    return await _routed_async(_call, _client)
+
+
+async def cat_paint_async(_instructions: str,
+                          _image: Union[Image, Artifact],
+                          _client: genai.Client,
+                          _on_text: Callable[[str], None] = None) -> types.GenerateContentResponse:
+    """
+    Async variant of cat_paint on the client's asyncio API.
+
+    :param _instructions:
+    :param _image:
+    :param _client: The genai client
+    :param _on_text: Called with the message received so far when streaming
+    :return:
+    """
+
+    _call = await asyncio.to_thread(_artwork_call, "cat_paint", _cat_paint_request, _instructions, _image, _on_text)
+
+    return await _routed_async(_call, _client)
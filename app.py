@@ -6,18 +6,28 @@
 #
 
 import streamlit as st
-from PIL import Image, ImageOps
-from io import BytesIO
-from image_utils.image_utils import rescale_width_height
-from jinja2 import Template
+from PIL import Image
+from imaging import VariantCache, decode_upload
 from google import genai
 from google.genai import types
 from google.genai import errors
-from pydantic import BaseModel
-from storage.db import submit_log
-from storage.gcs import upload_pil_image_to_gcs_and_get_url
+from agents import CatCheck, cat_check, instruct_sketch, instruct_artist, cat_sketch, cat_paint
+from agents import cat_check_async, instruct_sketch_async, instruct_artist_async, cat_sketch_async, cat_paint_async
+from event_loop import EventLoopThread
+from jobs import JobWorker
+from storage.clients import registry
+from storage.db import build_log, initialize_firebase_app, write_log
+from storage.uploads import UploadService
+from storage.export import export_artwork
+from storage.artifacts import Artifact, artifact_store, footprint
+from storage.duplicates import DuplicateIndex, dhash
+from storage.commissions import CommissionStore, new_token, open_commission_store
+from prefetch import Prefetch, Prefetcher
+from prescreen import PreScreen, load_classifier
+from telemetry import span, telemetry
+from typing import Callable, Optional
 from config import settings
-import uuid
+import hashlib
 import os
 from dotenv import load_dotenv
 import logging
@@ -51,6 +61,9 @@ footer_html = """<div style='text-align: center;'>
 
 footer = st.markdown(footer_html, unsafe_allow_html=True)
 
+# Query parameter that names a commission to resume
+COMMISSION_PARAM = "commission"
+
 
 # ========================
 # === Helper Functions ===
@@ -95,340 +108,565 @@ def api_config():
         st.stop()
 
 
-def process_message(_part: types.Part) -> None:
+@st.cache_resource(show_spinner=False)
+def metrics_server():
     """
-    Add content parts to the chat and display them.
+    Serve the Prometheus-style metrics endpoint, once per process, when a port is configured.
 
-    :param _part: Message to add to the chat
+    :return: The metrics server, or None
+    """
+
+    if not settings.METRICS_PORT:
+        return None
+
+    return telemetry.serve(port=settings.METRICS_PORT)
+
+
+@st.cache_resource(show_spinner=False)
+def warm_up_clients():
+    """
+    Create the cloud clients once per process, in the background unless LAZY_STARTUP is off.
+
+    :return: The warm-up thread
+    """
+
+    thread = registry.warm_up(bucket_name=settings.GCS_BUCKET_NAME,
+                              project_id=settings.GCP_PROJECT_ID,
+                              app_factory=lambda: initialize_firebase_app(name='app'))
+    if not settings.LAZY_STARTUP:
+        thread.join()
+
+    return thread
+
+
+@st.cache_resource(show_spinner=False)
+def prescreener() -> PreScreen:
+    """
+    Shared CPU pre-screen for uploads, one per process across all sessions.
+
+    :return: PreScreen
+    """
+
+    return PreScreen(thresholds=settings.PRESCREEN_CHECKS,
+                     classifier=load_classifier(settings.PRESCREEN_ONNX_MODEL, classes=settings.PRESCREEN_ONNX_CLASSES),
+                     min_score=settings.PRESCREEN_ONNX_MIN_SCORE)
+
+
+@st.cache_resource(show_spinner=False)
+def upload_service() -> UploadService:
+    """
+    Shared background upload service, one per process across all sessions.
+
+    :return: UploadService
+    """
+
+    return UploadService(max_workers=settings.UPLOAD_WORKERS,
+                         max_pending=settings.UPLOAD_QUEUE_SIZE,
+                         submit_timeout=settings.UPLOAD_SUBMIT_TIMEOUT)
+
+
+def upload_artwork(_image: Image, workflow_status: str, _on_exported: Callable[[dict], None] = None) -> None:
+    """
+    Export artwork derivatives to cloud storage in the background and log the event once they are uploaded.
+
+    :param _image: The artwork to upload
+    :param workflow_status: Workflow status for the log
+    :param _on_exported: Called from the upload thread with the derivative urls once the export succeeds
     :return: None
     """
 
-    assert 'messages' in st.session_state, "Cannot find messages in the session state."
+    # collect the log on the script thread, the export fills in the artwork urls
+    log_data = build_log(workflow_status=workflow_status)
+    log_data["artwork_image_url"] = None
+    log_data["artwork_urls"] = {}
 
-    _content = []
+    def _on_uploaded(_future):
+        try:
+            log_data["artwork_urls"] = _future.result()
+            log_data["artwork_image_url"] = log_data["artwork_urls"].get(settings.ARTWORK_PRIMARY)
+        except Exception:
+            logging.error(f"An error occurred while attempting to upload the {workflow_status} to cloud storage.")
+        else:
+            if _on_exported is not None:
+                try:
+                    _on_exported(log_data["artwork_urls"])
+                except Exception as e:
+                    logging.error(f"An error occurred while recording the exported {workflow_status}: {e}")
+        write_log(log_data=log_data)
 
-    if _part.text is not None:
-        _content.append(_part.text)
-    if _part.executable_code is not None:
-        _content.append(_part.executable_code.code)
-    if _part.code_execution_result is not None:
-        _content.append(_part.code_execution_result.output)
-    if _part.inline_data is not None:
-        img = Image.open(BytesIO(_part.inline_data.data))
-        _content.append(img)
+    try:
+        future = export_artwork(upload_service(),
+                                image=_image,
+                                derivatives=settings.ARTWORK_DERIVATIVES,
+                                bucket_name=settings.GCS_BUCKET_NAME,
+                                project_id=settings.GCP_PROJECT_ID)
+    except Exception:
+        logging.error(f"An error occurred while attempting to queue the {workflow_status} upload.")
+        write_log(log_data=log_data)
+        return
+
+    future.add_done_callback(_on_uploaded)
+    st.session_state.artwork_upload = future
+
+    return
 
-    for c in _content:
-        # add the message to the chat
-        st.session_state.messages.append({"role": "assistant", "content": c})
-        # display the message in the chat
-        st.chat_message("assistant").write(c)
+
+def collect_artwork_upload() -> None:
+    """
+    Store the urls of a finished background export in the session state.
+
+    :return: None
+    """
+
+    if (future := st.session_state.get('artwork_upload')) is not None and future.done():
+        st.session_state.pop('artwork_upload')
+        if future.exception() is None:
+            st.session_state.artwork_urls = future.result()
+            st.session_state.artwork_image_url = st.session_state.artwork_urls.get(settings.ARTWORK_PRIMARY)
 
     return
 
 
-def clear_drawing():
+@st.cache_resource(show_spinner=False)
+def duplicate_index() -> DuplicateIndex:
     """
-    Clear the drawing from the session state
+    Shared perceptual-hash index of earlier photos and their artwork, one per process across all sessions.
 
-    :return:
+    :return: DuplicateIndex
     """
 
-    st.session_state.pop('drawing', None)
+    return DuplicateIndex(path=settings.DUPLICATE_INDEX_PATH, max_distance=settings.DUPLICATE_MAX_DISTANCE)
 
 
-def clear_painting():
+def link_artwork(kind: str, instructions: str = None) -> Optional[Callable[[dict], None]]:
     """
-    Clear the painting from the session state
+    Make a callback that links exported artwork to the session's photo in the near-duplicate index.
 
-    :return:
+    :param kind: "sketch" or "painting"
+    :param instructions: The instructions the artwork was made from
+    :return: The callback for upload_artwork, or None when the photo was not hashed
     """
 
-    st.session_state.pop('painting', None)
+    if (photo_hash := st.session_state.get('photo_hash')) is None:
+        return None
 
+    # resolve the shared index on the script thread, the callback runs on an upload thread
+    index = duplicate_index()
 
-def clear_session():
+    def _link(urls: dict) -> None:
+        index.link(photo_hash, **{f"{kind}_urls": urls, f"{kind}_instructions": instructions})
+
+    return _link
+
+
+@st.cache_resource(show_spinner=False)
+def prefetcher() -> Prefetcher:
     """
-    Clear the session and start over.
+    Shared thread pool for agent calls started ahead of time, one per process across all sessions.
 
-    :return:
+    :return: Prefetcher
     """
 
-    st.session_state.pop('upload', None)
-    st.session_state.pop('image', None)
-    st.session_state.pop('is_cat', None)
-    st.session_state.pop('drawing', None)
+    return Prefetcher(max_workers=settings.PREFETCH_WORKERS)
+
 
+def start_prefetch(name: str, agent: Callable, agent_async: Callable, **kwargs) -> Prefetch:
+    """
+    Start an agent call ahead of time, as a coroutine on the shared event loop when async agents are enabled.
 
-# ===================
-# === Data Models ===
-# ===================
+    :param name: Name of the agent, used for the counters
+    :param agent: The agent function
+    :param agent_async: The async variant of the agent
+    :param kwargs: Keyword arguments for the agent
+    :return: Prefetch
+    """
 
-class CatCheck(BaseModel):
-    is_cat: bool  # True or False
-    observation: str  # Your observations of the image
+    if settings.ASYNC_AGENTS:
+        return prefetcher().adopt(name, event_loop().submit(agent_async(**kwargs)))
 
+    return prefetcher().submit(name, agent, **kwargs)
 
-# ====================
-# === GenAI Agents ===
-# ====================
 
-def cat_check(_image: Image) -> BaseModel:
+def discard_prefetch(key: str) -> None:
     """
-    Check if there's a cat in the uploaded image.
+    Discard a prefetched agent call kept in the session state.
 
-    :param _image:
-    :return:
+    :param key: Session state key of the Prefetch handle
+    :return: None
+    """
+
+    if (prefetch := st.session_state.pop(key, None)) is not None:
+        prefetcher().discard(prefetch)
+
+    return
+
+
+@st.cache_resource(show_spinner=False)
+def event_loop() -> EventLoopThread:
+    """
+    Shared asyncio event loop for the async agents, one per process across all sessions.
+
+    :return: EventLoopThread
+    """
+
+    return EventLoopThread()
+
+
+def run_agent(agent: Callable, agent_async: Callable, **kwargs):
+    """
+    Run an agent, on the shared event loop when async agents are enabled.
+
+    :param agent: The agent function
+    :param agent_async: The async variant of the agent
+    :param kwargs: Keyword arguments for the agent
+    :return: The agent's result
+    """
+
+    if settings.ASYNC_AGENTS:
+        return event_loop().call(agent_async, **kwargs)
+
+    return agent(**kwargs)
+
+
+@st.cache_resource(show_spinner=False)
+def commission_store() -> Optional[CommissionStore]:
     """
+    Shared store of commission checkpoints, one per process across all sessions.
 
-    _sys_inst = Template("""You are Clawdia Monet, an artist that draws and paints cats.
-    You have been commissioned to paint someone's adored cat or cats.
-    Your patron has given you an image of their cat or cats, you must wow them with your artistic nature.
-    
-    You are first checking their image for the presence of cats before you paint them.
-    
-    # Rules
-    
-    * I give you an image, you tell me if there's a cat in it.
-    * If there's a cat in the image, then you will be able to begin by sketching a picture from the image.
-    * If there is not a cat in the image, then the photo is no use to you, since you only paint cats.
-    * Send a short message to the patron about their image and what you'll do next.
-    * Be creative with your message.
-    * Comment about the appearance of their cat and say something you like about it.
-    * If there's no cat in the image, express disappointment in receiving a photo with no cats.
+    :return: CommissionStore, or None when checkpoints are disabled
+    """
 
-    # Structured Response
+    if (store := open_commission_store(settings.COMMISSION_STORE)) is not None:
+        try:
+            if removed := store.sweep(max_age_seconds=settings.COMMISSION_TTL_SECONDS):
+                logging.info(f"Removed {removed} expired commissions")
+        except Exception as e:
+            logging.warning(f"Failed to remove expired commissions: {e}")
 
-    Return a structure json response with the following attributes.
+    return store
 
-    * 'is_cat': True if there is a cat False if no cat is present.
 
-    Example 1: True
-    Example 2: False
+def checkpoint(stage: str) -> None:
+    """
+    Save a finished stage of the commission, so a reload of the page resumes from it.
 
-    * 'observation': Brief message to the patron about your observations of their image.
+    The first checkpoint names the commission with a token in the page url.
 
-    Example 1: I couldn't find a cat in this image. I only paint cats.
-    Example 2: What cute cats! This will be a beautiful painting of a cat!
-    Example 3: Adorable kitten :-) I'll get started on a sketch first.
-    Example 4: This is an interesting photo, but I don't see any cats! Do you have any photos of cats?
-    Example 5: Your cat looks so sweet! 
+    :param stage: Session state key of the stage, "image", "is_cat", "drawing" or "painting"
+    :return: None
+    """
 
-    """)
+    if (store := commission_store()) is None:
+        return
+
+    if (token := st.session_state.get('commission')) is None:
+        token = st.session_state.commission = new_token()
+        st.query_params[COMMISSION_PARAM] = token
+
+    value = st.session_state[stage]
+    if isinstance(value, Artifact):
+        data, metadata = value.data, {"mime_type": value.mime_type}
+    else:
+        data, metadata = value.model_dump_json().encode("utf-8"), {}
 
-    _config = types.GenerateContentConfig(system_instruction=_sys_inst.render(),
-                                          temperature=1.5,
-                                          top_p=0.95,
-                                          response_mime_type='application/json',
-                                          response_schema=CatCheck
-                                          )
     try:
-        _response = st.session_state.client.models.generate_content(model="gemini-2.0-flash",  # "gemini-2.0-flash-lite"
-                                                                    config=_config,
-                                                                    contents=["Is there a cat in this image?", _image])
-    except errors.APIError as ae:
-        raise ae
+        with span("checkpoint", checkpoint_stage=stage, bytes=len(data)):
+            store.save(token, stage, data, metadata)
+    except Exception as e:
+        logging.error(f"Failed to checkpoint the {stage} of commission {token}: {e}")
 
-    return _response.parsed
+    return
 
 
-def instruct_sketch(_image: Image) -> str:
+def resume_commission() -> None:
     """
-    Write instructions for the artist to sketch the cat in the image.
+    Restore the finished stages of the commission named in the page url, once per session.
 
-    :param _image:
-    :return:
+    :return: None
     """
 
-    _sys_inst = Template("""You are an art instructor and excel at writing step-by-step instructions for artists to follow.
+    if 'commission' in st.session_state:
+        return
 
-    I give you an image, you must write detailed instructions for how to transform the image into a drawing.
+    st.session_state.commission = None
+    if (store := commission_store()) is None or (token := st.query_params.get(COMMISSION_PARAM)) is None:
+        return
 
-    # Rules
+    try:
+        checkpoints = store.load(token)
+    except Exception as e:
+        logging.error(f"Failed to load commission {token}: {e}")
+        checkpoints = {}
+
+    if 'image' not in checkpoints:
+        # unknown or expired, start a new commission
+        st.query_params.pop(COMMISSION_PARAM, None)
+        return
+
+    st.session_state.commission = token
+    for stage in ('image', 'drawing', 'painting'):
+        if stage in checkpoints:
+            st.session_state[stage] = artifact_store.put_bytes(checkpoints[stage].data,
+                                                               checkpoints[stage].metadata.get("mime_type"))
+    if 'is_cat' in checkpoints:
+        st.session_state.is_cat = CatCheck.model_validate_json(checkpoints['is_cat'].data)
+    # a resumed sketch waits for the patron to choose to paint it
+    if 'drawing' in st.session_state and 'painting' not in st.session_state:
+        st.session_state.review_sketch = True
+
+    logging.info(f"Resumed commission {token} with {list(checkpoints)}")
 
-    * Focus on instructing how to make a drawing from the image.
-    * Adhere to a traditional style of drawing.
-    * The draw should be done with pencil on brown paper.
-    * Be sure to describe the entire scene and background for the artist to draw.
-    * Instruct the artist to draw all of the details in the composition.
-    * Describe the cat's fur and markings so the artist can draw how the cat looks in real life.
-    * Return only the finished instructions for the artist.
+    return
 
-    """)
 
-    _prompt = "Write detailed step-by-step instructions for how to draw this image from observation."
+def discard_checkpoints(stages: list[str] = None) -> None:
+    """
+    Delete checkpoints of the session's commission, all of them and its url token when stages is None.
 
-    _config = types.GenerateContentConfig(system_instruction=_sys_inst.render(),
-                                          temperature=0.3,
-                                          top_p=0.90,
-                                          response_modalities=['Text'],
-                                          )
+    :param stages: Stages to delete
+    :return: None
+    """
+
+    if (store := commission_store()) is None or (token := st.session_state.get('commission')) is None:
+        return
 
     try:
-        _response = st.session_state.client.models.generate_content(model="gemini-2.0-flash",
-                                                                    config=_config,
-                                                                    contents=[_prompt, _image])
-    except errors.APIError as ae:
-        raise ae
+        store.discard(token, stages)
+    except Exception as e:
+        logging.error(f"Failed to discard checkpoints of commission {token}: {e}")
 
-    if not _response.text:
-        raise Exception("Drawing instructions error")
+    if stages is None:
+        st.session_state.commission = None
+        st.query_params.pop(COMMISSION_PARAM, None)
 
-    return _response.text
+    return
 
 
-def instruct_artist(_image: Image, _sketch: Image) -> str:
+@st.cache_resource(show_spinner=False)
+def job_worker() -> JobWorker:
     """
-    Write instructions for the artist to paint the cat in the image.
+    Shared worker pool for image generations, one per process across all sessions.
 
-    :param _image:
-    :param _sketch:
-    :return:
+    :return: JobWorker
     """
 
-    _sys_inst = Template("""You are an artist's assistant and excel at writing instructions for the artist to follow.
-    You work for Clawdia Monet, an artist that draws and paints cats.
-    Clawdia has been commissioned to paint someone's adored cat or cats.
-    The patron has given Clawdia an image of their cat or cats, Clawdia must wow them with their artistic nature.
+    return JobWorker(max_workers=settings.JOB_WORKERS, result_ttl=settings.JOB_RESULT_TTL_SECONDS)
 
-    Before Clawdia begins painting, you must write detailed instructions for how to transform the image into a painting.
-    
-    Use the provided images of the cat as a reference.
 
-    # Rules
+def job_key(name: str, _image: Artifact, instructions: str) -> str:
+    """
+    Identify a generation by its agent and inputs, so the same work is never started twice at once.
 
-    * I give you two images, the original image, and a sketch of the image.
-    * Focus on explaining how to turn the drawing into a painting.
-    * Choose an artistic style to adhere to.
-    * Instruct Clawdia to paint the cat(s) with such detail that the patron will be able to recognize their cat(s).
-    * Describe the cat's fur and markings so Clawdia can paint how the cat looks in real life.
-    * Be sure to describe the entire scene and background.
-    * Return the finished instructions for Clawdia Monet.
+    :param name: Name of the agent
+    :param _image: The image the agent works from
+    :param instructions: The instructions the agent follows
+    :return: The job key
+    """
 
-    """)
+    return f"{name}:{_image.digest}:{hashlib.sha256(instructions.encode('utf-8')).hexdigest()[:16]}"
 
-    _prompt = "Write detailed instructions for Clawdia Monet to make a painting from these images."
 
-    _config = types.GenerateContentConfig(system_instruction=_sys_inst.render(),
-                                          temperature=1.3,
-                                          top_p=0.95,
-                                          response_modalities=['Text'],
-                                          )
+def run_job(state_key: str, name: str, agent: Callable, agent_async: Callable, key: str = None,
+            _on_text: Callable[[str], None] = None, **kwargs):
+    """
+    Run an agent as a background job and wait for it, attaching to the session's job when a rerun interrupted it.
+
+    The job keeps running when the script run is stopped, and its id stays in the session state until the result
+    is collected, so the next run picks up the same generation instead of paying for another one.
+
+    :param state_key: Session state key of the job id
+    :param name: Name of the agent, used for the counters
+    :param agent: The agent function
+    :param agent_async: The async variant of the agent
+    :param key: Identifies the work, see job_key
+    :param _on_text: Called with the text streamed so far
+    :param kwargs: Keyword arguments for the agent
+    :return: The agent's result
+    """
 
-    try:
-        _response = st.session_state.client.models.generate_content(model="gemini-2.0-flash",
-                                                                    config=_config,
-                                                                    contents=[_prompt, _image, _sketch])
-    except errors.APIError as ae:
-        raise ae
+    worker = job_worker()
+    # touching the page between polls lets Streamlit stop this run for a rerun, the job carries on
+    pulse = st.empty()
+    text = None
+
+    while True:
+        if (job := worker.get(st.session_state.get(state_key))) is None or job.status == "cancelled":
+            if settings.ASYNC_AGENTS:
+                job = worker.submit(name, event_loop().call, agent_async, key=key, **kwargs)
+            else:
+                job = worker.submit(name, agent, key=key, **kwargs)
+            st.session_state[state_key] = job.id
+        else:
+            logging.info(f"Attaching to {name} job {job.id} ({job.status})")
+
+        while not job.wait(timeout=settings.JOB_POLL_SECONDS):
+            if _on_text is not None and job.text is not None and job.text != text:
+                text = job.text
+                _on_text(text)
+            else:
+                pulse.empty()
+
+        if job.status != "cancelled":
+            break
+        # cancelled before it started, the work is still wanted so submit it again
+        logging.info(f"{name} job {job.id} was cancelled, submitting it again")
+        worker.discard(st.session_state.pop(state_key, None))
 
-    if not _response.text:
-        raise Exception("Painting instructions error")
+    if _on_text is not None and job.text is not None and job.text != text:
+        _on_text(job.text)
 
-    return _response.text
+    st.session_state.pop(state_key, None)
 
+    return worker.collect(job)
 
-def cat_sketch(_instructions: str, _image: Image) -> types.GenerateContentResponse:
+
+def discard_job(state_key: str) -> None:
     """
-    Sketch the cat in the uploaded image.
+    Discard a background job kept in the session state.
+
+    :param state_key: Session state key of the job id
+    :return: None
+    """
+
+    if (job_id := st.session_state.pop(state_key, None)) is not None:
+        job_worker().discard(job_id)
+
+    return
+
+
+@st.cache_resource(show_spinner=False)
+def display_variants() -> VariantCache:
+    """
+    Shared cache of images encoded for the browser, one per process across all sessions.
+
+    :return: VariantCache
+    """
+
+    return VariantCache(tiers=settings.DISPLAY_VARIANTS, max_entries=settings.DISPLAY_VARIANTS_MAX_ENTRIES)
+
+
+def show_image(container, artifact: Artifact) -> None:
+    """
+    Display an artifact with bytes encoded once for the browser, so reruns send the same bytes again.
+
+    :param container: Streamlit container or placeholder to show the image in
+    :param artifact: The image to show
+    :return: None
+    """
+
+    data, _ = display_variants().get_artifact(artifact, tier="display")
+    container.image(data)
+
+    return
+
+
+def process_message(_part: types.Part) -> None:
+    """
+    Add content parts to the chat and display them.
+
+    :param _part: Message to add to the chat
+    :return: None
+    """
+
+    assert 'messages' in st.session_state, "Cannot find messages in the session state."
+
+    _content = []
+
+    if _part.text is not None:
+        _content.append(_part.text)
+    if _part.executable_code is not None:
+        _content.append(_part.executable_code.code)
+    if _part.code_execution_result is not None:
+        _content.append(_part.code_execution_result.output)
+    if _part.inline_data is not None:
+        # keep the image compressed in the chat history
+        img = artifact_store.put_bytes(_part.inline_data.data, _part.inline_data.mime_type)
+        _content.append(img)
+
+    for c in _content:
+        # add the message to the chat
+        st.session_state.messages.append({"role": "assistant", "content": c})
+        # display the message in the chat
+        if isinstance(c, Artifact):
+            show_image(st.chat_message("assistant"), c)
+        else:
+            st.chat_message("assistant").write(c)
+
+    return
+
+
+def clear_drawing():
+    """
+    Clear the drawing from the session state
 
-    :param _instructions:
-    :param _image:
     :return:
     """
 
-    _prompt = Template("""You are Clawdia Monet, an artist that loves drawing cat-themed pictures.
-    You have been commissioned to make a new drawing, your patron has given you a photo to draw from.
-    
-    Observe this photo and generate a hand drawn image from it .
-    
-    # Rules
-    
-    * Be sure to draw the entire scene and background.
-    * Draw what you observe in the reference photo .
-    
-    # Response
-    
-    * Return the finished drawing.
-    * Send a short message to the patron along with your finished work, no more than a sentence.
-    
-    Example 1: Here is the initial sketch of your beautiful cat; I look forward to bringing this composition to life with paint.
-    Example 2: Here is the initial pencil sketch of your elegant white cat, set against the textured blanket, ready for the color to be added.
-    
-    # Instructions you must follow from your assistant
-    
-    {{instructions}}
-    
-    """)
-
-    _config = types.GenerateContentConfig(response_modalities=['Text', 'Image'],
-                                          temperature=0.6,
-                                          top_p=0.95)
-
-    _chat = st.session_state.client.chats.create(
-        model=settings.GEMINI_MODEL_EXP_IMG_GEN,
-        config=_config
-    )
+    discard_prefetch('painting_instructions')
+    discard_job('sketch_job')
+    discard_checkpoints(['drawing', 'painting'])
+    st.session_state.pop('drawing', None)
 
-    try:
-        _response = _chat.send_message(message=[_prompt.render(instructions=_instructions), _image])
 
-    except errors.APIError as ae:
-        raise ae
+def clear_painting():
+    """
+    Clear the painting from the session state
 
-    return _response
+    :return:
+    """
 
+    discard_job('paint_job')
+    discard_checkpoints(['painting'])
+    st.session_state.pop('painting', None)
 
-def cat_paint(_instructions: str, _image: Image) -> types.GenerateContentResponse:
+
+def reuse_artwork():
     """
-    Paint the cat in the sketched image.
+    Show the artwork of the earlier photo instead of making new artwork
 
-    :param _instructions:
-    :param _image:
     :return:
     """
 
-    _prompt = Template("""You are Clawdia Monet, an artist that draws and paints cats.
-    You have been commissioned to paint someone's adored cat(s).
-    Your patron has given you an image of their cat(s), you must wow them with your artistic nature.
-    
-    You just finished sketching out the cat(s) for your painting, so its time to paint!
-    Use this sketch of a cat(s) as a reference and turn it into a painting.
-    
-    # Rules
-    
-    * Paint a picture of the cat(s)!
-    * Be sure to paint the entire scene and background.
-    * Return the finished painting.
-    
-    # Response
-    
-    * Send a short message to the patron along with your finished work, no more than a sentence.
-    
-    Example 1: Here is the finished painting of your beautiful cat, I hope you adore it!
-    Example 2: I finished the painting of your cats enjoying a winter skate with many friends on a crisp, snowy day!
-    
-    # Instructions you must follow from your assistant
-    
-    {{instructions}}
-    
-    """)
-
-    _config = types.GenerateContentConfig(response_modalities=['Text', 'Image'],
-                                          temperature=0.6,
-                                          top_p=0.95)
-
-    _chat = st.session_state.client.chats.create(
-        model=settings.GEMINI_MODEL_EXP_IMG_GEN,  # gemini-2.0-flash-preview-image-generation",
-        config=_config
-    )
+    st.session_state.reuse_artwork = True
+    log_data = build_log(workflow_status="reused")
+    log_data["artwork_urls"] = st.session_state.duplicate.get("painting_urls") or \
+        st.session_state.duplicate.get("sketch_urls")
+    log_data["artwork_image_url"] = log_data["artwork_urls"].get(settings.ARTWORK_PRIMARY)
+    write_log(log_data=log_data)
 
-    try:
-        _response = _chat.send_message(message=[_prompt.render(instructions=_instructions), _image])
 
-    except errors.APIError as ae:
-        raise ae
+def skip_artwork():
+    """
+    Make new artwork even though the photo was painted before
 
-    return _response
+    :return:
+    """
+
+    st.session_state.reuse_artwork = False
+
+
+def clear_session():
+    """
+    Clear the session and start over.
+
+    :return:
+    """
+
+    discard_prefetch('sketch_instructions')
+    discard_prefetch('painting_instructions')
+    discard_job('sketch_job')
+    discard_job('paint_job')
+    discard_checkpoints()
+    st.session_state.pop('upload', None)
+    st.session_state.pop('image', None)
+    st.session_state.pop('screen', None)
+    st.session_state.pop('photo_hash', None)
+    st.session_state.pop('duplicate', None)
+    st.session_state.pop('reuse_artwork', None)
+    st.session_state.pop('is_cat', None)
+    st.session_state.pop('drawing', None)
+    st.session_state.pop('painting', None)
+    st.session_state.pop('review_sketch', None)
 
 
 # =====================
@@ -438,6 +676,10 @@ def cat_paint(_instructions: str, _image: Image) -> types.GenerateContentRespons
 if 'client' not in st.session_state:
     api_config()
 
+# Start the metrics endpoint and the cloud clients with the first session
+metrics_server()
+warm_up_clients()
+
 
 # =====================
 # === Streamlit App ===
@@ -450,9 +692,13 @@ def open_image_workflow():
     """
 
     if 'file' in st.session_state and st.session_state.file.type in ('image/jpeg', 'image/png'):
-        # try to open the uploaded file as an image with Pillow
+        # try to open the uploaded file as an image with Pillow, decoding it at reduced resolution
         try:
-            image = ImageOps.exif_transpose(Image.open(st.session_state.file))
+            with span("decode", file_type=st.session_state.file.type):
+                image = decode_upload(st.session_state.file, size=1024, max_pixels=settings.MAX_UPLOAD_PIXELS)
+        except Image.DecompressionBombError:
+            logging.warning(f"Error: Image is too large {st.session_state.file.name}")
+            st.warning(f"Error: Image is too large {st.session_state.file.name}")
         except FileNotFoundError:
             logging.warning(f"Error: Image file not found {st.session_state.file.name}")
             st.warning(f"Error: Image file not found {st.session_state.file.name}")
@@ -467,15 +713,8 @@ def open_image_workflow():
             st.warning("Error: Invalid mode or file path.")
         # add the open image to the chat, display it, and append it to our list of prompt content
         else:
-            # Resize the image if its max length exceeds allowed size
-            if max(image.size) > 1024:
-                # Retrieve the image's original dimensions
-                w, h = image.size
-                # Rescale the image's dimensions where size is the longest edge
-                rw, rh = rescale_width_height(width=w, height=h, size=1024)
-                # Resize the image with new dimensions
-                image = image.resize((rw, rh), Image.Resampling.BICUBIC)
-            st.session_state['image'] = image
+            st.session_state['image'] = artifact_store.put_image(image)
+            checkpoint('image')
 
     return
 
@@ -502,6 +741,74 @@ def upload_workflow():
         return st.rerun()
 
 
+def prescreen_workflow():
+    """
+    Workflow for rejecting unusable photos on the CPU before asking Gemini about them.
+
+    :return:
+    """
+
+    if not settings.PRESCREEN:
+        return
+
+    if 'screen' not in st.session_state:
+        logging.info("Pre-screening the image...")
+        with span("prescreen") as _span:
+            st.session_state.screen = prescreener().screen(st.session_state.image.image())
+            _span.set(passed=st.session_state.screen.passed, **st.session_state.screen.metrics)
+
+    if st.session_state.screen.passed:
+        return
+
+    show_image(body, st.session_state.image)
+    banner.warning(st.session_state.screen.message)
+    buttons.button("Start Over", on_click=clear_session)
+
+    return st.stop()
+
+
+def duplicate_workflow():
+    """
+    Workflow for offering the artwork already made from a near-duplicate of the photo.
+
+    :return:
+    """
+
+    if not settings.DUPLICATES:
+        return
+
+    if 'duplicate' not in st.session_state:
+        with span("duplicate_lookup") as _span:
+            st.session_state.photo_hash = dhash(st.session_state.image.image())
+            st.session_state.duplicate = duplicate_index().lookup(st.session_state.photo_hash)
+            _span.set(found=st.session_state.duplicate is not None)
+        if st.session_state.duplicate is not None:
+            logging.info(f"Photo is a near-duplicate of {st.session_state.duplicate['hash']} "
+                         f"(distance {st.session_state.duplicate['distance']}) {duplicate_index().stats()}")
+
+    match = st.session_state.duplicate
+    if match is None or st.session_state.get('reuse_artwork') is False:
+        return
+    if not (urls := match.get("painting_urls") or match.get("sketch_urls")):
+        return
+
+    body.image(urls.get("display") or urls.get(settings.ARTWORK_PRIMARY) or next(iter(urls.values())))
+
+    if st.session_state.get('reuse_artwork'):
+        banner.write("Here's the artwork I made from this photo before 🎨")
+        buttons.button("Start Over", on_click=clear_session)
+        return st.stop()
+
+    banner.write("I think I've painted this cat before! Would you like to see that one, or shall I make a new one?")
+    col1, col2 = buttons.columns(2, gap="small")
+    with col1:
+        st.button("Show Me", on_click=reuse_artwork, use_container_width=True)
+    with col2:
+        st.button("Make a New One", on_click=skip_artwork, use_container_width=True, type="primary")
+
+    return st.stop()
+
+
 def cat_check_workflow():
     """
     Workflow for checking whether the image is of a cat or not.
@@ -509,13 +816,25 @@ def cat_check_workflow():
     :return:
     """
 
+    # most uploads are cats, so optionally start on the sketch instructions while checking
+    if settings.SPECULATIVE_SKETCH and 'sketch_instructions' not in st.session_state:
+        st.session_state.sketch_instructions = start_prefetch("instruct_sketch",
+                                                              instruct_sketch,
+                                                              instruct_sketch_async,
+                                                              _image=st.session_state.image,
+                                                              _client=st.session_state.client)
+
     with banner, st.spinner("Looking over image..."):
         logging.info("Looking over image to check if there is a cat.")
         # show the image
-        body.image(st.session_state.image)
+        show_image(body, st.session_state.image)
         # check if this is a cat
         try:
-            response = cat_check(_image=st.session_state.image)
+            response = run_agent(cat_check,
+                                 cat_check_async,
+                                 _image=st.session_state.image,
+                                 _client=st.session_state.client,
+                                 _on_text=banner.write)
         except errors.APIError as ae:
             logging.warning(ae.message)
             banner.warning(ae.message)
@@ -525,8 +844,12 @@ def cat_check_workflow():
             st.session_state.is_cat = response
 
     if st.session_state.is_cat.is_cat:
+        checkpoint('is_cat')
         return st.rerun()
 
+    # no cat, the speculative sketch instructions are not needed
+    discard_prefetch('sketch_instructions')
+
     logging.info(st.session_state.is_cat.observation)
     banner.warning(st.session_state.is_cat.observation)
     buttons.button("Start Over", on_click=clear_session)
@@ -534,6 +857,29 @@ def cat_check_workflow():
     return st.stop()
 
 
+def sketch_buttons():
+    """
+    Offer to sketch again, paint the sketch or start over.
+
+    :return:
+    """
+
+    # create two columns in the buttons container
+    col1, col2 = buttons.columns(2, gap="small")
+    # create two columns for buttons inside the left column
+    but1, but2 = col1.columns(2, gap="small")
+    # place buttons in the columns
+    with but1:
+        st.button(label="Sketch Again", on_click=clear_drawing, use_container_width=True)
+
+    with but2:
+        st.button("Start Painting", use_container_width=True, type="primary")
+
+    buttons_low.button("Start Over", on_click=clear_session)
+
+    return st.stop()
+
+
 def draw_cat_workflow():
     """
     Workflow for drawing the sketch of the cat.
@@ -544,14 +890,46 @@ def draw_cat_workflow():
     with banner.container():
         st.write(st.session_state.is_cat.observation)
 
+    # a resumed sketch is shown again, not sketched again
+    if 'drawing' in st.session_state:
+        show_image(body, st.session_state.drawing)
+        return sketch_buttons()
+
     with working.container(), st.spinner("Sketching...", show_time=True):
-        body.image(st.session_state.image)
+        show_image(body, st.session_state.image)
+        # streamed instructions are previewed here as they arrive
+        preview = st.empty()
         # instruct the artist how to draw from the image then sketch an image of the cat
         try:
             logging.info("Preparing to sketch, generating instructions for the artist...")
-            instructions = instruct_sketch(_image=st.session_state.image)
+            instructions = None
+            if (prefetch := st.session_state.pop('sketch_instructions', None)) is not None:
+                try:
+                    instructions = prefetcher().claim(prefetch)
+                except Exception as ex:
+                    logging.warning(f"Speculative sketch instructions failed, writing them again: {ex}")
+            # a near-duplicate photo can be sketched from the instructions written for it before
+            if instructions is None and settings.REUSE_INSTRUCTIONS and \
+                    (match := st.session_state.get('duplicate')) and match.get("sketch_instructions"):
+                logging.info("Reusing the sketch instructions of the near-duplicate photo.")
+                instructions = match["sketch_instructions"]
+            if instructions is None:
+                instructions = run_agent(instruct_sketch,
+                                         instruct_sketch_async,
+                                         _image=st.session_state.image,
+                                         _client=st.session_state.client,
+                                         _on_text=preview.caption)
+            preview.empty()
             logging.info("Generating a sketch from image and instructions...")
-            response = cat_sketch(_image=st.session_state.image, _instructions=instructions)
+            response = run_job('sketch_job',
+                               "cat_sketch",
+                               cat_sketch,
+                               cat_sketch_async,
+                               key=job_key("cat_sketch", st.session_state.image, instructions),
+                               _image=st.session_state.image,
+                               _instructions=instructions,
+                               _client=st.session_state.client,
+                               _on_text=banner.write)
         except errors.APIError as ae:
             logging.error(ae.message)
             st.warning(ae.message)
@@ -568,43 +946,52 @@ def draw_cat_workflow():
                 st.write(_part.text)
             if _part.inline_data is not None:
                 logging.info("New drawing generated and ready to display.")
-                st.session_state.drawing = Image.open(BytesIO(_part.inline_data.data))
+                with span("decode_response", agent="cat_sketch"):
+                    # keep the sketch in the bytes the model returned
+                    st.session_state.drawing = artifact_store.put_bytes(_part.inline_data.data,
+                                                                        _part.inline_data.mime_type)
+                    drawing = st.session_state.drawing.image()
+                checkpoint('drawing')
                 # load the cat sketch
-                body.image(st.session_state.drawing)
-                try:
-                    # upload image to google cloud storage and get public url
-                    artwork_image_url = upload_pil_image_to_gcs_and_get_url(
-                        image_pil=st.session_state.drawing,
-                        bucket_name=settings.GCS_BUCKET_NAME,
-                        destination_blob_name=f"{str(uuid.uuid4())}.png",
-                        project_id=settings.GCP_PROJECT_ID,
-                        image_format='PNG',
-                        content_type='image/png'
-                    )
-                    st.session_state.artwork_image_url = artwork_image_url
-
-                except Exception:
-                    logging.error("An error occurred while attempting to upload image to cloud storage.")
-                    pass
-
-                submit_log(workflow_status="sketch")
+                show_image(body, st.session_state.drawing)
+                # start on the painting instructions while the patron looks at the sketch
+                if settings.PREFETCH_PAINTING:
+                    discard_prefetch('painting_instructions')
+                    st.session_state.painting_instructions = start_prefetch("instruct_artist",
+                                                                            instruct_artist,
+                                                                            instruct_artist_async,
+                                                                            _image=st.session_state.image,
+                                                                            _sketch=st.session_state.drawing,
+                                                                            _client=st.session_state.client)
+                # upload image to google cloud storage in the background and log it when done
+                upload_artwork(_image=drawing,
+                               workflow_status="sketch",
+                               _on_exported=link_artwork("sketch", instructions))
 
     if 'drawing' not in st.session_state:
         logging.warning("Something went wrong. Try again.")
         banner.warning("Something went wrong. Try again.")
 
+    return sketch_buttons()
+
+
+def painting_buttons():
+    """
+    Offer to paint again or start over.
+
+    :return:
+    """
+
     # create two columns in the buttons container
     col1, col2 = buttons.columns(2, gap="small")
     # create two columns for buttons inside the left column
     but1, but2 = col1.columns(2, gap="small")
     # place buttons in the columns
     with but1:
-        st.button(label="Sketch Again", on_click=clear_drawing, use_container_width=True)
+        st.button(label="Paint Again", on_click=clear_painting, use_container_width=True)
 
     with but2:
-        st.button("Start Painting", use_container_width=True, type="primary")
-
-    buttons_low.button("Start Over", on_click=clear_session)
+        st.button("Start Over", on_click=clear_session, use_container_width=True, type="primary")
 
     return st.stop()
 
@@ -616,14 +1003,33 @@ def paint_cat_workflow():
     :return:
     """
 
+    # a resumed painting is shown again, not painted again
+    if 'painting' in st.session_state:
+        show_image(body, st.session_state.painting)
+        return painting_buttons()
+
     # show the drawing
-    body.image(st.session_state.drawing)
+    show_image(body, st.session_state.drawing)
 
     with working.container(), st.spinner("Preparing to paint...", show_time=True):
         # get instructions for the painting
         logging.info("Preparing to paint, generating instructions for the artist...")
+        # streamed instructions are previewed here as they arrive
+        preview = st.empty()
+        instructions = None
+        if (prefetch := st.session_state.pop('painting_instructions', None)) is not None:
+            try:
+                instructions = prefetcher().claim(prefetch)
+            except Exception as ex:
+                logging.warning(f"Prefetched painting instructions failed, writing them again: {ex}")
         try:
-            instructions = instruct_artist(_image=st.session_state.image, _sketch=st.session_state.drawing)
+            if instructions is None:
+                instructions = run_agent(instruct_artist,
+                                         instruct_artist_async,
+                                         _image=st.session_state.image,
+                                         _sketch=st.session_state.drawing,
+                                         _client=st.session_state.client,
+                                         _on_text=preview.caption)
         except errors.APIError as ae:
             logging.error(ae.message)
             banner.warning(ae.message)
@@ -639,7 +1045,15 @@ def paint_cat_workflow():
         # generate the painting
         logging.info("Generating a painting from sketch and instructions...")
         try:
-            response = cat_paint(_instructions=instructions, _image=st.session_state.drawing)
+            response = run_job('paint_job',
+                               "cat_paint",
+                               cat_paint,
+                               cat_paint_async,
+                               key=job_key("cat_paint", st.session_state.drawing, instructions),
+                               _instructions=instructions,
+                               _image=st.session_state.drawing,
+                               _client=st.session_state.client,
+                               _on_text=banner.write)
         except errors.APIError as ae:
             logging.error(ae.message)
             banner.warning(ae.message)
@@ -656,42 +1070,24 @@ def paint_cat_workflow():
             if _part.inline_data is not None:
                 logging.info("New painting generated and ready to display.")
                 # load the cat painting
-                st.session_state.painting = Image.open(BytesIO(_part.inline_data.data))
+                with span("decode_response", agent="cat_paint"):
+                    # keep the painting in the bytes the model returned
+                    st.session_state.painting = artifact_store.put_bytes(_part.inline_data.data,
+                                                                         _part.inline_data.mime_type)
+                    painting = st.session_state.painting.image()
+                checkpoint('painting')
                 # display the cat painting
-                body.image(st.session_state.painting)
-                try:
-                    # upload masked image to google cloud storage and get public url
-                    artwork_image_url = upload_pil_image_to_gcs_and_get_url(
-                        image_pil=st.session_state.painting,
-                        bucket_name=settings.GCS_BUCKET_NAME,
-                        destination_blob_name=f"{str(uuid.uuid4())}.png",
-                        project_id=settings.GCP_PROJECT_ID,
-                        image_format='PNG',
-                        content_type='image/png'
-                    )
-                    st.session_state.artwork_image_url = artwork_image_url
-                except Exception:
-                    logging.error("An error occurred while attempting to upload the painting to cloud storage.")
-                    pass
-
-                submit_log(workflow_status="painting")
+                show_image(body, st.session_state.painting)
+                # upload image to google cloud storage in the background and log it when done
+                upload_artwork(_image=painting,
+                               workflow_status="painting",
+                               _on_exported=link_artwork("painting", instructions))
 
         if 'painting' not in st.session_state:
             logging.warning("Something went wrong and the painting could not be generated.")
             st.warning("Something went wrong. Try again.")
 
-    # create two columns in the buttons container
-    col1, col2 = buttons.columns(2, gap="small")
-    # create two columns for buttons inside the left column
-    but1, but2 = col1.columns(2, gap="small")
-    # place buttons in the columns
-    with but1:
-        st.button(label="Paint Again", on_click=clear_painting, use_container_width=True)
-
-    with but2:
-        st.button("Start Over", on_click=clear_session, use_container_width=True, type="primary")
-
-    return st.stop()
+    return painting_buttons()
 
 
 def app():
@@ -704,6 +1100,12 @@ def app():
     # Display the page title
     header.title("🎨🐈 Clawdia Monet")
 
+    # Pick up the url of any artwork that finished uploading since the last run
+    collect_artwork_upload()
+
+    # Report the memory held by this session's images
+    logging.info(f"Session artifacts {footprint(st.session_state.to_dict().values())} {artifact_store.stats()}")
+
     # Check the user's locale to make sure it's in the US
     if st.session_state.get('locale', 'missing') == 'missing':
         try:
@@ -720,15 +1122,24 @@ def app():
             banner.warning("Sorry, some of this app's features are not supported in your language 😿.")
             st.stop()
 
+    # Pick up where a reloaded page left off
+    resume_commission()
+
     # Start by uploading a file
     if 'image' not in st.session_state:
         # Run upload workflow
         upload_workflow()
     # Check if the image is of a cat
     elif 'image' in st.session_state and 'is_cat' not in st.session_state:
-        # Run cat check
+        # Reject unusable photos locally and offer artwork made before, then run cat check
+        prescreen_workflow()
+        duplicate_workflow()
         logging.info("Running cat check...")
         cat_check_workflow()
+    elif st.session_state.pop('review_sketch', False):
+        # Show the resumed sketch again
+        logging.info("Running drawing workflow...")
+        draw_cat_workflow()
     elif 'drawing' not in st.session_state and 'is_cat' in st.session_state and st.session_state.is_cat.is_cat:
         # Run drawing agent
         logging.info("Running drawing workflow...")
@@ -0,0 +1,90 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Compares peak RSS and decode time of the full and reduced upload decode paths
+#
+# Usage: python -m benchmarks.decode_benchmark [--width 6000] [--height 4000] [--runs 5]
+#
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from PIL import Image, ImageOps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_utils.image_utils import rescale_width_height
+from imaging import decode_upload
+
+
+def full_decode(path: str) -> Image.Image:
+    """The decode path open_image_workflow used before reduced-resolution decoding"""
+
+    image = ImageOps.exif_transpose(Image.open(path))
+    if max(image.size) > 1024:
+        w, h = image.size
+        rw, rh = rescale_width_height(width=w, height=h, size=1024)
+        image = image.resize((rw, rh), Image.Resampling.BICUBIC)
+    return image
+
+
+def reduced_decode(path: str) -> Image.Image:
+    """The reduced-resolution decode path"""
+
+    return decode_upload(path, size=1024)
+
+
+def make_photo(path: str, width: int, height: int) -> None:
+    """Writes a phone-like JPEG with an EXIF orientation tag"""
+
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_180), gradient))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees, like a portrait phone photo
+    image.save(path, format="JPEG", quality=92, exif=exif)
+
+
+def _measure(name: str, path: str, runs: int, queue) -> None:
+    fn = {"full": full_decode, "reduced": reduced_decode}[name]
+    times = []
+    size = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = fn(path).size
+        times.append(time.perf_counter() - start)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    queue.put((name, size, sorted(times)[len(times) // 2], peak_mb))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload decode benchmark")
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "photo.jpg")
+        make_photo(path, args.width, args.height)
+        print(f"{args.width}x{args.height} JPEG, {os.path.getsize(path) / 1e6:.1f} MB, {args.runs} runs")
+
+        # each path runs in a fresh process so peak RSS is measured separately
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        for name in ("full", "reduced"):
+            proc = ctx.Process(target=_measure, args=(name, path, args.runs, queue))
+            proc.start()
+            proc.join()
+            name, size, median, peak_mb = queue.get()
+            print(f"{name:>8}: {size[0]}x{size[1]}  median {median * 1000:7.1f} ms  peak RSS {peak_mb:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: In-memory stand-ins for Cloud Storage and Firestore
+#
+# install() points the shared client registry at these stand-ins, so uploads
+# and log writes take their usual code paths without any Google Cloud project.
+#
+
+import itertools
+import threading
+import time
+
+
+class FakeBlob:
+
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.public_url = f"https://storage.googleapis.com/{bucket.name}/{name}"
+
+    def upload_from_file(self, file_obj, content_type: str = None) -> None:
+        data = file_obj.read()
+        time.sleep(self.bucket.latency)
+        self.bucket.stored(self.name, len(data))
+
+    def upload_from_string(self, data, content_type: str = None) -> None:
+        time.sleep(self.bucket.latency)
+        self.bucket.stored(self.name, len(data))
+
+    def make_public(self) -> None:
+        return None
+
+
+class FakeBucket:
+    """
+    Bucket that only counts what is uploaded to it.
+    """
+
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.bytes = 0
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+    def stored(self, name: str, size: int) -> None:
+        with self._lock:
+            self.uploads += 1
+            self.bytes += size
+
+
+class FakeDocument:
+
+    def __init__(self, collection: "FakeCollection"):
+        self.collection = collection
+        self.id = f"doc-{next(collection.db.ids)}"
+
+
+class FakeCollection:
+
+    def __init__(self, db: "FakeFirestore", name: str):
+        self.db = db
+        self.name = name
+
+    def document(self, document_id: str = None) -> FakeDocument:
+        return FakeDocument(self)
+
+    def add(self, document_data: dict):
+        time.sleep(self.db.latency)
+        self.db.written(self.name, 1)
+
+
+class FakeBatch:
+
+    def __init__(self, db: "FakeFirestore"):
+        self.db = db
+        self._writes = []
+
+    def set(self, reference: FakeDocument, document_data: dict) -> None:
+        self._writes.append(reference.collection.name)
+
+    def commit(self) -> None:
+        time.sleep(self.db.latency)
+        self.db.batches += 1
+        for name in self._writes:
+            self.db.written(name, 1)
+
+
+class FakeFirestore:
+    """
+    Firestore client that only counts the documents written to it.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.ids = itertools.count()
+        self._lock = threading.Lock()
+        self.documents = {}
+        self.batches = 0
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def written(self, collection: str, count: int) -> None:
+        with self._lock:
+            self.documents[collection] = self.documents.get(collection, 0) + count
+
+
+class FakeCloud:
+    """
+    The stand-ins installed in the client registry, with their counters.
+    """
+
+    def __init__(self, upload_latency: float = 0.0, write_latency: float = 0.0):
+        self.upload_latency = upload_latency
+        self.firestore = FakeFirestore(latency=write_latency)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, bucket_name: str, project_id: str = None) -> FakeBucket:
+        with self._lock:
+            if (bucket := self._buckets.get(bucket_name)) is None:
+                bucket = self._buckets[bucket_name] = FakeBucket(bucket_name, latency=self.upload_latency)
+            return bucket
+
+    def firestore_client(self, app=None) -> FakeFirestore:
+        return self.firestore
+
+    def stats(self) -> dict:
+        """
+        Returns what was uploaded and written.
+
+        Returns:
+            A dict with uploads, uploaded bytes, documents per collection and batch commits.
+        """
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {
+            "uploads": sum(b.uploads for b in buckets),
+            "uploaded_mb": round(sum(b.bytes for b in buckets) / 1e6, 2),
+            "documents": dict(self.firestore.documents),
+            "batches": self.firestore.batches,
+        }
+
+
+def install(upload_latency: float = 0.0, write_latency: float = 0.0) -> FakeCloud:
+    """
+    Points the process-wide client registry at in-memory stand-ins.
+
+    Args:
+        upload_latency: Seconds each upload takes.
+        write_latency: Seconds each Firestore write or batch commit takes.
+
+    Returns:
+        The FakeCloud, for its counters.
+    """
+    from storage.clients import registry
+
+    cloud = FakeCloud(upload_latency=upload_latency, write_latency=write_latency)
+    registry.bucket = cloud.bucket
+    registry.firestore_client = cloud.firestore_client
+    return cloud
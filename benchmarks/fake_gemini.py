@@ -0,0 +1,337 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Local stand-in for the Gemini API with configurable latency and error rates
+#
+# FakeClient answers the same calls the agents make on a genai.Client, sync,
+# async and streaming, with canned CatCheck JSON, instructions text, or text
+# plus a PNG image, so the app can be load tested without spending quota.
+#
+
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from io import BytesIO
+from PIL import Image
+from google.genai import errors
+from google.genai import types
+
+# Kinds of request, told apart by their config
+CHECK = "check"  # structured CatCheck response
+TEXT = "text"  # instructions for the artist
+IMAGE = "image"  # sketch or painting
+
+CANNED_TEXT = {
+    CHECK: json.dumps({"is_cat": True, "observation": "What a handsome cat! I'll get started on a sketch first."}),
+    TEXT: ("Draw the cat sitting upright in three-quarter view with loose, confident graphite lines. "
+           "Block in the head and body with simple shapes, then refine the ears, eyes and whiskers. "
+           "Keep the background to a few suggestive strokes and leave the fur texture light."),
+    IMAGE: "Here it is, I hope you like it!",
+}
+
+
+class Latency:
+    """
+    Log-normal latency distribution given by its median and p95 in seconds.
+    """
+
+    def __init__(self, median: float, p95: float = None):
+        self.median = median
+        self.p95 = p95 if p95 is not None else median * 2
+        # z of the 95th percentile of the standard normal distribution
+        self.sigma = math.log(self.p95 / self.median) / 1.645 if self.median > 0 and self.p95 > self.median else 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """
+        Reads a latency from "median" or "median:p95", e.g. "0.8:2.5".
+
+        Args:
+            spec: The latency spec in seconds.
+
+        Returns:
+            A Latency.
+        """
+        median, _, p95 = spec.partition(":")
+        return cls(float(median), float(p95) if p95 else None)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(self.sigma * rng.gauss(0, 1))
+
+
+# Roughly what the real models take, per kind of request
+DEFAULT_LATENCY = {
+    CHECK: Latency(0.8, 2.0),
+    TEXT: Latency(2.5, 6.0),
+    IMAGE: Latency(8.0, 20.0),
+}
+
+
+def request_kind(config: types.GenerateContentConfig) -> str:
+    """
+    Tells which agent a request came from by its config.
+
+    Args:
+        config: The request's GenerateContentConfig.
+
+    Returns:
+        CHECK, TEXT or IMAGE.
+    """
+    if config is not None and config.response_schema is not None:
+        return CHECK
+    if config is not None and any(m.lower() == "image" for m in (config.response_modalities or [])):
+        return IMAGE
+    return TEXT
+
+
+def canned_png(size: int = 1024) -> bytes:
+    """Encodes the placeholder artwork returned by the image requests"""
+
+    gradient = Image.linear_gradient("L").resize((size, size))
+    image = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_90), gradient.point(lambda v: 255 - v)))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeBackend:
+    """
+    Decides the latency, outcome and content of each fake request.
+
+    Errors are raised as the same genai errors the real API raises: a share
+    of requests gets a 503 and another share a 429, so retries and the
+    governor's back-off are exercised too. All methods are thread-safe.
+    """
+
+    def __init__(self,
+                 latency: dict = None,
+                 error_rate: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 stream_chunks: int = 4,
+                 image_size: int = 1024,
+                 seed: int = None):
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.stream_chunks = max(1, stream_chunks)
+        self.png = canned_png(image_size)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.failures = Counter()
+
+    def plan(self, config: types.GenerateContentConfig) -> tuple:
+        """
+        Draws the latency and outcome of one request.
+
+        Args:
+            config: The request's GenerateContentConfig.
+
+        Returns:
+            (kind, seconds, error), error is None for a successful request.
+        """
+        kind = request_kind(config)
+        with self._lock:
+            self.requests[kind] += 1
+            seconds = self.latency[kind].sample(self._rng)
+            roll = self._rng.random()
+            if roll < self.error_rate:
+                self.failures[kind] += 1
+                # errors come back faster than answers
+                return kind, seconds * 0.2, errors.ServerError(503, {"error": {
+                    "code": 503, "message": "The model is overloaded. Please try again later.", "status": "UNAVAILABLE"}})
+            if roll < self.error_rate + self.throttle_rate:
+                self.failures[kind] += 1
+                return kind, 0.05, errors.ClientError(429, {"error": {
+                    "code": 429, "message": "Resource has been exhausted.", "status": "RESOURCE_EXHAUSTED"}})
+        return kind, seconds, None
+
+    def parts(self, kind: str) -> list[types.Part]:
+        """The canned parts of a response"""
+
+        parts = [types.Part(text=CANNED_TEXT[kind])]
+        if kind == IMAGE:
+            parts.append(types.Part.from_bytes(data=self.png, mime_type="image/png"))
+        return parts
+
+    def response(self, kind: str, config: types.GenerateContentConfig, parts: list[types.Part] = None,
+                 parse: bool = True):
+        """
+        Builds a GenerateContentResponse, parsed like the real client does for a response_schema.
+
+        Args:
+            kind: CHECK, TEXT or IMAGE.
+            config: The request's GenerateContentConfig.
+            parts: The parts of the response, the canned parts by default.
+            parse: Validate the text against the response_schema, off for stream chunks holding partial JSON.
+
+        Returns:
+            A GenerateContentResponse.
+        """
+
+        parts = parts if parts is not None else self.parts(kind)
+        output_tokens = sum(len(p.text or "") // 4 for p in parts) + (1290 if kind == IMAGE else 0)
+        response = types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=parts))],
+            usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=1300,
+                                                                     candidates_token_count=output_tokens,
+                                                                     total_token_count=1300 + output_tokens)
+        )
+        if parse and kind == CHECK and config.response_schema is not None:
+            response.parsed = config.response_schema.model_validate_json(response.text)
+        return response
+
+    def chunks(self, kind: str, config: types.GenerateContentConfig) -> list:
+        """Splits a response into stream chunks, the text in pieces and the image last"""
+
+        text = CANNED_TEXT[kind]
+        step = math.ceil(len(text) / self.stream_chunks)
+        # like the real stream, chunks carry no parsed value, the caller validates the joined text
+        chunks = [self.response(kind, config, [types.Part(text=text[i:i + step])], parse=False)
+                  for i in range(0, len(text), step)]
+        if kind == IMAGE:
+            chunks.append(self.response(kind, config, [types.Part.from_bytes(data=self.png, mime_type="image/png")],
+                                        parse=False))
+        return chunks
+
+    def stats(self) -> dict:
+        """
+        Returns the requests and injected failures per kind.
+
+        Returns:
+            A dict with requests and failures.
+        """
+        with self._lock:
+            return {"requests": dict(self.requests), "failures": dict(self.failures)}
+
+
+# ===================
+# === Sync Client ===
+# ===================
+
+class _Models:
+
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    def generate_content(self, model: str, contents=None, config: types.GenerateContentConfig = None):
+        kind, seconds, error = self.backend.plan(config)
+        time.sleep(seconds)
+        if error is not None:
+            raise error
+        return self.backend.response(kind, config)
+
+    def generate_content_stream(self, model: str, contents=None, config: types.GenerateContentConfig = None):
+        kind, seconds, error = self.backend.plan(config)
+        if error is not None:
+            time.sleep(seconds)
+            raise error
+        chunks = self.backend.chunks(kind, config)
+
+        def _stream():
+            for chunk in chunks:
+                time.sleep(seconds / len(chunks))
+                yield chunk
+
+        return _stream()
+
+
+class _Chat:
+
+    def __init__(self, models: _Models, config: types.GenerateContentConfig):
+        self.models = models
+        self.config = config
+
+    def send_message(self, message):
+        return self.models.generate_content(model=None, contents=message, config=self.config)
+
+    def send_message_stream(self, message):
+        return self.models.generate_content_stream(model=None, contents=message, config=self.config)
+
+
+class _Chats:
+
+    def __init__(self, models: _Models):
+        self.models = models
+
+    def create(self, model: str, config: types.GenerateContentConfig = None):
+        return _Chat(self.models, config)
+
+
+# ====================
+# === Async Client ===
+# ====================
+
+class _AsyncModels:
+
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    async def generate_content(self, model: str, contents=None, config: types.GenerateContentConfig = None):
+        kind, seconds, error = self.backend.plan(config)
+        await asyncio.sleep(seconds)
+        if error is not None:
+            raise error
+        return self.backend.response(kind, config)
+
+    async def generate_content_stream(self, model: str, contents=None, config: types.GenerateContentConfig = None):
+        kind, seconds, error = self.backend.plan(config)
+        if error is not None:
+            await asyncio.sleep(seconds)
+            raise error
+        chunks = self.backend.chunks(kind, config)
+
+        async def _stream():
+            for chunk in chunks:
+                await asyncio.sleep(seconds / len(chunks))
+                yield chunk
+
+        return _stream()
+
+
+class _AsyncChat:
+
+    def __init__(self, models: _AsyncModels, config: types.GenerateContentConfig):
+        self.models = models
+        self.config = config
+
+    async def send_message(self, message):
+        return await self.models.generate_content(model=None, contents=message, config=self.config)
+
+    async def send_message_stream(self, message):
+        return await self.models.generate_content_stream(model=None, contents=message, config=self.config)
+
+
+class _AsyncChats:
+
+    def __init__(self, models: _AsyncModels):
+        self.models = models
+
+    def create(self, model: str, config: types.GenerateContentConfig = None):
+        return _AsyncChat(self.models, config)
+
+
+class _Aio:
+
+    def __init__(self, backend: FakeBackend):
+        self.models = _AsyncModels(backend)
+        self.chats = _AsyncChats(self.models)
+
+
+class FakeClient:
+    """
+    Drop-in for genai.Client covering models, chats and their aio variants.
+    """
+
+    def __init__(self, backend: FakeBackend = None):
+        self.backend = backend or FakeBackend()
+        self.models = _Models(self.backend)
+        self.chats = _Chats(self.models)
+        self.aio = _Aio(self.backend)
@@ -0,0 +1,355 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Load and latency benchmark of the Streamlit app against a fake Gemini backend
+#
+# Usage: python -m benchmarks.load_benchmark [--sessions 20] [--concurrency 5] [--latency image=8:20]
+#                                            [--error-rate 0.02] [--throttle-rate 0.01]
+#                                            [--streaming] [--async-agents] [--out report.json]
+#
+# Each simulated session drives app.py through Streamlit's AppTest: the photo
+# is decoded, the cat check and sketch run on the first script run, and the
+# painting runs after "Start Painting" is clicked. Gemini, Cloud Storage and
+# Firestore are replaced by local stand-ins, so no quota or project is needed.
+# AppTest runs the app on a process-wide Streamlit runtime, so concurrent
+# sessions run in separate worker processes, each with its own fakes and
+# caches, and each worker runs its share of the sessions one at a time.
+#
+
+import argparse
+import functools
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+import agents
+from benchmarks import fake_cloud
+from benchmarks.fake_gemini import CHECK, IMAGE, TEXT, FakeBackend, FakeClient, Latency
+from config import settings
+from imaging import decode_upload
+from storage.artifacts import artifact_store, footprint
+
+APP = os.path.join(ROOT, "app.py")
+
+# Longest edge app.py decodes uploads to
+DECODE_SIZE = 1024
+
+AGENTS = ("cat_check", "instruct_sketch", "instruct_artist", "cat_sketch", "cat_paint")
+
+
+def _pct(values: list, q: float) -> float:
+    values = sorted(values)
+    return round(values[int(q * (len(values) - 1))], 3) if values else 0.0
+
+
+def _rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is missing"""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+class StageTimer:
+    """
+    Collects the duration of every stage across all sessions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.durations.setdefault(stage, []).append(seconds)
+
+    def wrap(self, stage: str, fn):
+        @functools.wraps(fn)
+        def _timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return _timed
+
+    def wrap_async(self, stage: str, fn):
+        @functools.wraps(fn)
+        async def _timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return _timed
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                stage: {"count": len(v), "p50": _pct(v, 0.50), "p95": _pct(v, 0.95), "p99": _pct(v, 0.99)}
+                for stage, v in sorted(self.durations.items())
+            }
+
+
+def instrument_agents(timer: StageTimer) -> None:
+    """Times every agent, sync and async, where app.py picks them up on each script run"""
+
+    for name in AGENTS:
+        setattr(agents, name, timer.wrap(name, getattr(agents, name)))
+        setattr(agents, f"{name}_async", timer.wrap_async(name, getattr(agents, f"{name}_async")))
+
+
+def make_photo(seed: int, width: int = 3000, height: int = 2000) -> bytes:
+    """A distinct photo per session, so the result caches do not hide the agents"""
+
+    rng = random.Random(seed)
+    tint = tuple(rng.randrange(256) for _ in range(3))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), gradient))
+    image = Image.blend(image, Image.new("RGB", (width, height), tint), 0.5)
+    # sensor-like noise at the size the app decodes to, so the downscale cannot average it away
+    # and the photo passes the pre-screen's blur and flatness checks
+    scale = DECODE_SIZE / max(width, height)
+    noise = Image.effect_noise((round(width * scale), round(height * scale)), 64).convert("RGB")
+    image = Image.blend(image, noise.resize((width, height), Image.Resampling.NEAREST), 0.3)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def run_session(index: int, client: FakeClient, timer: StageTimer, timeout: float) -> tuple:
+    """
+    Drives one session through the check, sketch and paint stages.
+
+    Args:
+        index: Number of the session, also the seed of its photo.
+        client: The fake genai client.
+        timer: Where to record stage durations.
+        timeout: Seconds each script run may take.
+
+    Returns:
+        (result dict, the AppTest), the AppTest is kept so its memory can be measured.
+    """
+    result = {"session": index, "status": "failed", "error": None}
+    started = time.perf_counter()
+    at = AppTest.from_file(APP, default_timeout=timeout)
+
+    try:
+        start = time.perf_counter()
+        image = decode_upload(BytesIO(make_photo(index)), size=DECODE_SIZE, max_pixels=settings.MAX_UPLOAD_PIXELS)
+        timer.record("decode", time.perf_counter() - start)
+
+        at.session_state["client"] = client
+        at.session_state["locale"] = "us"
+        at.session_state["image"] = artifact_store.put_image(image)
+
+        # the cat check reruns the script straight into the sketch
+        start = time.perf_counter()
+        at.run()
+        timer.record("run_check_and_sketch", time.perf_counter() - start)
+        if "drawing" not in at.session_state:
+            raise RuntimeError(_app_error(at) or "No sketch")
+
+        start = time.perf_counter()
+        next(b for b in at.button if b.label == "Start Painting").click().run()
+        timer.record("run_paint", time.perf_counter() - start)
+        if "painting" not in at.session_state:
+            raise RuntimeError(_app_error(at) or "No painting")
+
+        result["status"] = "painted"
+
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    timer.record("session", result["seconds"])
+
+    return result, at
+
+
+def _app_error(at: AppTest) -> str:
+    """The first exception or warning the app showed"""
+
+    if len(at.exception):
+        return at.exception[0].value
+    if len(at.warning):
+        return at.warning[0].value
+    return ""
+
+
+def run_worker(worker: int, indices: list[int], options: dict) -> dict:
+    """
+    Runs a share of the sessions one after another in this process, against its own fakes and caches.
+
+    AppTest drives the app through a process-wide Streamlit runtime, so each
+    concurrent session needs a process of its own.
+
+    Args:
+        worker: Number of the worker, offsets the seed of its backend.
+        indices: Numbers of the sessions to run.
+        options: The parsed command line as a dict.
+
+    Returns:
+        A dict with the session results, stage durations, the run's wall-clock window, memory and counters.
+    """
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    # app.py opens its assets relative to the working directory
+    os.chdir(ROOT)
+
+    latency = {}
+    for spec in options["latency"]:
+        kind, _, value = spec.partition("=")
+        latency[kind] = Latency.parse(value)
+    seed = options["seed"] + worker if options["seed"] is not None else None
+    backend = FakeBackend(latency=latency, error_rate=options["error_rate"], throttle_rate=options["throttle_rate"],
+                          seed=seed)
+    client = FakeClient(backend)
+    cloud = fake_cloud.install(upload_latency=options["upload_latency"], write_latency=options["write_latency"])
+
+    cache_dir = tempfile.TemporaryDirectory()
+    settings.CACHE_DIR = cache_dir.name
+    settings.COMMISSION_STORE = f"sqlite:{os.path.join(cache_dir.name, 'commissions.db')}"
+    settings.STREAMING = options["streaming"]
+    settings.ASYNC_AGENTS = options["async_agents"]
+    # the synthetic photos share one layout, so they would all be offered the first session's artwork
+    settings.DUPLICATES = False
+
+    timer = StageTimer()
+    instrument_agents(timer)
+
+    gc.collect()
+    rss_before = _rss_mb()
+    started = time.time()
+    outcomes = [run_session(i, client, timer, options["timeout"]) for i in indices]
+    finished = time.time()
+
+    # let background uploads and the log sink finish before reading their counters
+    time.sleep(options["upload_latency"] + settings.LOG_FLUSH_SECONDS + 0.5)
+    gc.collect()
+    rss_after = _rss_mb()
+
+    report = {
+        "results": [result for result, _ in outcomes],
+        "durations": timer.durations,
+        "started": started,
+        "finished": finished,
+        "rss_before_mb": rss_before,
+        "rss_after_mb": rss_after,
+        "artifact_bytes": sum(footprint(at.session_state.filtered_state.values())["memory_bytes"]
+                              for _, at in outcomes),
+        "artifacts": artifact_store.stats(),
+        "backend": backend.stats(),
+        "cloud": cloud.stats(),
+        "governor": agents.governor().stats(),
+        "resilience": agents.resilience().stats(),
+    }
+    cache_dir.cleanup()
+
+    return report
+
+
+def _sum_counters(reports: list[dict]) -> dict:
+    """Adds up dicts of counters key by key, nested dicts included"""
+
+    total = {}
+    for report in reports:
+        for key, value in report.items():
+            if isinstance(value, dict):
+                total[key] = _sum_counters([total.get(key, {}), value])
+            elif isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and latency benchmark of the app")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5, help="worker processes, each runs one session at a time")
+    parser.add_argument("--latency", action="append", default=[],
+                        help=f"KIND=MEDIAN[:P95] in seconds, KIND is {CHECK}, {TEXT} or {IMAGE}, repeatable")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--upload-latency", type=float, default=0.3)
+    parser.add_argument("--write-latency", type=float, default=0.1)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--async-agents", action="store_true")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds each script run may take")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # deal the sessions out round-robin, one worker process per concurrent session
+    workers = max(1, min(args.concurrency, args.sessions))
+    shares = [list(range(args.sessions))[w::workers] for w in range(workers)]
+    # spawn, so each worker starts with its own Streamlit runtime and no inherited threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        reports = list(pool.map(run_worker, range(workers), shares, [vars(args)] * workers))
+
+    # throughput counts from the first session starting to the last finishing, not process startup
+    elapsed = max(r["finished"] for r in reports) - min(r["started"] for r in reports)
+    timer = StageTimer()
+    for r in reports:
+        for stage, durations in r["durations"].items():
+            timer.durations.setdefault(stage, []).extend(durations)
+
+    results = sorted((result for r in reports for result in r["results"]), key=lambda result: result["session"])
+    painted = sum(r["status"] == "painted" for r in results)
+    errors = {}
+    for r in results:
+        if r["error"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    report = {
+        "sessions": args.sessions,
+        "concurrency": workers,
+        "streaming": args.streaming,
+        "async_agents": args.async_agents,
+        "elapsed_seconds": round(elapsed, 2),
+        "painted": painted,
+        "failed": args.sessions - painted,
+        "errors": errors,
+        "commissions_per_minute": round(60 * painted / elapsed, 2) if elapsed else 0.0,
+        "stages": timer.report(),
+        "memory": {
+            "rss_before_mb": [round(r["rss_before_mb"], 1) for r in reports],
+            "rss_after_mb": [round(r["rss_after_mb"], 1) for r in reports],
+            "per_session_mb": round(sum(r["rss_after_mb"] - r["rss_before_mb"] for r in reports)
+                                    / max(1, args.sessions), 2),
+            "artifact_mb_per_session": round(sum(r["artifact_bytes"] for r in reports)
+                                             / max(1, args.sessions) / 1e6, 3),
+            "artifacts": _sum_counters([r["artifacts"] for r in reports]),
+        },
+        "backend": _sum_counters([r["backend"] for r in reports]),
+        "cloud": _sum_counters([r["cloud"] for r in reports]),
+        # the limits are per process, as they are per server process in production
+        "governor": [r["governor"] for r in reports],
+        "resilience": [r["resilience"] for r in reports],
+    }
+
+    print(json.dumps(report, indent=2, default=str))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
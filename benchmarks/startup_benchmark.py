@@ -0,0 +1,156 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Cold start benchmark of the Streamlit app, broken down by import
+#
+# Usage: python -m benchmarks.startup_benchmark [--runs 3] [--top 15] [--out report.json]
+#
+# Each run starts fresh interpreters, so nothing is already imported. The
+# imports of app.py are timed with python -X importtime and the cost is
+# summed per top-level package. The first script run, which is what the
+# first request waits for, is timed through Streamlit's AppTest with lazy
+# startup on and off. No Gemini or cloud calls are made.
+#
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP = os.path.join(ROOT, "app.py")
+
+# Times the first script run of the app in a fresh interpreter and prints the seconds as JSON
+FIRST_RUN = """
+import json, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+print(json.dumps({{"seconds": time.perf_counter() - started, "exception": bool(len(at.exception))}}))
+"""
+
+
+def app_imports(path: str = APP) -> list[str]:
+    """The modules app.py imports at the top level, in order"""
+
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(output: str) -> list[tuple]:
+    """
+    Parses the output of python -X importtime.
+
+    Args:
+        output: The interpreter's stderr.
+
+    Returns:
+        A list of (module, depth, self seconds, cumulative seconds), in import order.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return rows
+
+
+def time_imports(modules: list[str], env: dict) -> list[tuple]:
+    """Imports the modules in order in a fresh interpreter with -X importtime"""
+
+    code = "\n".join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def time_first_run(env: dict) -> dict:
+    """Runs the app once in a fresh interpreter"""
+
+    result = subprocess.run([sys.executable, "-c", FIRST_RUN.format(app=APP)],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _median(values: list) -> float:
+    values = sorted(values)
+    return round(values[len(values) // 2], 3) if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark of the app")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="number of packages to list")
+    parser.add_argument("--skip-first-run", action="store_true", help="only time the imports")
+    parser.add_argument("--out", default=None, help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # no metrics endpoint, so runs do not compete for its port
+    env = dict(os.environ, METRICS_PORT="0")
+    env.pop("K_SERVICE", None)
+    modules = app_imports()
+
+    totals, by_import, by_package, loaded = [], {}, {}, set()
+    for _ in range(args.runs):
+        rows = time_imports(modules, env)
+        totals.append(sum(cumulative for _, depth, _, cumulative in rows if depth == 0))
+        for name, depth, _, cumulative in rows:
+            if depth == 0 and name in modules:
+                by_import.setdefault(name, []).append(cumulative)
+        run_packages = {}
+        for name, _, self_seconds, _ in rows:
+            loaded.add(name)
+            package = name.split(".")[0]
+            run_packages[package] = run_packages.get(package, 0.0) + self_seconds
+        for package, seconds in run_packages.items():
+            by_package.setdefault(package, []).append(seconds)
+
+    report = {
+        "runs": args.runs,
+        "imports_seconds": _median(totals),
+        # cost of each import of app.py, counting only what earlier imports did not already load
+        "app_imports": {name: _median(by_import.get(name, [])) for name in modules},
+        "packages": dict(sorted(((p, _median(v)) for p, v in by_package.items()),
+                                key=lambda item: item[1], reverse=True)[:args.top]),
+        # the google namespace package is shared, so the SDKs are told apart by module name
+        "loaded_at_startup": {
+            module: module in loaded
+            for module in ("google.genai", "firebase_admin", "google.cloud.storage", "google.cloud.logging", "grpc")
+        },
+    }
+
+    if not args.skip_first_run:
+        report["first_run_seconds"] = {}
+        for lazy in ("true", "false"):
+            runs = [time_first_run(dict(env, LAZY_STARTUP=lazy)) for _ in range(args.runs)]
+            report["first_run_seconds"]["lazy" if lazy == "true" else "eager"] = {
+                "median": _median([run["seconds"] for run in runs]),
+                "exceptions": sum(run["exception"] for run in runs),
+            }
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
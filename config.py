@@ -16,6 +16,94 @@ class Settings(BaseSettings):
     FIRESTORE_LOG_COLLECTION: str = "default_log"
     GCS_BUCKET_NAME: str = "Missing"
     GCP_PROJECT_ID: str = "Missing"
+    CACHE_DIR: str = ".cache"
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    REUSE_INSTRUCTIONS: bool = True
+    UPLOAD_WORKERS: int = 4
+    UPLOAD_QUEUE_SIZE: int = 32
+    UPLOAD_SUBMIT_TIMEOUT: float = 0.5  # seconds to wait for room in a full upload queue before dropping the upload
+    LOG_BATCH_SIZE: int = 50
+    LOG_FLUSH_SECONDS: float = 2.0
+    LOG_QUEUE_SIZE: int = 1000
+    PREFETCH_WORKERS: int = 4
+    SPECULATIVE_SKETCH: bool = False
+    PREFETCH_PAINTING: bool = True
+    STREAMING: bool = False
+    ASYNC_AGENTS: bool = False
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 0.5
+    RETRY_MAX_DELAY: float = 8.0
+    RETRY_DEADLINE_SECONDS: float = 90.0
+    HEDGE_AGENTS: list[str] = []  # e.g. ["cat_check", "instruct_sketch", "instruct_artist"]
+    HEDGE_MIN_DELAY: float = 1.0
+    # Models of each agent, primary first, and the deadline of each attempt in seconds
+    MODEL_ROUTES: dict[str, dict] = {
+        "cat_check": {"models": ["GEMINI_MODEL_LITE", "GEMINI_MODEL_FLASH"], "deadline": 20},
+        "instruct_sketch": {"models": ["GEMINI_MODEL_FLASH", "GEMINI_MODEL_LITE"], "deadline": 60},
+        "instruct_artist": {"models": ["GEMINI_MODEL_FLASH", "GEMINI_MODEL_LITE"], "deadline": 60},
+        "cat_sketch": {"models": ["GEMINI_MODEL_EXP_IMG_GEN", "GEMINI_MODEL_PREVIEW_IMG_GEN"], "deadline": 120},
+        "cat_paint": {"models": ["GEMINI_MODEL_EXP_IMG_GEN", "GEMINI_MODEL_PREVIEW_IMG_GEN"], "deadline": 120},
+    }
+    ROUTER_WINDOW_SECONDS: float = 300.0
+    ROUTER_MIN_SAMPLES: int = 5
+    ROUTER_MAX_ERROR_RATE: float = 0.5
+    MODEL_LIMIT_DEFAULT: dict = {"rpm": 60, "tpm": 1_000_000, "concurrency": 8, "est_tokens": 2000}
+    MODEL_LIMITS: dict[str, dict] = {
+        "models/gemini-2.5-flash-lite": {"rpm": 4000, "tpm": 4_000_000, "concurrency": 64, "est_tokens": 1500},
+        "models/gemini-2.5-flash": {"rpm": 1000, "tpm": 1_000_000, "concurrency": 32, "est_tokens": 2500},
+        "models/gemini-2.0-flash-preview-image-generation": {"rpm": 100, "tpm": 1_000_000, "concurrency": 16,
+                                                             "est_tokens": 3000},
+        "models/gemini-2.5-flash-image-preview": {"rpm": 100, "tpm": 1_000_000, "concurrency": 16, "est_tokens": 3000},
+    }
+    PRESCREEN: bool = True
+    # Thresholds of each pre-screen check, leave a check out to disable it
+    PRESCREEN_CHECKS: dict[str, dict] = {
+        "size": {"min_edge": 256},
+        "uniform": {"min_std": 6.0},
+        "exposure": {"min_mean": 15.0, "max_mean": 245.0, "max_clipped": 0.7},
+        "blur": {"min_laplacian_var": 15.0},
+        "subject": {"min_fraction": 0.01},
+        "flat": {"max_fraction": 0.8},
+    }
+    PRESCREEN_ONNX_MODEL: str = ""  # optional ImageNet classifier, needs onnxruntime
+    PRESCREEN_ONNX_CLASSES: list[int] = [281, 282, 283, 284, 285]
+    PRESCREEN_ONNX_MIN_SCORE: float = 0.05
+    LAZY_STARTUP: bool = True  # create cloud clients in the background once the app is serving
+    METRICS_PORT: int = 9464  # 0 disables the metrics endpoint
+    MAX_UPLOAD_PIXELS: int = 64_000_000
+    IMAGE_VARIANTS: dict[str, dict] = {
+        "cat_check": {"size": 512, "format": "JPEG", "quality": 80},
+        "instruct_sketch": {"size": 768, "format": "JPEG", "quality": 85},
+        "instruct_artist": {"size": 768, "format": "JPEG", "quality": 85},
+        "cat_sketch": {"size": 1024, "format": "JPEG", "quality": 92},
+        "cat_paint": {"size": 1024, "format": "JPEG", "quality": 92},
+    }
+    IMAGE_VARIANTS_MAX_ENTRIES: int = 256
+    # Derivatives stored for each sketch and painting, add e.g. "master": {"size": None, "format": "PNG"} to keep a PNG
+    ARTWORK_DERIVATIVES: dict[str, dict] = {
+        "thumbnail": {"size": 256, "format": "WEBP", "quality": 75},
+        "display": {"size": 768, "format": "WEBP", "quality": 85},
+        "full": {"size": None, "format": "JPEG", "quality": 92},
+    }
+    ARTWORK_PRIMARY: str = "full"  # derivative recorded as artwork_image_url
+    DISPLAY_VARIANTS: dict[str, dict] = {
+        "display": {"size": 768, "format": "JPEG", "quality": 85},
+    }
+    DISPLAY_VARIANTS_MAX_ENTRIES: int = 512
+    ARTIFACT_FORMAT: str = "WEBP"
+    ARTIFACT_QUALITY: int = 90
+    ARTIFACT_DECODED_ENTRIES: int = 8
+    ARTIFACT_SPILL_DIR: str = ".cache/artifacts"
+    ARTIFACT_SPILL_IDLE_SECONDS: int = 300  # 0 keeps idle sessions in memory
+    JOB_WORKERS: int = 8
+    JOB_RESULT_TTL_SECONDS: int = 600  # how long a finished generation waits for its session
+    JOB_POLL_SECONDS: float = 0.25
+    COMMISSION_STORE: str = "sqlite:.cache/commissions.db"  # or "file:.cache/commissions", empty disables resume
+    COMMISSION_TTL_SECONDS: int = 7 * 24 * 3600
+    DUPLICATES: bool = True
+    DUPLICATE_INDEX_PATH: str = ".cache/duplicates.jsonl"
+    DUPLICATE_MAX_DISTANCE: int = 8  # bits of the 64-bit dHash that may differ
 
     model_config = SettingsConfigDict(env_file='.env', extra='ignore')
 
@@ -0,0 +1,126 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Shared asyncio event loop for Clawdia Monet's async agents
+#
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+
+class EventLoopThread:
+    """
+    One asyncio event loop running on a background thread, shared by every session.
+
+    Script threads hand coroutines to the loop and wait on the returned
+    futures, so in-flight Gemini requests are multiplexed on a single thread
+    instead of each holding its own blocking HTTP call.
+    """
+
+    def __init__(self, name: str = "agents-event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _track(self, coro):
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return await coro
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def submit(self, coro) -> Future:
+        """
+        Schedules a coroutine on the loop.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            A concurrent.futures.Future for its result, cancelling it cancels the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(self._track(coro), self.loop)
+
+    def call(self, fn: Callable, *args, _on_text: Callable[[str], None] = None, timeout: float = None, **kwargs):
+        """
+        Runs an async agent on the loop and waits for its result.
+
+        Streamed text is relayed back to the calling thread, so _on_text may
+        safely update the Streamlit page.
+
+        Args:
+            fn: The async agent function.
+            *args: Positional arguments for the agent.
+            _on_text: Called on the calling thread with the text received so far.
+            timeout: Seconds to wait for the result, including streaming, None waits until it finishes.
+            **kwargs: Keyword arguments for the agent.
+
+        Returns:
+            The result of the agent.
+
+        Raises:
+            TimeoutError: If the agent did not finish before the timeout, it is cancelled.
+        """
+        if _on_text is None:
+            future = self.submit(fn(*args, **kwargs))
+            try:
+                return future.result(timeout=timeout)
+            except TimeoutError:
+                future.cancel()
+                raise
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        updates = queue.SimpleQueue()
+        future = self.submit(fn(*args, _on_text=updates.put, **kwargs))
+
+        while True:
+            wait = 0.05
+            if deadline is not None:
+                if (remaining := deadline - time.monotonic()) <= 0:
+                    future.cancel()
+                    raise TimeoutError(f"{getattr(fn, '__name__', 'Agent')} did not finish in {timeout} seconds")
+                wait = min(wait, remaining)
+            try:
+                text = updates.get(timeout=wait)
+            except queue.Empty:
+                if future.done():
+                    break
+                continue
+            # skip to the latest text, each update holds everything received so far
+            while not updates.empty():
+                text = updates.get_nowait()
+            _on_text(text)
+
+        return future.result()
+
+    def stats(self) -> dict:
+        """
+        Returns the number of coroutines in flight and completed.
+
+        Returns:
+            A dict with in_flight and completed.
+        """
+        with self._lock:
+            return {"in_flight": self.in_flight, "completed": self.completed}
+
+    def close(self) -> None:
+        """Stops the loop and its thread"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        logging.info(f"Event loop closed {self.stats()}")
@@ -0,0 +1,335 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Per-model rate limiting and concurrency governor for Gemini calls
+#
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Token bucket that refills continuously up to its capacity.
+
+    Not thread-safe on its own, the ModelLimiter holding it serializes access.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0  # tokens per second
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken, 0 if it can be taken now"""
+        self._refill()
+        # a request larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def set_rate(self, per_minute: float) -> None:
+        self._refill()
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = min(self.level, self.capacity)
+
+
+class Permit:
+    """
+    Permission to make one call, returned by ModelLimiter.acquire.
+    """
+
+    def __init__(self, limiter: "ModelLimiter", tokens: int):
+        self.limiter = limiter
+        self.tokens = tokens  # tokens taken up front, an estimate
+        self.used_tokens = None  # set to the actual usage once known
+        self.throttled = False  # set when the call got a 429
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.limiter.release(self)
+
+
+class _AsyncWaiter:
+    """
+    Place of a coroutine in a ModelLimiter's queue, woken through its event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def wake(self) -> None:
+        """Resolves the current future from any thread"""
+        future = self.future
+        try:
+            self.loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        except RuntimeError:
+            # the loop is closed, the waiter is gone with it
+            pass
+
+
+class ModelLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets plus a concurrency cap for one model.
+
+    Callers are served strictly first-in, first-out, threads and coroutines
+    in one queue. Threads wait on a condition; coroutines wait on a future of
+    their own loop, resolved when they reach the head of the queue or a slot
+    is released, so a queued coroutine holds no thread. A 429 halves the
+    request rate; each successful call then raises it again by a small step
+    until it is back at the configured limit.
+    """
+
+    def __init__(self, model: str, rpm: int = 60, tpm: int = 1_000_000, concurrency: int = 8, est_tokens: int = 2000):
+        self.model = model
+        self.max_rpm = rpm
+        self.rpm = rpm
+        self.concurrency = concurrency
+        self.est_tokens = est_tokens
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._cond = threading.Condition()
+        self._waiters = deque()  # thread waiters are plain objects, coroutines are _AsyncWaiters
+        self._in_flight = 0
+        self._waits = deque(maxlen=512)
+        self.calls = 0
+        self.throttled = 0
+
+    def _notify(self) -> None:
+        """Wakes the waiting threads and the coroutine at the head of the queue, call with the lock held"""
+        self._cond.notify_all()
+        if self._waiters and isinstance(self._waiters[0], _AsyncWaiter):
+            self._waiters[0].wake()
+
+    def _grant(self, tokens: int, started: float) -> Permit:
+        """Gives the head of the queue its permit, call with the lock held"""
+        self._waiters.popleft()
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._in_flight += 1
+        self.calls += 1
+        self._waits.append(time.monotonic() - started)
+        self._notify()
+
+        return Permit(self, tokens)
+
+    def acquire(self, tokens: int = None, timeout: float = None) -> Permit:
+        """
+        Waits for this caller's turn and for room in the buckets and the concurrency cap.
+
+        Args:
+            tokens: Estimated tokens of the call, defaults to est_tokens.
+            timeout: Seconds to wait, None waits as long as it takes.
+
+        Returns:
+            A Permit, which must be released when the call finishes.
+
+        Raises:
+            TimeoutError: If the call could not start before the timeout.
+        """
+        tokens = tokens or self.est_tokens
+        waiter = object()
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+
+        with self._cond:
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    delay = None
+                    if self._waiters[0] is waiter and self._in_flight < self.concurrency:
+                        delay = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+                        if delay <= 0:
+                            break
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Timed out waiting for a {self.model} slot")
+                        delay = min(delay, remaining) if delay is not None else remaining
+                    self._cond.wait(timeout=delay)
+            except BaseException:
+                self._waiters.remove(waiter)
+                self._notify()
+                raise
+
+            return self._grant(tokens, started)
+
+    async def acquire_async(self, tokens: int = None) -> Permit:
+        """
+        Async variant of acquire, waits on the running event loop without holding a thread.
+
+        Cancelling the caller removes it from the queue.
+
+        Args:
+            tokens: Estimated tokens of the call, defaults to est_tokens.
+
+        Returns:
+            A Permit, which must be released when the call finishes.
+        """
+        tokens = tokens or self.est_tokens
+        waiter = _AsyncWaiter(asyncio.get_running_loop())
+        started = time.monotonic()
+
+        with self._cond:
+            self._waiters.append(waiter)
+        try:
+            while True:
+                with self._cond:
+                    delay = None
+                    if self._waiters[0] is waiter and self._in_flight < self.concurrency:
+                        delay = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+                        if delay <= 0:
+                            return self._grant(tokens, started)
+                    # a wake-up from now on resolves this future, even before it is awaited
+                    waiter.future = waiter.loop.create_future()
+                if delay is None:
+                    # wait to reach the head of the queue or for a slot to be released
+                    await waiter.future
+                else:
+                    # wait for the buckets to refill, or for a wake-up
+                    await asyncio.wait([waiter.future], timeout=delay)
+        except BaseException:
+            with self._cond:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._notify()
+            raise
+
+    def release(self, permit: Permit) -> None:
+        """Returns a permit's concurrency slot and adapts the limits to how the call went"""
+        with self._cond:
+            self._in_flight -= 1
+            if permit.used_tokens is not None:
+                # settle the difference between the estimate and the real usage
+                self._tokens.take(permit.used_tokens - permit.tokens)
+            if permit.throttled:
+                self.throttled += 1
+                self.rpm = max(1, self.rpm / 2)
+                self._requests.set_rate(self.rpm)
+                self._requests.level = 0
+                logging.warning(f"{self.model} returned 429, lowering its limit to {self.rpm:.0f} rpm")
+            elif self.rpm < self.max_rpm:
+                self.rpm = min(self.max_rpm, self.rpm + max(1.0, self.max_rpm * 0.05))
+                self._requests.set_rate(self.rpm)
+            self._notify()
+
+    def stats(self) -> dict:
+        """
+        Returns the limiter's state and queue wait times.
+
+        Returns:
+            A dict with the current limits, queue depth, in-flight calls and wait p50/p95 in seconds.
+        """
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "rpm": round(self.rpm, 1),
+                "max_rpm": self.max_rpm,
+                "queued": len(self._waiters),
+                "in_flight": self._in_flight,
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "wait_p50": waits[int(0.50 * (len(waits) - 1))] if waits else 0.0,
+                "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            }
+
+
+class Governor:
+    """
+    Process-wide set of ModelLimiters, one per model.
+    """
+
+    def __init__(self, limits: dict, default: dict):
+        self.limits = limits
+        self.default = default
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        """
+        Returns the limiter for a model, creating it from the configured limits on first use.
+
+        Args:
+            model: The model name.
+
+        Returns:
+            A ModelLimiter.
+        """
+        with self._lock:
+            if (limiter := self._limiters.get(model)) is None:
+                limiter = ModelLimiter(model, **{**self.default, **self.limits.get(model, {})})
+                self._limiters[model] = limiter
+            return limiter
+
+    @contextlib.contextmanager
+    def slot(self, model: str, tokens: int = None):
+        """
+        Holds a permit for one call to a model, marking it throttled if the call raises a 429.
+
+        Args:
+            model: The model name.
+            tokens: Estimated tokens of the call.
+
+        Yields:
+            The Permit, set permit.used_tokens once the usage is known.
+        """
+        permit = self.limiter(model).acquire(tokens=tokens)
+        try:
+            yield permit
+        except Exception as e:
+            permit.throttled = getattr(e, "code", None) == 429
+            raise
+        finally:
+            permit.release()
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self, model: str, tokens: int = None):
+        """
+        Async variant of slot, waits for the permit without blocking the event loop.
+
+        Args:
+            model: The model name.
+            tokens: Estimated tokens of the call.
+
+        Yields:
+            The Permit, set permit.used_tokens once the usage is known.
+        """
+        permit = await self.limiter(model).acquire_async(tokens=tokens)
+        try:
+            yield permit
+        except Exception as e:
+            permit.throttled = getattr(e, "code", None) == 429
+            raise
+        finally:
+            permit.release()
+
+    def stats(self) -> dict:
+        """
+        Returns the stats of every limiter.
+
+        Returns:
+            A dict keyed by model name.
+        """
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {model: limiter.stats() for model, limiter in limiters.items()}
@@ -0,0 +1,196 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Image decoding and per-stage encoding for Clawdia Monet
+#
+
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image, ExifTags
+from image_utils.image_utils import rescale_width_height
+from storage.cache import image_digest
+
+# Transpose that undoes each EXIF orientation
+EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def decode_upload(file, size: int = 1024, max_pixels: int = 64_000_000, reducing_gap: float = 2.0) -> Image.Image:
+    """
+    Decodes an uploaded image at reduced resolution.
+
+    Only the header is read before the pixel limit is checked. JPEGs are then
+    decoded with DCT scaling (draft mode) to the smallest scale that is still
+    at least reducing_gap times the target size, resized with a reducing gap,
+    and the EXIF orientation is applied to the small image last.
+
+    Args:
+        file: A path or file-like object.
+        size: Longest edge of the decoded image.
+        max_pixels: Uploads with more pixels than this are rejected before decoding.
+        reducing_gap: How much larger than the target the draft decode may be.
+
+    Returns:
+        The decoded, resized and upright image.
+
+    Raises:
+        Image.DecompressionBombError: If the image has more than max_pixels pixels.
+    """
+    with Image.open(file) as image:
+        w, h = image.size
+        if w * h > max_pixels:
+            raise Image.DecompressionBombError(f"Image has {w * h} pixels, the limit is {max_pixels}")
+
+        orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+
+        if max(w, h) > size:
+            # Rescale the image's dimensions where size is the longest edge
+            rw, rh = rescale_width_height(width=w, height=h, size=size)
+            # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while decoding
+            image.draft(None, (int(rw * reducing_gap), int(rh * reducing_gap)))
+            resized = image.resize((rw, rh), Image.Resampling.BICUBIC, reducing_gap=reducing_gap)
+        else:
+            image.load()
+            resized = image.copy()
+
+    if method := EXIF_TRANSPOSE.get(orientation):
+        resized = resized.transpose(method)
+
+    return resized
+
+
+# MIME type of each format images are encoded in, for the variants and the session artifacts
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
+
+def encode_variant(image: Image.Image, size: int = 1024, image_format: str = "JPEG", quality: int = None) -> bytes:
+    """
+    Encodes an image at a given resolution and format.
+
+    Args:
+        image: The image as a Pillow Image object.
+        size: Longest edge of the encoded image, None keeps the full size, the image is never enlarged.
+        image_format: 'JPEG', 'PNG' or 'WEBP'.
+        quality: Encoder quality for JPEG and WEBP.
+
+    Returns:
+        The encoded image bytes.
+    """
+    variant = image
+    if size is not None and max(image.size) > size:
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.BICUBIC, reducing_gap=2.0)
+    if image_format == "JPEG" and variant.mode != "RGB":
+        variant = variant.convert("RGB")
+
+    params = {"quality": quality} if quality is not None and image_format != "PNG" else {}
+    out = BytesIO()
+    variant.save(out, format=image_format, **params)
+
+    return out.getvalue()
+
+
+class VariantCache:
+    """
+    Thread-safe LRU cache of encoded image variants, keyed by image content and tier.
+
+    Each tier (e.g. one per agent) has its own resolution, format and quality,
+    so an image is encoded once per tier no matter how many calls send it.
+    """
+
+    def __init__(self, tiers: dict, max_entries: int = 256):
+        self.tiers = tiers
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (digest, tier) -> (bytes, mime_type)
+        self.hits = 0
+        self.misses = 0
+
+    def spec(self, tier: str) -> dict:
+        """
+        Returns the encoding of a tier, full size PNG for unknown tiers.
+
+        Args:
+            tier: Name of the tier.
+
+        Returns:
+            A dict with size, format and quality.
+        """
+        return {"size": 1024, "format": "PNG", "quality": None, **self.tiers.get(tier, {})}
+
+    def get(self, image: Image.Image, tier: str, digest: str = None) -> tuple:
+        """
+        Returns the encoded variant of an image for a tier, encoding it on first use.
+
+        Args:
+            image: The image as a Pillow Image object.
+            tier: Name of the tier.
+            digest: The image's content digest if the caller already has it, hashed from the pixels otherwise.
+
+        Returns:
+            A tuple of the encoded bytes and their MIME type.
+        """
+        return self._get((digest or image_digest(image), tier), tier, lambda: image)
+
+    def get_artifact(self, artifact, tier: str) -> tuple:
+        """
+        Returns the encoded variant of a session artifact for a tier, keyed by the artifact's content hash.
+
+        The artifact is only decoded the first time a tier is requested, so
+        later reruns serve the cached bytes without decoding or hashing pixels.
+
+        Args:
+            artifact: A storage.artifacts.Artifact.
+            tier: Name of the tier.
+
+        Returns:
+            A tuple of the encoded bytes and their MIME type.
+        """
+        return self._get((artifact.digest, tier), tier, artifact.image)
+
+    def _get(self, key: tuple, tier: str, load) -> tuple:
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        spec = self.spec(tier)
+        data = encode_variant(load(), size=spec["size"], image_format=spec["format"], quality=spec["quality"])
+        entry = (data, MIME_TYPES[spec["format"]])
+
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            A dict with hits, misses, entries and the bytes held.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": sum(len(data) for data, _ in self._entries.values()),
+            }
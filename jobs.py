@@ -0,0 +1,227 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Background jobs for Clawdia Monet's image generations that outlive script reruns
+#
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+
+class Job:
+    """
+    Handle for a generation running on the job worker.
+    """
+
+    def __init__(self, name: str, key: str = None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.key = key
+        self.future = Future()
+        self.created = time.monotonic()
+        self.finished = None
+        # sessions attached to the job, it is only cancelled or released when the last one lets go
+        self.holders = 1
+        # latest streamed text, replaced as a whole so readers never see a partial update
+        self.text = None
+
+    def on_text(self, text: str) -> None:
+        self.text = text
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return "running" if self.future.running() else "pending"
+        if self.future.cancelled():
+            return "cancelled"
+        return "failed" if self.future.exception() is not None else "done"
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits for the job to finish.
+
+        Args:
+            timeout: Seconds to wait, None waits until it finishes.
+
+        Returns:
+            True if the job has finished.
+        """
+        return bool(wait([self.future], timeout=timeout).done)
+
+
+class JobWorker:
+    """
+    Runs generations on a persistent thread pool, independent of the script run that asked for them.
+
+    Jobs are looked up by ID, so a rerun attaches to the job its session
+    started instead of starting another one. A job submitted with the key of
+    a job that is still running, or finished but not yet collected, attaches
+    to that job as well. Attachments are counted: a job is only released, or
+    cancelled if it has not started, once every holder has collected or
+    discarded it. Results are held until then, or until they expire
+    result_ttl seconds after finishing. All methods are thread-safe.
+    """
+
+    def __init__(self, max_workers: int = 4, result_ttl: float = 600.0):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._jobs = {}  # id -> Job
+        self._keys = {}  # key -> id
+        self._stats = defaultdict(lambda: {"submitted": 0, "attached": 0, "collected": 0, "failed": 0,
+                                           "discarded": 0, "expired": 0})
+
+    def _count(self, name: str, counter: str) -> None:
+        self._stats[name][counter] += 1
+
+    def _release(self, job: Job) -> bool:
+        """Drops one holder of a job, True when it was the last one and the job was forgotten"""
+        job.holders -= 1
+        if job.holders > 0:
+            return False
+        self._forget(job)
+        return True
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict) -> None:
+        if not job.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, _on_text=job.on_text, **kwargs)
+        except BaseException as e:
+            job.finished = time.monotonic()
+            job.future.set_exception(e)
+            logging.warning(f"Job {job.name} {job.id} failed: {e}")
+        else:
+            job.finished = time.monotonic()
+            job.future.set_result(result)
+
+    def _forget(self, job: Job) -> None:
+        self._jobs.pop(job.id, None)
+        if job.key is not None and self._keys.get(job.key) == job.id:
+            self._keys.pop(job.key)
+
+    def sweep(self) -> int:
+        """
+        Drops finished jobs whose results were never collected.
+
+        Returns:
+            The number of jobs dropped.
+        """
+        cutoff = time.monotonic() - self.result_ttl
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished is not None and job.finished < cutoff]
+            for job in expired:
+                self._forget(job)
+                self._count(job.name, "expired")
+        if expired:
+            logging.info(f"Dropped {len(expired)} uncollected jobs {self.stats()}")
+        return len(expired)
+
+    def submit(self, name: str, fn: Callable, *args, key: str = None, **kwargs) -> Job:
+        """
+        Starts a job, or attaches to the running or uncollected job with the same key.
+
+        Args:
+            name: Name of the agent, used for the counters.
+            fn: The agent function, called with _on_text=job.on_text and the arguments.
+            *args: Positional arguments for the agent.
+            key: Identifies the work, e.g. the agent and digests of its inputs.
+            **kwargs: Keyword arguments for the agent.
+
+        Returns:
+            A Job handle.
+        """
+        self.sweep()
+        with self._lock:
+            if key is not None and (job := self._jobs.get(self._keys.get(key))) is not None \
+                    and job.status not in ("failed", "cancelled"):
+                job.holders += 1
+                self._count(name, "attached")
+                logging.info(f"Attached to job {name} {job.id} ({job.status})")
+                return job
+            job = Job(name=name, key=key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._keys[key] = job.id
+            self._count(name, "submitted")
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        """
+        Looks up a job that has not been collected or discarded.
+
+        Args:
+            job_id: ID of the job, None returns None.
+
+        Returns:
+            The Job, or None.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def collect(self, job: Job):
+        """
+        Returns the result of a finished job and releases the caller's hold on it.
+
+        Args:
+            job: The Job handle.
+
+        Returns:
+            The result of the agent.
+
+        Raises:
+            CancelledError if the job was cancelled, or any exception raised by the agent.
+        """
+        with self._lock:
+            self._release(job)
+            if job.future.cancelled():
+                raise CancelledError(f"Job {job.name} {job.id} was cancelled")
+            self._count(job.name, "failed" if job.future.exception() is not None else "collected")
+
+        return job.future.result()
+
+    def discard(self, job_id: Optional[str]) -> None:
+        """
+        Releases the caller's hold on a job that is no longer wanted.
+
+        The job is cancelled, if it has not started, only when no other
+        session is still attached to it.
+
+        Args:
+            job_id: ID of the job, None is ignored.
+        """
+        with self._lock:
+            if (job := self._jobs.get(job_id)) is None:
+                return
+            self._count(job.name, "discarded")
+            if not self._release(job):
+                logging.info(f"Discarded job {job.name} {job.id}, {job.holders} holders left")
+                return
+        job.future.cancel()
+        logging.info(f"Discarded job {job.name} {job.id} ({job.status})")
+
+    def stats(self) -> dict:
+        """
+        Returns the job counters per agent and the jobs held.
+
+        Returns:
+            A dict with the counters keyed by agent name, plus running and held.
+        """
+        with self._lock:
+            return {
+                "agents": {k: dict(v) for k, v in self._stats.items()},
+                "running": sum(not job.future.done() for job in self._jobs.values()),
+                "held": sum(job.future.done() for job in self._jobs.values()),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
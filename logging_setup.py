@@ -7,16 +7,67 @@
 
 import logging
 import logging.config
-import google.cloud.logging
+import json
 import sys
 import os
+import threading
+from config import settings
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, like Cloud Logging's structured logs.
+
+    Fields passed as extra={"json_fields": {...}}, such as the timing spans,
+    are merged into the object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "severity": record.levelname,
+            "message": record.getMessage(),
+            **getattr(record, "json_fields", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_cloud_logging(interim: logging.Handler = None) -> None:
+    """
+    Attaches the Google Cloud Logging handler to the root logger, importing the SDK on first use.
+
+    Args:
+        interim: Handler used until now, removed once the Cloud Logging handler is attached.
+    """
+    try:
+        import google.cloud.logging
+
+        client = google.cloud.logging.Client()
+
+        # This helper attaches the GCP handler to the root logger
+        client.setup_logging(log_level=logging.INFO)
+    except Exception as e:
+        logging.error("Failed to setup Google Cloud logging.")
+    else:
+        if interim is not None:
+            logging.getLogger().removeHandler(interim)
+        logging.info("Successfully configured Google Cloud structured logging.")
 
 
 def setup_logging():
     """
     Sets up logging. If running in Google Cloud Run, it configures a
     structured JSON logger. Otherwise, it configures a basic logger that
-    prints to the console.
+    prints to the console, or a JSON one when LOG_FORMAT=json.
+
+    Structured fields passed as extra={"json_fields": {...}} show up as
+    fields of the log entry in Cloud Logging and in the local JSON format.
+
+    With LAZY_STARTUP the Cloud Logging client is created on a background
+    thread. Until it is ready, logs go to stdout as JSON, which Cloud Run
+    also ingests as structured logs.
 
     This function is safe to call multiple times.
     """
@@ -28,15 +79,20 @@ def setup_logging():
     # The K_SERVICE environment variable is a reliable indicator.
     if "K_SERVICE" in os.environ:
         # --- We are in Google Cloud Run ---
-        try:
-            client = google.cloud.logging.Client()
-
-            # This helper attaches the GCP handler to the root logger
-            client.setup_logging(log_level=logging.INFO)
-        except Exception as e:
-            logging.error("Failed to setup Google Cloud logging.")
+        if settings.LAZY_STARTUP:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(JsonFormatter())
+            logging.basicConfig(level=logging.INFO, handlers=[handler])
+            threading.Thread(target=setup_cloud_logging, args=(handler,), name="cloud-logging-setup",
+                             daemon=True).start()
         else:
-            logging.info("Successfully configured Google Cloud structured logging.")
+            setup_cloud_logging()
+    elif os.environ.get("LOG_FORMAT") == "json":
+        # --- Local, with the same structured fields as Cloud Logging ---
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+        logging.basicConfig(level=logging.INFO, handlers=[handler])
+        logging.info("Configured JSON console logging.")
     else:
         # --- We are in a local development environment ---
         # Configure a basic logger that prints to standard out
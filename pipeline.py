@@ -0,0 +1,301 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Headless batch commissions for Clawdia Monet
+#
+# Usage: python pipeline.py PHOTOS [--out results] [--concurrency 4]
+#
+# PHOTOS is a directory of .jpg/.jpeg/.png files or a manifest file with one
+# path per line (.txt) or one {"path": ...} object per line (.jsonl).
+#
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import Optional
+from PIL import Image
+from google import genai
+from google.genai import types
+from pydantic import BaseModel
+from agents import cat_check, instruct_sketch, cat_sketch, instruct_artist, cat_paint
+from config import settings
+from imaging import decode_upload
+from prescreen import PreScreen, load_classifier
+
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+# ===================
+# === Data Models ===
+# ===================
+
+class CommissionResult(BaseModel):
+    source: str
+    status: str = "pending"  # painted, rejected, not_cat or failed
+    is_cat: Optional[bool] = None
+    observation: Optional[str] = None
+    sketch_path: Optional[str] = None
+    sketch_message: Optional[str] = None
+    painting_path: Optional[str] = None
+    painting_message: Optional[str] = None
+    error: Optional[str] = None
+    latency: dict[str, float] = {}  # seconds per stage
+
+
+# ========================
+# === Helper Functions ===
+# ========================
+
+def make_client() -> genai.Client:
+    """
+    Creates a genai client from the GOOGLE_API_KEY setting or environment variable.
+
+    :return: genai.Client
+    """
+
+    key = settings.GOOGLE_API_KEY if settings.GOOGLE_API_KEY != "Missing" else os.getenv("GOOGLE_API_KEY")
+    if not key:
+        raise SystemExit("Configuration failed. Missing API key.")
+
+    return genai.Client(api_key=key)
+
+
+def load_photos(source: str) -> list[str]:
+    """
+    Lists the photos in a directory or manifest file.
+
+    :param source: Directory of photos or manifest file
+    :return: List of photo paths
+    """
+
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source)
+                      if name.lower().endswith(PHOTO_EXTENSIONS))
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            if not (line := line.strip()) or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if source.endswith(".jsonl") else line
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+
+    return paths
+
+
+def response_image(response: types.GenerateContentResponse) -> tuple:
+    """
+    Reads the first image and the text from an artist agent's response.
+
+    :param response: Response from cat_sketch or cat_paint
+    :return: Tuple of the image (or None) and the text message
+    """
+
+    image = None
+    text = []
+    for _part in response.candidates[0].content.parts:
+        if _part.text is not None:
+            text.append(_part.text.strip())
+        if _part.inline_data is not None and image is None:
+            image = Image.open(BytesIO(_part.inline_data.data))
+
+    return image, " ".join(text)
+
+
+class _Timer:
+    """Context manager that records the duration of a stage"""
+
+    def __init__(self, latency: dict, stage: str):
+        self.latency = latency
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.latency[self.stage] = time.perf_counter() - self.start
+        return False
+
+
+# ================
+# === Pipeline ===
+# ================
+
+def run_commission(path: str, name: str, client: genai.Client, out_dir: str,
+                   screen: PreScreen = None) -> CommissionResult:
+    """
+    Runs the check, sketch and paint chain for one photo.
+
+    :param path: Path of the photo
+    :param name: Base name for the output files
+    :param client: The genai client
+    :param out_dir: Directory for the sketch and painting
+    :param screen: Optional CPU pre-screen, rejected photos never reach Gemini
+    :return: CommissionResult
+    """
+
+    result = CommissionResult(source=path)
+    latency = result.latency
+
+    try:
+        with _Timer(latency, "decode"):
+            image = decode_upload(path, size=1024, max_pixels=settings.MAX_UPLOAD_PIXELS)
+
+        if screen is not None:
+            with _Timer(latency, "prescreen"):
+                screened = screen.screen(image)
+            if not screened.passed:
+                result.status = "rejected"
+                result.observation = screened.message
+                result.error = screened.reasons[0]
+                return result
+
+        with _Timer(latency, "cat_check"):
+            check = cat_check(_image=image, _client=client)
+        result.is_cat, result.observation = check.is_cat, check.observation
+        if not check.is_cat:
+            result.status = "not_cat"
+            return result
+
+        with _Timer(latency, "instruct_sketch"):
+            instructions = instruct_sketch(_image=image, _client=client)
+        with _Timer(latency, "cat_sketch"):
+            drawing, result.sketch_message = response_image(
+                cat_sketch(_instructions=instructions, _image=image, _client=client)
+            )
+        if drawing is None:
+            raise Exception("No sketch in the response")
+        result.sketch_path = os.path.join(out_dir, f"{name}_sketch.png")
+        drawing.save(result.sketch_path, format="PNG")
+
+        with _Timer(latency, "instruct_artist"):
+            instructions = instruct_artist(_image=image, _sketch=drawing, _client=client)
+        with _Timer(latency, "cat_paint"):
+            painting, result.painting_message = response_image(
+                cat_paint(_instructions=instructions, _image=drawing, _client=client)
+            )
+        if painting is None:
+            raise Exception("No painting in the response")
+        result.painting_path = os.path.join(out_dir, f"{name}_painting.png")
+        painting.save(result.painting_path, format="PNG")
+
+        result.status = "painted"
+
+    except Exception as e:
+        logging.error(f"Commission failed for {path}: {e}")
+        result.status = "failed"
+        result.error = str(e) or type(e).__name__
+
+    return result
+
+
+def run_batch(paths: list[str], client: genai.Client, out_dir: str, concurrency: int = 4,
+              screen: PreScreen = None) -> list[CommissionResult]:
+    """
+    Runs commissions for many photos on a bounded thread pool and writes results.jsonl.
+
+    :param paths: Paths of the photos
+    :param client: The genai client
+    :param out_dir: Directory for the outputs and the results manifest
+    :param concurrency: Number of commissions in flight at once
+    :param screen: Optional CPU pre-screen
+    :return: Results in the order of paths
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    results = [None] * len(paths)
+
+    with open(os.path.join(out_dir, "results.jsonl"), "w", encoding="utf-8") as manifest, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="commission") as pool:
+        futures = {
+            pool.submit(run_commission,
+                        path,
+                        f"{i:05d}_{os.path.splitext(os.path.basename(path))[0]}",
+                        client,
+                        out_dir,
+                        screen): i
+            for i, path in enumerate(paths)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            results[i] = future.result()
+            manifest.write(results[i].model_dump_json() + "\n")
+            manifest.flush()
+            logging.info(f"[{done}/{len(paths)}] {results[i].status}: {results[i].source}")
+
+    return results
+
+
+def summarize(results: list[CommissionResult], elapsed: float) -> dict:
+    """
+    Summarizes throughput and per-stage latency of a batch.
+
+    :param results: Results of the batch
+    :param elapsed: Wall time of the batch in seconds
+    :return: Summary dict
+    """
+
+    def _pct(values: list, q: float) -> float:
+        return round(values[int(q * (len(values) - 1))], 3) if values else 0.0
+
+    statuses = {}
+    stages = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+        for stage, seconds in result.latency.items():
+            stages.setdefault(stage, []).append(seconds)
+
+    return {
+        "photos": len(results),
+        "elapsed_seconds": round(elapsed, 2),
+        "photos_per_minute": round(60 * len(results) / elapsed, 2) if elapsed else 0.0,
+        "statuses": statuses,
+        "stages": {
+            stage: {"count": len(v), "p50": _pct(sorted(v), 0.50), "p95": _pct(sorted(v), 0.95)}
+            for stage, v in stages.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Clawdia Monet commissions for a batch of photos.")
+    parser.add_argument("photos", help="directory of photos or manifest file (.txt or .jsonl)")
+    parser.add_argument("--out", default="results", help="output directory (default: results)")
+    parser.add_argument("--concurrency", type=int, default=4, help="commissions in flight at once (default: 4)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
+
+    paths = load_photos(args.photos)
+    logging.info(f"Commissioning {len(paths)} photos with concurrency {args.concurrency}...")
+
+    screen = None
+    if settings.PRESCREEN:
+        screen = PreScreen(thresholds=settings.PRESCREEN_CHECKS,
+                           classifier=load_classifier(settings.PRESCREEN_ONNX_MODEL,
+                                                      classes=settings.PRESCREEN_ONNX_CLASSES),
+                           min_score=settings.PRESCREEN_ONNX_MIN_SCORE)
+
+    start = time.perf_counter()
+    results = run_batch(paths, client=make_client(), out_dir=args.out, concurrency=args.concurrency, screen=screen)
+    summary = summarize(results, elapsed=time.perf_counter() - start)
+    if screen is not None:
+        summary["prescreen"] = screen.stats()
+
+    with open(os.path.join(args.out, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
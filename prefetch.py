@@ -0,0 +1,130 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Background prefetch of agent calls for Clawdia Monet
+#
+
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+
+class Prefetch:
+    """
+    Handle for an agent call started ahead of time.
+    """
+
+    def __init__(self, name: str, future: Future):
+        self.name = name
+        self.future = future
+
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class Prefetcher:
+    """
+    Runs agent calls on a shared thread pool before their result is needed.
+
+    Each prefetch is either claimed, when its result is used, or discarded,
+    when it turns out not to be needed. The counters per agent show how often
+    the work was used and how often it was wasted.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"started": 0, "used": 0, "wasted": 0, "cancelled": 0, "failed": 0})
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            self._stats[name][counter] += 1
+
+    def submit(self, name: str, fn, *args, **kwargs) -> Prefetch:
+        """
+        Starts an agent call in the background.
+
+        Args:
+            name: Name of the agent, used for the counters.
+            fn: The agent function.
+            *args: Positional arguments for the agent.
+            **kwargs: Keyword arguments for the agent.
+
+        Returns:
+            A Prefetch handle.
+        """
+        self._count(name, "started")
+
+        return Prefetch(name=name, future=self._executor.submit(fn, *args, **kwargs))
+
+    def adopt(self, name: str, future: Future) -> Prefetch:
+        """
+        Tracks work that was already started elsewhere, e.g. a coroutine on the shared event loop.
+
+        Args:
+            name: Name of the agent, used for the counters.
+            future: Future for the result of the work.
+
+        Returns:
+            A Prefetch handle.
+        """
+        self._count(name, "started")
+
+        return Prefetch(name=name, future=future)
+
+    def claim(self, prefetch: Prefetch, timeout: float = None):
+        """
+        Waits for a prefetch and returns its result.
+
+        Args:
+            prefetch: The Prefetch handle.
+            timeout: Seconds to wait, None waits until the call finishes.
+
+        Returns:
+            The result of the agent call.
+
+        Raises:
+            Any exception raised by the agent call, or TimeoutError.
+        """
+        try:
+            result = prefetch.future.result(timeout=timeout)
+        except TimeoutError:
+            self.discard(prefetch)
+            raise
+        except Exception:
+            self._count(prefetch.name, "failed")
+            raise
+        self._count(prefetch.name, "used")
+        logging.info(f"Used prefetched {prefetch.name} {self.stats(prefetch.name)}")
+
+        return result
+
+    def discard(self, prefetch: Prefetch) -> None:
+        """
+        Cancels a prefetch that is no longer needed, or drops its result if it already ran.
+
+        Args:
+            prefetch: The Prefetch handle.
+        """
+        if prefetch.future.cancel():
+            self._count(prefetch.name, "cancelled")
+        else:
+            self._count(prefetch.name, "wasted")
+        logging.info(f"Discarded prefetched {prefetch.name} {self.stats(prefetch.name)}")
+
+    def stats(self, name: str = None) -> dict:
+        """
+        Returns the prefetch counters.
+
+        Args:
+            name: Name of one agent, or None for all of them.
+
+        Returns:
+            A dict of counters, keyed by agent name when name is None.
+        """
+        with self._lock:
+            if name is not None:
+                return dict(self._stats[name])
+            return {k: dict(v) for k, v in self._stats.items()}
@@ -0,0 +1,276 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: CPU pre-screen that rejects unusable uploads before any Gemini call
+#
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+import numpy as np
+from PIL import Image
+
+# Message for the patron when a check rejects their photo
+MESSAGES = {
+    "size": "This photo is too small for me to paint from. Do you have a larger one of your cat?",
+    "uniform": "This photo looks blank to me. Please upload a photo with your cat in it.",
+    "exposure": "This photo is too dark or too bright for me to see your cat. Could you try another one?",
+    "blur": "This photo is too blurry for me to sketch from. Do you have a sharper one of your cat?",
+    "subject": "I can barely make anything out in this photo. Could you upload one where your cat is bigger?",
+    "flat": "This looks like a screenshot or a graphic rather than a photo. Please upload a photo of your cat.",
+    "classifier": "I couldn't find a cat in this image. I only paint cats.",
+}
+
+# ImageNet classes of domestic cats: tabby, tiger cat, Persian, Siamese, Egyptian cat
+IMAGENET_CATS = [281, 282, 283, 284, 285]
+
+
+class ScreenResult:
+    """
+    Outcome of screening one image.
+    """
+
+    def __init__(self, reasons: list[str], metrics: dict, seconds: float):
+        self.reasons = reasons
+        self.metrics = metrics
+        self.seconds = seconds
+
+    @property
+    def passed(self) -> bool:
+        return not self.reasons
+
+    @property
+    def message(self) -> str:
+        """What to tell the patron, for the first check that failed"""
+        return MESSAGES.get(self.reasons[0], "I can't paint from this photo. Please try another one.") \
+            if self.reasons else ""
+
+
+def grayscale(image: Image.Image, size: int = 256) -> np.ndarray:
+    """
+    Downscales an image to a float32 grayscale array for the checks.
+
+    Args:
+        image: The image as a Pillow Image object.
+        size: Longest edge of the array.
+
+    Returns:
+        A 2D array of luminance from 0 to 255.
+    """
+    small = image.convert("L")
+    if max(small.size) > size:
+        small = small.copy()
+        small.thumbnail((size, size), Image.Resampling.BILINEAR)
+    return np.asarray(small, dtype=np.float32)
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """Variance of the 4-neighbour Laplacian, low for blurry images"""
+
+    lap = 4 * gray[1:-1, 1:-1] - gray[:-2, 1:-1] - gray[2:, 1:-1] - gray[1:-1, :-2] - gray[1:-1, 2:]
+    return float(lap.var())
+
+
+def subject_fraction(gray: np.ndarray, coverage: float = 0.9) -> float:
+    """
+    Share of the frame covered by the box holding most of the edge energy.
+
+    Args:
+        gray: Grayscale array.
+        coverage: Share of the edge energy the box must hold.
+
+    Returns:
+        The box's area as a share of the frame, small when the subject is tiny.
+    """
+    gy, gx = np.abs(np.diff(gray, axis=0))[:, :-1], np.abs(np.diff(gray, axis=1))[:-1, :]
+    energy = gx + gy
+    total = energy.sum()
+    if total <= 0:
+        return 0.0
+    tail = (1 - coverage) / 2
+    rows = np.cumsum(energy.sum(axis=1)) / total
+    cols = np.cumsum(energy.sum(axis=0)) / total
+    top, bottom = np.searchsorted(rows, tail), np.searchsorted(rows, 1 - tail)
+    left, right = np.searchsorted(cols, tail), np.searchsorted(cols, 1 - tail)
+    return float((bottom - top + 1) * (right - left + 1) / energy.size)
+
+
+class OnnxCatClassifier:
+    """
+    Small image classifier run on the CPU with onnxruntime.
+
+    Expects an ImageNet-style model taking a 1x3xHxW float input normalized
+    with the ImageNet mean and standard deviation. onnxruntime is only
+    imported when the classifier is created.
+    """
+
+    def __init__(self, model_path: str, classes: list[int] = None, input_size: int = 224):
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.classes = classes or IMAGENET_CATS
+        self.input_size = input_size
+        self.mean = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(3, 1, 1)
+        self.std = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(3, 1, 1)
+
+    def score(self, image: Image.Image) -> float:
+        """
+        Returns the probability that the image shows a cat.
+
+        Args:
+            image: The image as a Pillow Image object.
+
+        Returns:
+            The summed softmax probability of the cat classes.
+        """
+        resized = image.convert("RGB").resize((self.input_size, self.input_size), Image.Resampling.BILINEAR)
+        x = np.asarray(resized, dtype=np.float32).transpose(2, 0, 1) / 255.0
+        x = ((x - self.mean) / self.std)[np.newaxis]
+        logits = self.session.run(None, {self.input_name: x})[0][0]
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        return float(probs[self.classes].sum())
+
+
+class PreScreen:
+    """
+    Runs cheap quality checks on the CPU before a photo is sent to Gemini.
+
+    Each check takes the image, its grayscale array and the metrics dict,
+    records its metric there and returns True when the photo passes. Checks
+    are configured by name with their thresholds; a check that is left out
+    of the config does not run, and add() plugs in new ones. The counters
+    report how many Gemini calls the rejections saved. Thread-safe.
+    """
+
+    def __init__(self, thresholds: dict, classifier: OnnxCatClassifier = None, min_score: float = 0.05):
+        self.thresholds = thresholds
+        self.classifier = classifier
+        self.min_score = min_score
+        self._checks = {
+            "size": self._size,
+            "uniform": self._uniform,
+            "exposure": self._exposure,
+            "blur": self._blur,
+            "subject": self._subject,
+            "flat": self._flat,
+        }
+        self._lock = threading.Lock()
+        self.screened = 0
+        self.rejected = {}
+
+    def add(self, name: str, check: Callable[[Image.Image, np.ndarray, dict], bool], **thresholds) -> None:
+        """
+        Plugs in another check.
+
+        Args:
+            name: Name of the check, also used in the counters and as the key of its message.
+            check: Called with (image, grayscale array, metrics), returns True when the photo passes.
+            **thresholds: The check's thresholds, read back from self.thresholds[name].
+        """
+        self._checks[name] = check
+        self.thresholds[name] = thresholds
+
+    def _size(self, image: Image.Image, gray: np.ndarray, metrics: dict) -> bool:
+        metrics["min_edge"] = min(image.size)
+        return metrics["min_edge"] >= self.thresholds["size"]["min_edge"]
+
+    def _uniform(self, image: Image.Image, gray: np.ndarray, metrics: dict) -> bool:
+        metrics["std"] = round(float(gray.std()), 2)
+        return metrics["std"] >= self.thresholds["uniform"]["min_std"]
+
+    def _exposure(self, image: Image.Image, gray: np.ndarray, metrics: dict) -> bool:
+        t = self.thresholds["exposure"]
+        metrics["mean"] = round(float(gray.mean()), 2)
+        metrics["clipped"] = round(float(((gray <= 5) | (gray >= 250)).mean()), 3)
+        return t["min_mean"] <= metrics["mean"] <= t["max_mean"] and metrics["clipped"] <= t["max_clipped"]
+
+    def _blur(self, image: Image.Image, gray: np.ndarray, metrics: dict) -> bool:
+        metrics["laplacian_var"] = round(laplacian_variance(gray), 2)
+        return metrics["laplacian_var"] >= self.thresholds["blur"]["min_laplacian_var"]
+
+    def _subject(self, image: Image.Image, gray: np.ndarray, metrics: dict) -> bool:
+        metrics["subject_fraction"] = round(subject_fraction(gray), 4)
+        return metrics["subject_fraction"] >= self.thresholds["subject"]["min_fraction"]
+
+    def _flat(self, image: Image.Image, gray: np.ndarray, metrics: dict) -> bool:
+        # photos have sensor noise almost everywhere, screenshots and graphics have large flat areas
+        metrics["flat_fraction"] = round(float((np.diff(gray, axis=1) == 0).mean()), 3)
+        return metrics["flat_fraction"] <= self.thresholds["flat"]["max_fraction"]
+
+    def screen(self, image: Image.Image) -> ScreenResult:
+        """
+        Screens a decoded upload, stopping at the first check that fails.
+
+        Args:
+            image: The image as a Pillow Image object.
+
+        Returns:
+            A ScreenResult with the failed check, if any, and every metric computed.
+        """
+        started = time.perf_counter()
+        gray = grayscale(image)
+        metrics = {}
+        reasons = []
+
+        for name, check in self._checks.items():
+            if name in self.thresholds and not check(image, gray, metrics):
+                reasons.append(name)
+                break
+
+        if not reasons and self.classifier is not None:
+            metrics["cat_score"] = round(self.classifier.score(image), 4)
+            if metrics["cat_score"] < self.min_score:
+                reasons.append("classifier")
+
+        result = ScreenResult(reasons=reasons, metrics=metrics, seconds=time.perf_counter() - started)
+
+        with self._lock:
+            self.screened += 1
+            for reason in reasons:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if reasons:
+            logging.info(f"Pre-screen rejected the upload ({reasons[0]}) in {result.seconds * 1000:.1f} ms "
+                         f"{metrics} {self.stats()}")
+
+        return result
+
+    def stats(self) -> dict:
+        """
+        Returns the screening counters.
+
+        Returns:
+            A dict with screened, rejected per check and the Gemini calls avoided.
+        """
+        with self._lock:
+            rejected = sum(self.rejected.values())
+            return {
+                "screened": self.screened,
+                "passed": self.screened - rejected,
+                "rejected": dict(self.rejected),
+                # each rejection saves at least the cat check
+                "gemini_calls_avoided": rejected,
+            }
+
+
+def load_classifier(model_path: str, classes: list[int] = None) -> Optional[OnnxCatClassifier]:
+    """
+    Loads the optional ONNX classifier, or returns None when it is not configured or cannot be loaded.
+
+    Args:
+        model_path: Path of the .onnx model, empty to disable the classifier.
+        classes: Output indices of the cat classes.
+
+    Returns:
+        An OnnxCatClassifier, or None.
+    """
+    if not model_path:
+        return None
+    try:
+        return OnnxCatClassifier(model_path, classes=classes)
+    except Exception as e:
+        logging.warning(f"Pre-screen classifier disabled, could not load {model_path}: {e}")
+        return None
@@ -0,0 +1,234 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Retries with backoff and hedged requests for Clawdia Monet's agents
+#
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+import httpx
+from google.genai import errors
+
+# HTTP status codes worth another attempt
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Classifies an error from an agent call.
+
+    Args:
+        exc: The exception raised by the call.
+
+    Returns:
+        True for timeouts, dropped connections, 429s and 5xx errors, False otherwise.
+    """
+    if isinstance(exc, errors.APIError):
+        return exc.code in RETRYABLE_CODES or isinstance(exc, errors.ServerError)
+    return isinstance(exc, (TimeoutError, ConnectionError, httpx.TransportError))
+
+
+class Resilience:
+    """
+    Retries agent calls with exponential backoff, full jitter and an overall deadline.
+
+    Agents named in hedge_agents may also be hedged: if the first request has
+    not answered after the agent's observed p95 latency, a second identical
+    request is sent and whichever succeeds first is used.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 0.5,
+                 max_delay: float = 8.0,
+                 deadline: float = 90.0,
+                 hedge_agents: list = (),
+                 hedge_min_delay: float = 1.0,
+                 hedge_min_samples: int = 20,
+                 hedge_workers: int = 16):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge_agents = set(hedge_agents)
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=512))
+        self._counters = defaultdict(lambda: {"calls": 0, "retries": 0, "gave_up": 0, "hedges": 0, "hedge_wins": 0})
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            self._counters[name][counter] += 1
+
+    def _record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies[name].append(seconds)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """
+        Returns how long to wait before hedging an agent's request.
+
+        Args:
+            name: Name of the agent.
+
+        Returns:
+            The observed p95 latency, at least hedge_min_delay, or None until enough calls were seen.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies[name])
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, latencies[int(0.95 * (len(latencies) - 1))])
+
+    def _retry_delay(self, name: str, exc: Exception, attempt: int, deadline: float,
+                     max_attempts: int = None) -> Optional[float]:
+        """Seconds to sleep before the next attempt, or None to give up"""
+        if not is_retryable(exc):
+            return None
+        if attempt >= (max_attempts or self.max_attempts):
+            self._count(name, "gave_up")
+            return None
+        delay = self._backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            self._count(name, "gave_up")
+            return None
+        self._count(name, "retries")
+        logging.warning(f"{name} failed with {type(exc).__name__}, retry {attempt} in {delay:.2f}s: {exc}")
+        return delay
+
+    def _hedged(self, name: str, fn: Callable, delay: float):
+        first = self._executor.submit(fn)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self._count(name, "hedges")
+        second = self._executor.submit(fn)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count(name, "hedge_wins")
+                    # the other request cannot be interrupted, its answer is dropped
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(self, name: str, fn: Callable, hedge: bool = False, max_attempts: int = None):
+        """
+        Calls fn, retrying retryable errors.
+
+        Args:
+            name: Name of the agent, used for hedging and the counters.
+            fn: The call, with no arguments.
+            hedge: Whether this call may be hedged, it is only hedged if name is in hedge_agents.
+            max_attempts: Overrides max_attempts for this call, e.g. 1 when another model can take over.
+
+        Returns:
+            The result of fn.
+        """
+        self._count(name, "calls")
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                if hedge and name in self.hedge_agents and (delay := self.hedge_delay(name)) is not None:
+                    result = self._hedged(name, fn, delay)
+                else:
+                    result = fn()
+            except Exception as e:
+                attempt += 1
+                if (delay := self._retry_delay(name, e, attempt, deadline, max_attempts)) is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._record(name, time.monotonic() - started)
+            return result
+
+    async def _hedged_async(self, name: str, fn: Callable, delay: float):
+        first = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self._count(name, "hedges")
+        second = asyncio.ensure_future(fn())
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count(name, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call_async(self, name: str, fn: Callable, hedge: bool = False, max_attempts: int = None):
+        """
+        Async variant of call, fn returns a new coroutine each time it is called.
+
+        Args:
+            name: Name of the agent, used for hedging and the counters.
+            fn: Coroutine function with no arguments.
+            hedge: Whether this call may be hedged, it is only hedged if name is in hedge_agents.
+            max_attempts: Overrides max_attempts for this call, e.g. 1 when another model can take over.
+
+        Returns:
+            The result of the coroutine.
+        """
+        self._count(name, "calls")
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                if hedge and name in self.hedge_agents and (delay := self.hedge_delay(name)) is not None:
+                    result = await self._hedged_async(name, fn, delay)
+                else:
+                    result = await fn()
+            except Exception as e:
+                attempt += 1
+                if (delay := self._retry_delay(name, e, attempt, deadline, max_attempts)) is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._record(name, time.monotonic() - started)
+            return result
+
+    def stats(self) -> dict:
+        """
+        Returns the retry and hedge counters per agent.
+
+        Returns:
+            A dict keyed by agent name, with the current hedge delay.
+        """
+        with self._lock:
+            names = list(self._counters)
+            counters = {name: dict(self._counters[name]) for name in names}
+        for name in names:
+            counters[name]["hedge_delay"] = self.hedge_delay(name)
+        return counters
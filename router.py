@@ -0,0 +1,202 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Latency-aware model routing with fallback chains for Clawdia Monet's agents
+#
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable
+from google.genai import errors
+from google.genai import types
+from resilience import is_retryable
+
+
+def should_fail_over(exc: BaseException) -> bool:
+    """
+    Tells whether an error from one model is worth trying the next model for.
+
+    Args:
+        exc: The exception raised by the attempt.
+
+    Returns:
+        True for API errors, timeouts and dropped connections, False for anything else.
+    """
+    return isinstance(exc, errors.APIError) or is_retryable(exc)
+
+
+class ModelRouter:
+    """
+    Assigns each agent a primary model and a fallback chain.
+
+    Every attempt's latency and outcome is kept per model for window_seconds.
+    A model whose error rate is above max_error_rate, or whose p95 latency is
+    above the agent's deadline, is moved to the back of the chain until its
+    bad samples age out. Each attempt is given the agent's deadline as its
+    request timeout, and a model that errors or times out fails over to the
+    next one in the chain. All methods are thread-safe.
+    """
+
+    def __init__(self,
+                 routes: dict,
+                 resolve: Callable[[str], str] = None,
+                 window_seconds: float = 300.0,
+                 min_samples: int = 5,
+                 max_error_rate: float = 0.5):
+        self.routes = routes
+        self.resolve = resolve or (lambda name: name)
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=1024))  # model -> (time, seconds, ok)
+        self._failovers = defaultdict(int)
+
+    def chain(self, agent: str) -> list[str]:
+        """
+        Returns the configured models of an agent, primary first.
+
+        Args:
+            agent: Name of the agent.
+
+        Returns:
+            A list of model names.
+        """
+        return [self.resolve(model) for model in self.routes[agent]["models"]]
+
+    def primary(self, agent: str) -> str:
+        """The agent's primary model, which also identifies its requests in the result caches"""
+
+        return self.chain(agent)[0]
+
+    def deadline(self, agent: str):
+        """The agent's per-attempt deadline in seconds, None for no deadline"""
+
+        return self.routes[agent].get("deadline")
+
+    def with_deadline(self, agent: str, config: types.GenerateContentConfig) -> types.GenerateContentConfig:
+        """
+        Copies a request config with the agent's deadline as its HTTP timeout.
+
+        Args:
+            agent: Name of the agent.
+            config: The request's GenerateContentConfig.
+
+        Returns:
+            The config to send.
+        """
+        if (deadline := self.deadline(agent)) is None:
+            return config
+
+        return config.model_copy(update={"http_options": types.HttpOptions(timeout=int(deadline * 1000))})
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._samples[model].append((time.monotonic(), seconds, ok))
+
+    def _health(self, model: str) -> dict:
+        cutoff = time.monotonic() - self.window_seconds
+        samples = [s for s in self._samples[model] if s[0] >= cutoff]
+        latencies = sorted(seconds for _, seconds, ok in samples if ok)
+        return {
+            "samples": len(samples),
+            "error_rate": sum(not ok for _, _, ok in samples) / len(samples) if samples else 0.0,
+            "p50": latencies[int(0.50 * (len(latencies) - 1))] if latencies else 0.0,
+            "p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        }
+
+    def _healthy(self, health: dict, deadline) -> bool:
+        if health["samples"] < self.min_samples:
+            return True
+        if health["error_rate"] > self.max_error_rate:
+            return False
+        return deadline is None or health["p95"] <= deadline
+
+    def order(self, agent: str) -> list[str]:
+        """
+        Returns the agent's models in the order to try them, healthy models first.
+
+        Args:
+            agent: Name of the agent.
+
+        Returns:
+            A list of model names.
+        """
+        chain = self.chain(agent)
+        deadline = self.deadline(agent)
+        with self._lock:
+            healthy = {model: self._healthy(self._health(model), deadline) for model in chain}
+        return [m for m in chain if healthy[m]] + [m for m in chain if not healthy[m]]
+
+    def _failed(self, agent: str, model: str, models: list, i: int, exc: Exception) -> bool:
+        """Counts a failed attempt, True if the next model should be tried"""
+        if i == len(models) - 1 or not should_fail_over(exc):
+            return False
+        with self._lock:
+            self._failovers[agent] += 1
+        logging.warning(f"{agent} failed on {model} with {type(exc).__name__}, failing over to {models[i + 1]}: {exc}")
+        return True
+
+    def call(self, agent: str, attempt: Callable):
+        """
+        Runs an agent's request on its models until one succeeds.
+
+        Args:
+            agent: Name of the agent.
+            attempt: Called with (model, final), final is True for the last model in the chain.
+
+        Returns:
+            The result of the first successful attempt.
+        """
+        models = self.order(agent)
+        for i, model in enumerate(models):
+            started = time.monotonic()
+            try:
+                result = attempt(model, i == len(models) - 1)
+            except Exception as e:
+                self.record(model, time.monotonic() - started, ok=False)
+                if self._failed(agent, model, models, i, e):
+                    continue
+                raise
+            self.record(model, time.monotonic() - started, ok=True)
+            return result
+
+    async def call_async(self, agent: str, attempt: Callable):
+        """
+        Async variant of call, attempt returns a coroutine.
+
+        Args:
+            agent: Name of the agent.
+            attempt: Called with (model, final), final is True for the last model in the chain.
+
+        Returns:
+            The result of the first successful attempt.
+        """
+        models = self.order(agent)
+        for i, model in enumerate(models):
+            started = time.monotonic()
+            try:
+                result = await attempt(model, i == len(models) - 1)
+            except Exception as e:
+                self.record(model, time.monotonic() - started, ok=False)
+                if self._failed(agent, model, models, i, e):
+                    continue
+                raise
+            self.record(model, time.monotonic() - started, ok=True)
+            return result
+
+    def stats(self) -> dict:
+        """
+        Returns the health of every model and the failovers of every agent.
+
+        Returns:
+            A dict with models (samples, error rate, p50/p95 latency) and failovers.
+        """
+        with self._lock:
+            return {
+                "models": {model: self._health(model) for model in list(self._samples)},
+                "failovers": dict(self._failovers),
+            }
@@ -0,0 +1,310 @@
+# Clawdia Monet Artifacts
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Compact session artifact store for Clawdia Monet
+#
+
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+from config import settings
+from imaging import MIME_TYPES
+
+
+class Artifact:
+    """
+    An image kept in the session state as compressed bytes.
+
+    The pixels are only decoded when image() is called, and the bytes
+    themselves may be spilled to disk while the session is idle, then read
+    back on the next access.
+    """
+
+    def __init__(self, store: "ArtifactStore", data: bytes, mime_type: str, size: tuple):
+        self._store = store
+        self._data = data
+        self._lock = threading.Lock()
+        self.mime_type = mime_type
+        self.size = size
+        self.nbytes = len(data)
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.path = None
+        self.last_access = time.monotonic()
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def data(self) -> bytes:
+        """The encoded bytes, read back from disk if they were spilled"""
+        with self._lock:
+            self.last_access = time.monotonic()
+            if self._data is None:
+                with open(self.path, "rb") as f:
+                    self._data = f.read()
+                self._remove_file()
+                self._store.count("restores")
+            return self._data
+
+    def image(self) -> Image.Image:
+        """
+        Decodes the artifact, sharing recently decoded images across sessions.
+
+        Returns:
+            The image as a Pillow Image object, which must not be modified in place.
+        """
+        return self._store.decode(self)
+
+    def spill(self, directory: str) -> int:
+        """
+        Writes the bytes to disk and drops them from memory.
+
+        Args:
+            directory: Where to write the file.
+
+        Returns:
+            The number of bytes freed.
+        """
+        with self._lock:
+            if self._data is None:
+                return 0
+            path = os.path.join(directory, f"{uuid.uuid4().hex}.bin")
+            with open(path, "wb") as f:
+                f.write(self._data)
+            self.path = path
+            self._data = None
+            return self.nbytes
+
+    def _remove_file(self) -> None:
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __del__(self):
+        self._remove_file()
+
+
+class ArtifactStore:
+    """
+    Creates artifacts and decodes them on demand.
+
+    Photos are encoded once, generated images are kept in the bytes the model
+    returned. A small LRU of decoded images is shared by all sessions, so
+    memory for pixels is bounded by decoded_max_entries instead of growing
+    with the number of sessions. When a directory and idle_seconds are set, a
+    background thread spills the bytes of artifacts nobody touched for that
+    long to disk. All methods are thread-safe.
+    """
+
+    def __init__(self,
+                 image_format: str = "WEBP",
+                 quality: int = 90,
+                 decoded_max_entries: int = 8,
+                 directory: str = None,
+                 idle_seconds: float = 0,
+                 sweep_interval: float = 60.0):
+        self.image_format = image_format
+        self.quality = quality
+        self.decoded_max_entries = decoded_max_entries
+        self.directory = directory
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._artifacts = weakref.WeakSet()
+        self._decoded = OrderedDict()  # digest -> Image
+        self._counters = {"decode_hits": 0, "decode_misses": 0, "spills": 0, "restores": 0}
+        self._stop = threading.Event()
+        self._sweeper = None
+
+        if directory and idle_seconds:
+            os.makedirs(directory, exist_ok=True)
+            self._sweeper = threading.Thread(target=self._run, args=(sweep_interval,), name="artifact-sweeper",
+                                             daemon=True)
+            self._sweeper.start()
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _track(self, artifact: Artifact) -> Artifact:
+        with self._lock:
+            self._artifacts.add(artifact)
+        return artifact
+
+    def put_image(self, image: Image.Image) -> Artifact:
+        """
+        Encodes an image into an artifact.
+
+        Args:
+            image: The image as a Pillow Image object.
+
+        Returns:
+            An Artifact.
+        """
+        if self.image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        params = {"quality": self.quality} if self.image_format != "PNG" else {}
+        out = BytesIO()
+        image.save(out, format=self.image_format, **params)
+
+        return self._track(Artifact(self, out.getvalue(), MIME_TYPES[self.image_format], image.size))
+
+    def put_bytes(self, data: bytes, mime_type: str = None) -> Artifact:
+        """
+        Wraps an already encoded image, e.g. the inline data of a model response, without re-encoding it.
+
+        Args:
+            data: The encoded image.
+            mime_type: Its MIME type, read from the image header when missing.
+
+        Returns:
+            An Artifact.
+        """
+        with Image.open(BytesIO(data)) as image:
+            size = image.size
+            mime_type = mime_type or Image.MIME.get(image.format, "application/octet-stream")
+
+        return self._track(Artifact(self, data, mime_type, size))
+
+    def decode(self, artifact: Artifact) -> Image.Image:
+        """
+        Returns the decoded image of an artifact.
+
+        Args:
+            artifact: The Artifact.
+
+        Returns:
+            The image as a Pillow Image object.
+        """
+        with self._lock:
+            if (image := self._decoded.get(artifact.digest)) is not None:
+                self._decoded.move_to_end(artifact.digest)
+                self._counters["decode_hits"] += 1
+                artifact.last_access = time.monotonic()
+                return image
+            self._counters["decode_misses"] += 1
+
+        image = Image.open(BytesIO(artifact.data))
+        image.load()
+
+        with self._lock:
+            self._decoded[artifact.digest] = image
+            while len(self._decoded) > self.decoded_max_entries:
+                self._decoded.popitem(last=False)
+
+        return image
+
+    def sweep(self, idle_seconds: float = None) -> int:
+        """
+        Spills the bytes of idle artifacts to disk.
+
+        Args:
+            idle_seconds: Spill artifacts not accessed for this long, defaults to the store's setting.
+
+        Returns:
+            The number of bytes freed.
+        """
+        if not self.directory:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        idle_seconds = self.idle_seconds if idle_seconds is None else idle_seconds
+        cutoff = time.monotonic() - idle_seconds
+        with self._lock:
+            idle = [a for a in self._artifacts if not a.spilled and a.last_access <= cutoff]
+
+        freed = 0
+        for artifact in idle:
+            try:
+                if spilled := artifact.spill(self.directory):
+                    freed += spilled
+                    self.count("spills")
+            except OSError as e:
+                logging.warning(f"Failed to spill an artifact to {self.directory}: {e}")
+                break
+        if freed:
+            logging.info(f"Spilled {len(idle)} idle artifacts, {freed / 1e6:.1f} MB {self.stats()}")
+
+        return freed
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.sweep()
+
+    def stats(self) -> dict:
+        """
+        Returns the memory held by artifacts and the decode and spill counters.
+
+        Returns:
+            A dict with artifacts, memory_bytes, spilled_bytes, decoded entries and bytes, and the counters.
+        """
+        with self._lock:
+            artifacts = list(self._artifacts)
+            decoded = list(self._decoded.values())
+            counters = dict(self._counters)
+        return {
+            "artifacts": len(artifacts),
+            "memory_bytes": sum(a.nbytes for a in artifacts if not a.spilled),
+            "spilled_bytes": sum(a.nbytes for a in artifacts if a.spilled),
+            "decoded_entries": len(decoded),
+            "decoded_bytes": sum(i.width * i.height * len(i.getbands()) for i in decoded),
+            **counters,
+        }
+
+    def close(self) -> None:
+        """Stops the sweeper and drops the decoded images"""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+        with self._lock:
+            self._decoded.clear()
+
+
+def footprint(values) -> dict:
+    """
+    Measures the artifacts held by one session.
+
+    Args:
+        values: The session state values, lists and dicts are searched too.
+
+    Returns:
+        A dict with the number of artifacts and the bytes they hold in memory and on disk.
+    """
+    seen = {}
+    pending = list(values)
+    while pending:
+        value = pending.pop()
+        if isinstance(value, Artifact):
+            seen[id(value)] = value
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+
+    return {
+        "artifacts": len(seen),
+        "memory_bytes": sum(a.nbytes for a in seen.values() if not a.spilled),
+        "spilled_bytes": sum(a.nbytes for a in seen.values() if a.spilled),
+    }
+
+
+# Create a single artifact store for the process and stop it on shutdown
+artifact_store = ArtifactStore(image_format=settings.ARTIFACT_FORMAT,
+                               quality=settings.ARTIFACT_QUALITY,
+                               decoded_max_entries=settings.ARTIFACT_DECODED_ENTRIES,
+                               directory=settings.ARTIFACT_SPILL_DIR,
+                               idle_seconds=settings.ARTIFACT_SPILL_IDLE_SECONDS)
+atexit.register(artifact_store.close)
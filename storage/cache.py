@@ -0,0 +1,215 @@
+# Clawdia Monet Cache
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Content-addressed result cache for Clawdia Monet agents
+#
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from PIL import Image
+
+
+def image_digest(image: Image.Image) -> str:
+    """
+    Hashes the normalized pixel data of an image.
+
+    The image is converted to RGB so that the same photo produces the same
+    digest regardless of how it was decoded, then the size and raw pixel
+    bytes are hashed.
+
+    Args:
+        image: The image as a Pillow Image object.
+
+    Returns:
+        The hex SHA-256 digest of the normalized image.
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    digest = hashlib.sha256()
+    digest.update(f"{image.width}x{image.height}".encode())
+    digest.update(image.tobytes())
+
+    return digest.hexdigest()
+
+
+def make_key(*parts) -> str:
+    """
+    Builds a cache key from any number of parts.
+
+    Args:
+        *parts: Values that identify a result, e.g. an image digest, model and schema version.
+
+    Returns:
+        The hex SHA-256 digest of the joined parts.
+    """
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a TTL, kept in memory and mirrored to disk.
+
+    Values are strings (e.g. JSON documents). The in-memory tier holds up to
+    max_entries values. When a directory is given every value is also written
+    there, so results survive restarts and are shared by all sessions of the
+    process. The disk tier is bounded by the same number of entries.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl_seconds: int = 86400, directory: str = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory = os.path.join(directory, name) if directory else None
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (created, value)
+        self._disk = OrderedDict()  # key -> mtime, oldest first
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                entries = []
+                for file_name in os.listdir(self.directory):
+                    if file_name.endswith(".json"):
+                        path = os.path.join(self.directory, file_name)
+                        entries.append((os.path.getmtime(path), file_name[:-5]))
+                for mtime, key in sorted(entries):
+                    self._disk[key] = mtime
+            except OSError as e:
+                logging.warning(f"Cache '{name}' disk tier disabled: {e}")
+                self.directory = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, value: str) -> None:
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _drop_from_disk(self, key: str) -> None:
+        self._disk.pop(key, None)
+        if not self.directory:
+            return
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _read_from_disk(self, key: str) -> Optional[tuple]:
+        if not self.directory or key not in self._disk:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            self._drop_from_disk(key)
+            return None
+        if self._expired(record["created"]):
+            self._drop_from_disk(key)
+            return None
+        # refresh recency so the disk tier is also evicted least-recently-used first
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        self._disk.move_to_end(key)
+        return record["created"], record["value"]
+
+    def _write_to_disk(self, key: str, created: float, value: str) -> None:
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": created, "value": value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Cache '{self.name}' could not write to disk: {e}")
+            return
+        self._disk[key] = time.time()
+        self._disk.move_to_end(key)
+        while len(self._disk) > self.max_entries:
+            oldest, _ = self._disk.popitem(last=False)
+            self._drop_from_disk(oldest)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks up a value, first in memory and then on disk.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached value, or None on a miss or if the entry has expired.
+        """
+        with self._lock:
+            if key in self._memory:
+                created, value = self._memory[key]
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+                self._drop_from_disk(key)
+
+            if (record := self._read_from_disk(key)) is not None:
+                created, value = record
+                self._remember(key, created, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Stores a value in memory and on disk.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+            self._write_to_disk(key, created, value)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            A dict with hits, disk_hits, misses, evictions and the size of each tier.
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk),
+            }
@@ -0,0 +1,165 @@
+# Clawdia Monet Clients
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Process-wide Google Cloud client registry for Clawdia Monet
+#
+
+import atexit
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+from config import settings
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+
+class ClientRegistry:
+    """
+    Holds one set of Google Cloud clients for the whole process.
+
+    Credentials are read once, Cloud Storage clients and bucket handles are
+    created once per project and bucket, and Firestore clients once per
+    Firebase app, so every session reuses the same HTTP sessions. The cloud
+    SDKs are imported when their first client is created, not with this
+    module. All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._storage_clients = {}
+        self._buckets = {}
+        self._firestore_clients = {}
+        self._closed = False
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("Client registry is closed")
+
+    def credentials(self):
+        """
+        Loads the service account credentials once.
+
+        Returns:
+            The service account credentials, or None to use application default credentials.
+        """
+        with self._lock:
+            if self._credentials is None and settings.GOOGLE_APPLICATION_CREDENTIALS not in ("Missing"):
+                from google.oauth2 import service_account
+
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    settings.GOOGLE_APPLICATION_CREDENTIALS
+                )
+            return self._credentials
+
+    def storage_client(self, project_id: str = None) -> "storage.Client":
+        """
+        Returns the shared Cloud Storage client for a project.
+
+        Args:
+            project_id: Your Google Cloud project ID.
+
+        Returns:
+            A storage.Client.
+        """
+        with self._lock:
+            self._check_open()
+            if (client := self._storage_clients.get(project_id)) is None:
+                from google.cloud import storage
+
+                client = storage.Client(project=project_id, credentials=self.credentials())
+                self._storage_clients[project_id] = client
+            return client
+
+    def bucket(self, bucket_name: str, project_id: str = None) -> "storage.Bucket":
+        """
+        Returns the shared bucket handle for a bucket.
+
+        Args:
+            bucket_name: The name of your GCS bucket.
+            project_id: Your Google Cloud project ID.
+
+        Returns:
+            A storage.Bucket.
+        """
+        with self._lock:
+            if (bucket := self._buckets.get((project_id, bucket_name))) is None:
+                bucket = self.storage_client(project_id=project_id).bucket(bucket_name)
+                self._buckets[(project_id, bucket_name)] = bucket
+            return bucket
+
+    def firestore_client(self, app):
+        """
+        Returns the shared Firestore client for a Firebase app.
+
+        Args:
+            app: The Firebase admin app.
+
+        Returns:
+            A Firestore client.
+        """
+        with self._lock:
+            self._check_open()
+            if (client := self._firestore_clients.get(app.name)) is None:
+                from firebase_admin import firestore
+
+                client = firestore.client(app=app)
+                self._firestore_clients[app.name] = client
+            return client
+
+    def warm_up(self, bucket_name: str, project_id: str = None, app_factory: Callable = None) -> threading.Thread:
+        """
+        Creates the Cloud Storage and Firestore clients on a background thread.
+
+        Started once the app is serving, so the SDK imports and client setup
+        are done before the first upload or log write needs them.
+
+        Args:
+            bucket_name: The name of your GCS bucket.
+            project_id: Your Google Cloud project ID.
+            app_factory: Returns the Firebase admin app, None skips Firestore.
+
+        Returns:
+            The started thread.
+        """
+        def _warm_up():
+            started = time.perf_counter()
+            try:
+                self.bucket(bucket_name, project_id=project_id)
+                if app_factory is not None:
+                    self.firestore_client(app=app_factory())
+            except Exception as e:
+                logging.warning(f"Failed to warm up the cloud clients, they will be created on first use: {e}")
+            else:
+                logging.info(f"Cloud clients ready in {time.perf_counter() - started:.2f} s")
+
+        thread = threading.Thread(target=_warm_up, name="cloud-warm-up", daemon=True)
+        thread.start()
+
+        return thread
+
+    def close(self) -> None:
+        """Closes every client, safe to call more than once"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            clients = list(self._storage_clients.values()) + list(self._firestore_clients.values())
+            self._storage_clients.clear()
+            self._buckets.clear()
+            self._firestore_clients.clear()
+
+        for client in clients:
+            try:
+                if hasattr(client, "close"):
+                    client.close()
+            except Exception as e:
+                logging.warning(f"Failed to close {type(client).__name__}: {e}")
+
+
+# Create a single registry for the process and close it on shutdown
+registry = ClientRegistry()
+atexit.register(registry.close)
@@ -0,0 +1,259 @@
+# Clawdia Monet Commissions
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Durable commission checkpoints for Clawdia Monet, so a session can resume after a reload
+#
+
+import json
+import logging
+import os
+import secrets
+import shutil
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class Checkpoint:
+    """
+    Output of one finished stage of a commission.
+    """
+
+    def __init__(self, stage: str, data: bytes, metadata: dict, updated: float):
+        self.stage = stage
+        self.data = data
+        self.metadata = metadata
+        self.updated = updated
+
+
+def new_token() -> str:
+    """A URL-safe token that names a commission"""
+
+    return secrets.token_urlsafe(16)
+
+
+class CommissionStore(ABC):
+    """
+    Stores the checkpoints of each commission, keyed by its token.
+
+    Each stage is saved as compact bytes with a metadata dict. Saving a stage
+    replaces its earlier checkpoint. Subclasses implement the storage in the
+    abstract methods, so a backend missing one fails when it is created
+    rather than partway through a commission. They must be safe to call from
+    every session of the process.
+    """
+
+    @abstractmethod
+    def save(self, token: str, stage: str, data: bytes, metadata: dict = None) -> None:
+        """
+        Checkpoints one stage.
+
+        Args:
+            token: Token of the commission.
+            stage: Name of the stage, e.g. "image", "is_cat", "drawing" or "painting".
+            data: The stage's output as bytes.
+            metadata: JSON-serializable details, e.g. the mime type.
+        """
+
+    @abstractmethod
+    def load(self, token: str) -> dict[str, Checkpoint]:
+        """
+        Loads every checkpoint of a commission.
+
+        Args:
+            token: Token of the commission.
+
+        Returns:
+            A dict of stage -> Checkpoint, empty for an unknown or expired token.
+        """
+
+    @abstractmethod
+    def discard(self, token: str, stages: list[str] = None) -> None:
+        """
+        Deletes checkpoints of a commission.
+
+        Args:
+            token: Token of the commission.
+            stages: Stages to delete, None deletes the whole commission.
+        """
+
+    @abstractmethod
+    def sweep(self, max_age_seconds: float) -> int:
+        """
+        Deletes commissions not updated for max_age_seconds.
+
+        Args:
+            max_age_seconds: Age of the newest checkpoint after which a commission is deleted.
+
+        Returns:
+            The number of commissions deleted.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteCommissionStore(CommissionStore):
+    """
+    Commission store in a local SQLite database, one row per stage.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS checkpoints (
+                                token TEXT NOT NULL,
+                                stage TEXT NOT NULL,
+                                data BLOB NOT NULL,
+                                metadata TEXT NOT NULL,
+                                updated REAL NOT NULL,
+                                PRIMARY KEY (token, stage))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS checkpoints_updated ON checkpoints (updated)")
+
+    def save(self, token: str, stage: str, data: bytes, metadata: dict = None) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                             (token, stage, data, json.dumps(metadata or {}), time.time()))
+
+    def load(self, token: str) -> dict[str, Checkpoint]:
+        with self._lock:
+            rows = self._db.execute("SELECT stage, data, metadata, updated FROM checkpoints WHERE token = ?",
+                                    (token,)).fetchall()
+        return {stage: Checkpoint(stage, data, json.loads(metadata), updated)
+                for stage, data, metadata, updated in rows}
+
+    def discard(self, token: str, stages: list[str] = None) -> None:
+        with self._lock:
+            if stages is None:
+                self._db.execute("DELETE FROM checkpoints WHERE token = ?", (token,))
+            else:
+                self._db.executemany("DELETE FROM checkpoints WHERE token = ? AND stage = ?",
+                                     [(token, stage) for stage in stages])
+
+    def sweep(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            stale = self._db.execute("SELECT token FROM checkpoints GROUP BY token HAVING MAX(updated) < ?",
+                                     (cutoff,)).fetchall()
+            self._db.executemany("DELETE FROM checkpoints WHERE token = ?", stale)
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class FileCommissionStore(CommissionStore):
+    """
+    Commission store in a local directory, <token>/<stage>.bin with a <stage>.json beside it.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _dir(self, token: str) -> str:
+        # tokens come from URLs, keep them inside the store
+        if not token or os.path.basename(token) != token or token.startswith("."):
+            raise ValueError(f"Invalid commission token {token!r}")
+        return os.path.join(self.directory, token)
+
+    def save(self, token: str, stage: str, data: bytes, metadata: dict = None) -> None:
+        path = os.path.join(self._dir(token), stage)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write the bytes before the metadata, a stage only counts once its metadata exists
+        for suffix, content in ((".bin", data), (".json", json.dumps(metadata or {}).encode("utf-8"))):
+            tmp = f"{path}{suffix}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path + suffix)
+
+    def load(self, token: str) -> dict[str, Checkpoint]:
+        try:
+            directory = self._dir(token)
+            names = os.listdir(directory)
+        except (ValueError, OSError):
+            return {}
+        checkpoints = {}
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            stage = name[:-len(".json")]
+            try:
+                with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+                with open(os.path.join(directory, stage + ".bin"), "rb") as f:
+                    data = f.read()
+                updated = os.path.getmtime(os.path.join(directory, name))
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping checkpoint {stage} of commission {token}: {e}")
+                continue
+            checkpoints[stage] = Checkpoint(stage, data, metadata, updated)
+        return checkpoints
+
+    def discard(self, token: str, stages: list[str] = None) -> None:
+        try:
+            directory = self._dir(token)
+        except ValueError:
+            return
+        if stages is None:
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+        for stage in stages:
+            for suffix in (".json", ".bin"):
+                try:
+                    os.remove(os.path.join(directory, stage + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def sweep(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for token in os.listdir(self.directory):
+            directory = os.path.join(self.directory, token)
+            try:
+                newest = max((os.path.getmtime(os.path.join(directory, n)) for n in os.listdir(directory)),
+                             default=os.path.getmtime(directory))
+            except OSError:
+                continue
+            if newest < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+# Backends by URL scheme, add an entry to plug in another store
+BACKENDS = {
+    "sqlite": SQLiteCommissionStore,
+    "file": FileCommissionStore,
+}
+
+
+def open_commission_store(url: str) -> Optional[CommissionStore]:
+    """
+    Opens the commission store named by a URL like "sqlite:.cache/commissions.db" or "file:.cache/commissions".
+
+    Args:
+        url: Backend scheme and location, empty to disable checkpoints.
+
+    Returns:
+        A CommissionStore, or None when disabled or the store cannot be opened.
+    """
+    if not url:
+        return None
+    scheme, _, location = url.partition(":")
+    if scheme not in BACKENDS:
+        logging.warning(f"Commission checkpoints disabled, unknown store {scheme!r}, expected one of {list(BACKENDS)}")
+        return None
+    try:
+        return BACKENDS[scheme](location)
+    except Exception as e:
+        logging.warning(f"Commission checkpoints disabled, could not open {url}: {e}")
+        return None
@@ -4,37 +4,52 @@
 # Date: 9/9/2025
 # Description: Firestore database for Clawdia Monet
 #
+import atexit
 import logging
+import threading
 
 import streamlit as st
-import firebase_admin
-from firebase_admin import credentials, firestore
 from datetime import datetime, timezone
 from config import settings
+from storage.clients import registry
+from storage.log_sink import LogSink
+from telemetry import span
 
 # Load environment variables
 FIRESTORE_LOG_COLLECTION = settings.FIRESTORE_LOG_COLLECTION
 
 
-# --- Configure DB ---
-@st.cache_resource(show_spinner=False, ttl=3600)
-def firebase_app(name: str):
-    """Sets up the Firebase admin app"""
+# Serializes Firebase app setup between the script thread and the warm-up thread
+_firebase_lock = threading.Lock()
 
-    try:
-        # Check if the app is already initialized
-        app = firebase_admin.get_app(name=name)
-        return app
-    except ValueError:
-        pass
-    try:
+
+# --- Configure DB ---
+def initialize_firebase_app(name: str):
+    """Initializes the Firebase admin app, or returns it if it already is, importing the SDK on first use"""
+
+    import firebase_admin
+    from firebase_admin import credentials
+
+    with _firebase_lock:
+        try:
+            # Check if the app is already initialized
+            return firebase_admin.get_app(name=name)
+        except ValueError:
+            pass
         if settings.GOOGLE_APPLICATION_CREDENTIALS not in ("Missing"):
             cred = credentials.Certificate(settings.GOOGLE_APPLICATION_CREDENTIALS)
         else:
             cred = credentials.ApplicationDefault()
         # Initialize firebase app
-        app = firebase_admin.initialize_app(credential=cred, name=name)
-        return app
+        return firebase_admin.initialize_app(credential=cred, name=name)
+
+
+@st.cache_resource(show_spinner=False, ttl=3600)
+def firebase_app(name: str):
+    """Sets up the Firebase admin app"""
+
+    try:
+        return initialize_firebase_app(name=name)
     except ValueError as ve:
         logging.error("Value error")
         st.error(f"Value error: {ve}")
@@ -45,21 +60,18 @@ def firebase_app(name: str):
     return st.stop()
 
 
-# Initialize firebase app
-default_app = firebase_app(name='app')
-
-
 # Create a new document in the db
 def create_new_document(collection: str, data: dict) -> None:
     """Creates a new document in a collection in firestore db"""
 
     try:
-        # Initialize db client
-        db = firestore.client(app=default_app)
-        # Create a reference to the Google post.
-        doc_ref = db.collection(collection)
-        # Then get the data at that reference.
-        doc_ref.add(document_data=data)
+        with span("firestore_write", records=1):
+            # Get the shared db client
+            db = registry.firestore_client(app=firebase_app(name='app'))
+            # Create a reference to the Google post.
+            doc_ref = db.collection(collection)
+            # Then get the data at that reference.
+            doc_ref.add(document_data=data)
     except ValueError:
         logging.warning("Value error")
         st.warning("Value error")
@@ -73,17 +85,50 @@ def create_new_document(collection: str, data: dict) -> None:
     return None
 
 
-def submit_log(workflow_status: str):
-    """"Submits user log to firestore db"""
+@st.cache_resource(show_spinner=False)
+def log_sink() -> LogSink:
+    """Sets up the buffered log writer shared by all sessions"""
+
+    # Initialize firebase app on the script thread, where a failure can be shown
+    app = firebase_app(name='app')
+    sink = LogSink(client_factory=lambda: registry.firestore_client(app=app),
+                   batch_size=settings.LOG_BATCH_SIZE,
+                   flush_interval=settings.LOG_FLUSH_SECONDS,
+                   max_pending=settings.LOG_QUEUE_SIZE)
+    # Flush what is left in the buffer when the process shuts down
+    atexit.register(sink.close)
+
+    return sink
+
+
+def write_log(log_data: dict) -> None:
+    """Queues a user log for a batched write to firestore db"""
+
+    log_sink().put(collection=FIRESTORE_LOG_COLLECTION, data=log_data)
+
+    return
+
+
+def build_log(workflow_status: str) -> dict:
+    """Collects the user log for a workflow event, must be called from the script thread"""
 
     log_data = {
         "timestamp": datetime.now(timezone.utc),
         "locale": st.context.locale,
         "timezone": st.context.timezone,
         "artwork_image_url": st.session_state.get("artwork_image_url"),
+        "artwork_urls": st.session_state.get("artwork_urls", {}),
         "workflow_status": workflow_status
     }
 
-    create_new_document(collection=FIRESTORE_LOG_COLLECTION, data=log_data)
+    return log_data
+
+
+def submit_log(workflow_status: str):
+    """"Submits user log to firestore db"""
+
+    log_data = build_log(workflow_status=workflow_status)
+
+    write_log(log_data=log_data)
 
     return
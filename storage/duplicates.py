@@ -0,0 +1,208 @@
+# Clawdia Monet Duplicates
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Perceptual-hash near-duplicate index of commissioned photos for Clawdia Monet
+#
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+
+def dhash(image: Image.Image, size: int = 8) -> str:
+    """
+    Difference hash of an image, stable across re-compression and resizing.
+
+    The image is reduced to a (size + 1) x size grayscale thumbnail and each
+    bit records whether a pixel is brighter than its right-hand neighbour.
+
+    Args:
+        image: The image as a Pillow Image object.
+        size: Bits per row, the hash has size * size bits.
+
+    Returns:
+        The hash as a hex string.
+    """
+    small = image.convert("L").resize((size + 1, size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):0{size * size // 4}x}"
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class MultiIndexHash:
+    """
+    Multi-index hash table for Hamming-distance search over integer hashes.
+
+    The bits are split into max_distance + 1 chunks, each indexed in its own
+    table. Two hashes within max_distance of each other must agree exactly on
+    at least one chunk, so a search only compares the hashes that share a
+    chunk with the query. Not thread-safe on its own.
+    """
+
+    def __init__(self, bits: int = 64, max_distance: int = 8):
+        self.max_distance = max_distance
+        chunks = max_distance + 1
+        self._chunks = [(bits * i // chunks, (1 << (bits * (i + 1) // chunks - bits * i // chunks)) - 1)
+                        for i in range(chunks)]  # (shift, mask)
+        self._tables = [{} for _ in range(chunks)]
+        self._values = set()
+
+    @property
+    def size(self) -> int:
+        return len(self._values)
+
+    def add(self, value: int) -> None:
+        if value in self._values:
+            return
+        self._values.add(value)
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value >> shift) & mask, []).append(value)
+
+    def search(self, value: int) -> list[tuple]:
+        """
+        Finds every hash within max_distance of value.
+
+        Args:
+            value: The query hash.
+
+        Returns:
+            A list of (distance, hash), closest first.
+        """
+        seen = set()
+        found = []
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            for candidate in table.get((value >> shift) & mask, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if (distance := hamming(value, candidate)) <= self.max_distance:
+                    found.append((distance, candidate))
+
+        return sorted(found)
+
+
+class DuplicateIndex:
+    """
+    Links the perceptual hashes of commissioned photos to their finished artwork.
+
+    Records are kept in memory by hash and persisted as an append-only JSON
+    Lines file: each link appends the fields it sets, and loading replays
+    the file, merging the fields per hash. refresh() replays only the lines
+    appended since the last read, so records written by other processes are
+    picked up incrementally. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str = None, max_distance: int = 8):
+        self.path = path
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._table = MultiIndexHash(max_distance=max_distance)
+        self._records = {}  # hash -> dict
+        self._offset = 0
+        self.lookups = 0
+        self.matches = 0
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.refresh()
+
+    def _apply(self, photo_hash: str, fields: dict) -> None:
+        if photo_hash not in self._records:
+            self._records[photo_hash] = {"hash": photo_hash}
+            self._table.add(int(photo_hash, 16))
+        self._records[photo_hash].update(fields)
+
+    def refresh(self) -> int:
+        """
+        Replays records appended to the file since the last read.
+
+        Returns:
+            The number of lines read.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with self._lock:
+            if os.path.getsize(self.path) <= self._offset:
+                return 0
+            read = 0
+            with open(self.path, "r", encoding="utf-8") as f:
+                f.seek(self._offset)
+                while line := f.readline():
+                    # a line still being written by another process is read next time
+                    if not line.endswith("\n"):
+                        break
+                    self._offset += len(line.encode("utf-8"))
+                    try:
+                        entry = json.loads(line)
+                        self._apply(entry.pop("hash"), entry)
+                        read += 1
+                    except (ValueError, KeyError) as e:
+                        logging.warning(f"Skipping a bad line in {self.path}: {e}")
+            return read
+
+    def lookup(self, photo_hash: str) -> Optional[dict]:
+        """
+        Finds the closest earlier photo within max_distance.
+
+        Args:
+            photo_hash: dhash of the new photo.
+
+        Returns:
+            A copy of its record with its distance, or None.
+        """
+        self.refresh()
+        with self._lock:
+            self.lookups += 1
+            found = self._table.search(int(photo_hash, 16))
+            if not found:
+                return None
+            self.matches += 1
+            distance, value = found[0]
+            record = dict(self._records[f"{value:0{len(photo_hash)}x}"])
+
+        record["distance"] = distance
+
+        return record
+
+    def link(self, photo_hash: str, **fields) -> None:
+        """
+        Records fields for a photo, e.g. its sketch_urls or painting_urls and the instructions used.
+
+        Args:
+            photo_hash: dhash of the photo.
+            **fields: JSON-serializable fields to merge into its record.
+        """
+        fields = {k: v for k, v in fields.items() if v is not None}
+        entry = {"hash": photo_hash, "updated": time.time(), **fields}
+        with self._lock:
+            self._apply(photo_hash, dict(fields, updated=entry["updated"]))
+            if self.path:
+                try:
+                    # the offset is left alone, so the next refresh also reads what other processes
+                    # appended before this line, and replaying this line merges the same fields again
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    logging.warning(f"Failed to persist a duplicate index record to {self.path}: {e}")
+
+    def stats(self) -> dict:
+        """
+        Returns the size of the index and the lookup counters.
+
+        Returns:
+            A dict with photos, lookups and matches.
+        """
+        with self._lock:
+            return {"photos": self._table.size, "lookups": self.lookups, "matches": self.matches}
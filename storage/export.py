@@ -0,0 +1,114 @@
+# Clawdia Monet Export
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Multi-resolution artwork export to Google Cloud Storage for Clawdia Monet
+#
+
+import logging
+import threading
+import uuid
+from concurrent.futures import Future
+from PIL import Image
+from imaging import MIME_TYPES, encode_variant
+from storage.gcs import upload_bytes_to_gcs_and_get_url
+from storage.uploads import UploadService
+
+# File extension of each derivative format
+EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+}
+
+
+def encode_and_upload(image: Image.Image, spec: dict, bucket_name: str, destination_blob_name: str,
+                      project_id: str = None) -> str:
+    """
+    Encodes one derivative of an artwork and uploads it.
+
+    Args:
+        image: The artwork as a Pillow Image object.
+        spec: The derivative's size, format and quality.
+        bucket_name: The name of your GCS bucket.
+        destination_blob_name: The desired filename for the derivative in the bucket.
+        project_id: Your Google Cloud project ID.
+
+    Returns:
+        The public URL of the uploaded derivative.
+    """
+    data = encode_variant(image, size=spec.get("size"), image_format=spec["format"], quality=spec.get("quality"))
+
+    return upload_bytes_to_gcs_and_get_url(data=data,
+                                           bucket_name=bucket_name,
+                                           destination_blob_name=destination_blob_name,
+                                           project_id=project_id,
+                                           content_type=MIME_TYPES[spec["format"]])
+
+
+def export_artwork(service: UploadService,
+                   image: Image.Image,
+                   derivatives: dict,
+                   bucket_name: str,
+                   project_id: str = None,
+                   artwork_id: str = None) -> Future:
+    """
+    Encodes and uploads every derivative of an artwork at the same time on the upload service.
+
+    Derivatives are stored as <artwork_id>/<name>.<ext>. A derivative that
+    fails is logged and left out; the export only fails when all of them do.
+
+    Args:
+        service: The upload service to run the derivatives on.
+        image: The artwork as a Pillow Image object.
+        derivatives: Derivative name -> size (None for full size), format and quality.
+        bucket_name: The name of your GCS bucket.
+        project_id: Your Google Cloud project ID.
+        artwork_id: Folder of the derivatives in the bucket, a new UUID by default.
+
+    Returns:
+        A Future that resolves to a dict of derivative name -> public URL.
+    """
+    artwork_id = artwork_id or str(uuid.uuid4())
+    export = Future()
+    urls = {}
+    remaining = [len(derivatives)]
+    lock = threading.Lock()
+
+    def _done(name: str, future: Future) -> None:
+        try:
+            url = future.result()
+        except Exception as e:
+            url = None
+            logging.error(f"Failed to export the {name} derivative of artwork {artwork_id}: {e}")
+        with lock:
+            if url is not None:
+                urls[name] = url
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        if urls:
+            export.set_result(dict(urls))
+        else:
+            export.set_exception(Exception(f"Failed to export every derivative of artwork {artwork_id}"))
+
+    if not derivatives:
+        export.set_result({})
+        return export
+
+    for name, spec in derivatives.items():
+        try:
+            future = service.submit(upload=encode_and_upload,
+                                    image=image,
+                                    spec=spec,
+                                    bucket_name=bucket_name,
+                                    destination_blob_name=f"{artwork_id}/{name}.{EXTENSIONS[spec['format']]}",
+                                    project_id=project_id)
+        except Exception as e:
+            failed = Future()
+            failed.set_exception(e)
+            _done(name, failed)
+            continue
+        future.add_done_callback(lambda _future, _name=name: _done(_name, _future))
+
+    return export
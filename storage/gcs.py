@@ -9,9 +9,8 @@
 
 
 import io
-from google.cloud import storage
-from google.cloud.exceptions import GoogleCloudError
-from config import settings
+from storage.clients import registry
+from telemetry import span
 from PIL import Image
 import logging
 
@@ -51,28 +50,57 @@ def upload_pil_image_to_gcs_and_get_url(
         logging.error(f"Error converting PIL Image to in-memory file: {e}")
         raise Exception(f"Error converting PIL Image to in-memory file: {e}")
 
+    return upload_bytes_to_gcs_and_get_url(data=in_mem_file.getvalue(),
+                                           bucket_name=bucket_name,
+                                           destination_blob_name=destination_blob_name,
+                                           project_id=project_id,
+                                           content_type=content_type)
+
+
+def upload_bytes_to_gcs_and_get_url(
+        data: bytes,
+        bucket_name: str,
+        destination_blob_name: str,
+        project_id: str = None,
+        content_type: str = 'image/png'
+) -> str:
+    """
+    Uploads already encoded image bytes to a Google Cloud Storage bucket
+    and makes them publicly accessible.
+
+    Args:
+        data: The encoded image.
+        bucket_name: The name of your GCS bucket.
+        destination_blob_name: The desired filename for the image in the bucket.
+        project_id: Your Google Cloud project ID.
+        content_type: The content type of the image for the GCS blob.
+
+    Returns:
+        The public URL of the uploaded image.
+
+    Raises:
+        StorageError: If there is an error during the upload process.
+    """
+    # imported here, the SDK loads with the first client instead of the app
+    from google.cloud.exceptions import GoogleCloudError
+
+    in_mem_file = io.BytesIO(data)
+
     try:
-        # --- 2. Initialize the Google Cloud Storage Client ---
-        if settings.GOOGLE_APPLICATION_CREDENTIALS not in ("Missing"):
-            storage_client = storage.Client.from_service_account_json(
-                project=project_id,
-                json_credentials_path=settings.GOOGLE_APPLICATION_CREDENTIALS
-            )
-        else:
-            storage_client = storage.Client(project=project_id)
-
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(destination_blob_name)
-
-        # --- 3. Upload the in-memory file to GCS ---
-        # print(f"Uploading {destination_blob_name} to bucket {bucket_name}...")
-        blob.upload_from_file(in_mem_file, content_type=content_type)
-        # print("Upload complete.")
-
-        # --- 4. Make the blob publicly accessible ---
-        # print("Making blob public...")
-        blob.make_public()
-        # print("Blob is now public.")
+        with span("gcs_upload", bytes=len(data), content_type=content_type):
+            # --- 2. Get the shared bucket handle from the client registry ---
+            bucket = registry.bucket(bucket_name, project_id=project_id)
+            blob = bucket.blob(destination_blob_name)
+
+            # --- 3. Upload the in-memory file to GCS ---
+            # print(f"Uploading {destination_blob_name} to bucket {bucket_name}...")
+            blob.upload_from_file(in_mem_file, content_type=content_type)
+            # print("Upload complete.")
+
+            # --- 4. Make the blob publicly accessible ---
+            # print("Making blob public...")
+            blob.make_public()
+            # print("Blob is now public.")
 
         # --- 5. Return the public URL ---
         return blob.public_url
@@ -0,0 +1,174 @@
+# Clawdia Monet Log Sink
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Buffered, batched Firestore log writer for Clawdia Monet
+#
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable
+from telemetry import span
+
+# Firestore allows at most 500 writes in one batch
+MAX_BATCH_SIZE = 500
+
+_STOP = object()
+
+
+class LogSink:
+    """
+    Collects log documents from every session and writes them to Firestore in batches.
+
+    A background thread flushes a batch when it reaches batch_size records,
+    when flush_interval seconds have passed since its first record, and when
+    the sink is closed. The buffer holds at most max_pending records; put
+    blocks for up to put_timeout seconds when it is full and then drops the
+    record.
+    """
+
+    def __init__(self,
+                 client_factory: Callable,
+                 batch_size: int = 50,
+                 flush_interval: float = 2.0,
+                 max_pending: int = 1000,
+                 put_timeout: float = 0.5):
+        self._client_factory = client_factory
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.flushes_by_size = 0
+        self.flushes_by_time = 0
+        self.flushes_at_shutdown = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="firestore-log-sink", daemon=True)
+        self._thread.start()
+
+    def put(self, collection: str, data: dict) -> bool:
+        """
+        Queues a log document.
+
+        Args:
+            collection: The Firestore collection to write to.
+            data: The log document.
+
+        Returns:
+            True if the record was queued, False if it was dropped.
+        """
+        if not self._closed:
+            try:
+                self._queue.put((collection, data), timeout=self.put_timeout)
+                return True
+            except queue.Full:
+                pass
+
+        with self._lock:
+            self.dropped += 1
+        logging.warning("Log sink is full or closed, dropped a log record.")
+
+        return False
+
+    def _write(self, records: list) -> None:
+        try:
+            with span("firestore_write", records=len(records)):
+                db = self._client_factory()
+                batch = db.batch()
+                for collection, data in records:
+                    batch.set(db.collection(collection).document(), data)
+                batch.commit()
+        except Exception as e:
+            logging.error(f"Failed to write {len(records)} log records to firestore: {e}")
+            with self._lock:
+                self.failed += len(records)
+        else:
+            with self._lock:
+                self.written += len(records)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            records = []
+            deadline = time.monotonic() + self.flush_interval
+            reason = "time"
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    reason = "shutdown"
+                    break
+                records.append(item)
+                if len(records) >= self.batch_size:
+                    reason = "size"
+                    break
+                if (remaining := deadline - time.monotonic()) <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if records:
+                self._write(records)
+                with self._lock:
+                    if reason == "size":
+                        self.flushes_by_size += 1
+                    elif reason == "time":
+                        self.flushes_by_time += 1
+                    else:
+                        self.flushes_at_shutdown += 1
+
+        # write anything that was queued after the stop marker
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        for i in range(0, len(leftovers), self.batch_size):
+            self._write(leftovers[i:i + self.batch_size])
+            with self._lock:
+                self.flushes_at_shutdown += 1
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flushes the buffer and stops the background thread, safe to call more than once"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        logging.info(f"Log sink closed {self.stats()}")
+
+    def stats(self) -> dict:
+        """
+        Returns the sink counters.
+
+        Returns:
+            A dict with the buffer depth, flush counts and written, failed and dropped record counts.
+        """
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "flushes_by_size": self.flushes_by_size,
+                "flushes_by_time": self.flushes_by_time,
+                "flushes_at_shutdown": self.flushes_at_shutdown,
+                "written": self.written,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
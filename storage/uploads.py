@@ -0,0 +1,107 @@
+# Clawdia Monet Uploads
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Background upload service for Clawdia Monet artwork
+#
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+from storage.gcs import upload_pil_image_to_gcs_and_get_url
+
+
+class UploadService:
+    """
+    Uploads artwork to Google Cloud Storage on a bounded thread pool.
+
+    At most max_pending uploads may be queued or running at once, so a burst
+    of uploads cannot grow memory without bound. When the queue is full,
+    submit waits up to submit_timeout seconds for a slot and then rejects the
+    upload, so the script thread is never held up for long.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32, submit_timeout: float = 0.5):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gcs-upload")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=256)
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, timeout: float = None, upload: Callable = upload_pil_image_to_gcs_and_get_url, **kwargs) -> Future:
+        """
+        Queues an upload, waiting at most the timeout for a slot when the queue is full.
+
+        Args:
+            timeout: Seconds to wait for a free slot when the queue is full, None uses submit_timeout.
+            upload: The upload function, upload_pil_image_to_gcs_and_get_url by default.
+            **kwargs: Arguments for the upload function.
+
+        Returns:
+            A Future that resolves to the public URL of the uploaded image.
+
+        Raises:
+            TimeoutError: If no slot frees up before the timeout.
+        """
+        if not self._slots.acquire(timeout=self.submit_timeout if timeout is None else timeout):
+            with self._lock:
+                self.rejected += 1
+            logging.warning("Upload queue is full, rejected an upload.")
+            raise TimeoutError("Upload queue is full")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+
+        def _done(future: Future) -> None:
+            with self._lock:
+                self.pending -= 1
+                self._latencies.append(time.perf_counter() - submitted)
+                if future.exception() is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            self._slots.release()
+            logging.info(f"Upload finished {self.stats()}")
+
+        try:
+            future = self._executor.submit(upload, **kwargs)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(_done)
+
+        return future
+
+    def stats(self) -> dict:
+        """
+        Returns the queue depth and upload latency.
+
+        Returns:
+            A dict with the queue depth, counters and latency (seconds from submit to finish).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "depth": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops accepting uploads and optionally waits for queued ones to finish"""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,188 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Streaming responses from the Gemini agents for Clawdia Monet
+#
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterable, Callable, Iterable, Optional
+from google.genai import types
+
+
+class StreamMetrics:
+    """
+    Time-to-first-chunk and total time of streamed agent calls, per agent.
+    """
+
+    def __init__(self, window: int = 256):
+        self._lock = threading.Lock()
+        self._first_chunk = defaultdict(lambda: deque(maxlen=window))
+        self._total = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, agent: str, first_chunk: Optional[float], total: float) -> None:
+        """
+        Records the timings of one streamed call.
+
+        Args:
+            agent: Name of the agent.
+            first_chunk: Seconds until the first chunk arrived, None if no chunk arrived.
+            total: Seconds until the stream finished.
+        """
+        with self._lock:
+            if first_chunk is not None:
+                self._first_chunk[agent].append(first_chunk)
+            self._total[agent].append(total)
+
+    def stats(self) -> dict:
+        """
+        Returns the p50 and p95 timings per agent.
+
+        Returns:
+            A dict keyed by agent name.
+        """
+
+        def _pct(values: list, q: float) -> float:
+            return values[int(q * (len(values) - 1))] if values else 0.0
+
+        with self._lock:
+            out = {}
+            for agent, totals in self._total.items():
+                first = sorted(self._first_chunk[agent])
+                totals = sorted(totals)
+                out[agent] = {
+                    "count": len(totals),
+                    "first_chunk_p50": _pct(first, 0.50),
+                    "first_chunk_p95": _pct(first, 0.95),
+                    "total_p50": _pct(totals, 0.50),
+                    "total_p95": _pct(totals, 0.95),
+                }
+            return out
+
+
+class _StreamCollector:
+    """
+    Accumulates the chunks of one streamed response.
+    """
+
+    def __init__(self, agent: str, metrics: StreamMetrics = None, on_text: Callable[[str], None] = None,
+                 started: float = None):
+        self.agent = agent
+        self.metrics = metrics
+        self.on_text = on_text
+        self.started = started or time.perf_counter()
+        self.first_chunk = None
+        self.parts = []
+        self.text = ""
+        self.usage_metadata = None
+
+    def add(self, chunk: types.GenerateContentResponse) -> None:
+        if self.first_chunk is None:
+            self.first_chunk = time.perf_counter() - self.started
+        self.usage_metadata = chunk.usage_metadata or self.usage_metadata
+        if not chunk.candidates or not chunk.candidates[0].content or not chunk.candidates[0].content.parts:
+            return
+        for part in chunk.candidates[0].content.parts:
+            if part.text is not None:
+                self.text += part.text
+                if self.parts and self.parts[-1].text is not None:
+                    self.parts[-1] = types.Part(text=self.parts[-1].text + part.text)
+                else:
+                    self.parts.append(types.Part(text=part.text))
+                if self.on_text is not None:
+                    self.on_text(self.text)
+            else:
+                self.parts.append(part)
+
+    def finish(self) -> types.GenerateContentResponse:
+        total = time.perf_counter() - self.started
+        if self.metrics is not None:
+            self.metrics.record(agent=self.agent, first_chunk=self.first_chunk, total=total)
+        logging.info(f"Streamed {self.agent}: first chunk {self.first_chunk}s, total {total:.2f}s")
+
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=self.parts))],
+            usage_metadata=self.usage_metadata
+        )
+
+
+def collect_stream(chunks: Iterable[types.GenerateContentResponse],
+                   agent: str,
+                   metrics: StreamMetrics = None,
+                   on_text: Callable[[str], None] = None,
+                   started: float = None) -> types.GenerateContentResponse:
+    """
+    Consumes a response stream, handing text on as it arrives.
+
+    Args:
+        chunks: The stream from generate_content_stream or send_message_stream.
+        agent: Name of the agent, used for the metrics.
+        metrics: Where to record time-to-first-chunk and total time.
+        on_text: Called with all text received so far each time new text arrives.
+        started: perf_counter value when the request was sent, defaults to now.
+
+    Returns:
+        A single response with the parts of every chunk, adjacent text parts merged.
+    """
+    collector = _StreamCollector(agent=agent, metrics=metrics, on_text=on_text, started=started)
+    for chunk in chunks:
+        collector.add(chunk)
+
+    return collector.finish()
+
+
+async def collect_stream_async(chunks: AsyncIterable[types.GenerateContentResponse],
+                               agent: str,
+                               metrics: StreamMetrics = None,
+                               on_text: Callable[[str], None] = None,
+                               started: float = None) -> types.GenerateContentResponse:
+    """
+    Async variant of collect_stream for the client's asyncio API.
+
+    Args:
+        chunks: The async stream from generate_content_stream or send_message_stream.
+        agent: Name of the agent, used for the metrics.
+        metrics: Where to record time-to-first-chunk and total time.
+        on_text: Called with all text received so far each time new text arrives.
+        started: perf_counter value when the request was sent, defaults to now.
+
+    Returns:
+        A single response with the parts of every chunk, adjacent text parts merged.
+    """
+    collector = _StreamCollector(agent=agent, metrics=metrics, on_text=on_text, started=started)
+    async for chunk in chunks:
+        collector.add(chunk)
+
+    return collector.finish()
+
+
+# An escape cut off at the end of the text: a lone backslash, a partial \uXXXX, or a
+# high surrogate still waiting for its low half. Backslashes before it must pair up.
+_PARTIAL_ESCAPE = re.compile(r'(?<!\\)((?:\\\\)*)\\(?:u[dD][89abAB][0-9a-fA-F]{2}(?:\\(?:u[0-9a-fA-F]{0,3})?)?'
+                             r'|u[0-9a-fA-F]{0,3})?$')
+
+
+def partial_json_string(text: str, field: str) -> Optional[str]:
+    """
+    Reads a string field out of a JSON document that may still be incomplete.
+
+    Args:
+        text: JSON received so far.
+        field: Name of the string field.
+
+    Returns:
+        The value received so far, or None if the field has not started yet.
+    """
+    # drop an escape that is still arriving so the value can be decoded
+    text = _PARTIAL_ESCAPE.sub(r"\1", text)
+    if not (match := re.search(rf'"{re.escape(field)}"\s*:\s*"((?:[^"\\]|\\.)*)', text)):
+        return None
+    try:
+        return json.loads(f'"{match.group(1)}"')
+    except ValueError:
+        return match.group(1)
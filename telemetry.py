@@ -0,0 +1,193 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Per-stage timing spans and a Prometheus-style metrics endpoint for Clawdia Monet
+#
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Upper bounds of the latency histogram buckets in seconds
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class Span:
+    """
+    Times one stage, from upload decode to the Firestore write.
+
+    Use it as a context manager. Fields set on the span, such as the model
+    and token counts, are logged as structured fields when it ends, and its
+    duration goes into the stage's histogram. A span that ends with an
+    exception has status "error".
+    """
+
+    def __init__(self, telemetry: "Telemetry", stage: str, fields: dict):
+        self.telemetry = telemetry
+        self.stage = stage
+        self.fields = fields
+        self.status = "ok"
+        self.seconds = None
+
+    def set(self, **fields) -> None:
+        self.fields.update(fields)
+
+    def usage(self, response) -> None:
+        """
+        Adds the token counts of a Gemini response to the span.
+
+        Args:
+            response: A GenerateContentResponse, or None.
+        """
+        if response is None or (usage := response.usage_metadata) is None:
+            return
+        self.set(prompt_tokens=usage.prompt_token_count or 0,
+                 output_tokens=usage.candidates_token_count or 0,
+                 total_tokens=usage.total_token_count or 0)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.status = "error"
+            self.fields.setdefault("error", exc_type.__name__)
+        self.telemetry.record(self)
+        return False
+
+
+class Telemetry:
+    """
+    Process-wide latency histograms and token counters, fed by spans.
+    """
+
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}  # (stage, status) -> [bucket counts..., count, sum]
+        self._tokens = {}  # (stage, model, kind) -> tokens
+
+    def span(self, stage: str, **fields) -> Span:
+        """
+        Starts timing a stage.
+
+        Args:
+            stage: Name of the stage, e.g. "decode", "cat_check" or "gcs_upload".
+            **fields: Structured fields for the log, e.g. model.
+
+        Returns:
+            A Span, to be used as a context manager.
+        """
+        return Span(self, stage, dict(fields))
+
+    def record(self, span: Span) -> None:
+        """Adds a finished span to the metrics and logs it with its structured fields"""
+
+        with self._lock:
+            histogram = self._histograms.setdefault((span.stage, span.status), [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if span.seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += span.seconds
+            if (model := span.fields.get("model")) is not None:
+                for kind in ("prompt", "output"):
+                    key = (span.stage, model, kind)
+                    self._tokens[key] = self._tokens.get(key, 0) + span.fields.get(f"{kind}_tokens", 0)
+
+        fields = {"span": span.stage, "status": span.status, "duration_ms": round(span.seconds * 1000, 1),
+                  **span.fields}
+        details = " ".join(f"{k}={v}" for k, v in span.fields.items())
+        logging.info(f"{span.stage} {span.status} in {span.seconds:.3f}s {details}".rstrip(),
+                     extra={"json_fields": fields})
+
+    def render(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics page.
+        """
+        with self._lock:
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+            tokens = dict(self._tokens)
+
+        lines = ["# HELP clawdia_stage_seconds Duration of each stage of a commission.",
+                 "# TYPE clawdia_stage_seconds histogram"]
+        for (stage, status), histogram in sorted(histograms.items()):
+            labels = f'stage="{stage}",status="{status}"'
+            for bound, count in zip(self.buckets, histogram):
+                lines.append(f'clawdia_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'clawdia_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram[-2]}')
+            lines.append(f"clawdia_stage_seconds_count{{{labels}}} {histogram[-2]}")
+            lines.append(f"clawdia_stage_seconds_sum{{{labels}}} {histogram[-1]:.6f}")
+
+        lines += ["# HELP clawdia_tokens_total Gemini tokens used, by stage, model and kind.",
+                  "# TYPE clawdia_tokens_total counter"]
+        for (stage, model, kind), count in sorted(tokens.items()):
+            lines.append(f'clawdia_tokens_total{{stage="{stage}",model="{model}",kind="{kind}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+        """
+        Serves the metrics at /metrics on a background thread.
+
+        Args:
+            port: Port to listen on.
+            host: Address to bind.
+
+        Returns:
+            The server, or None if the port could not be bound.
+        """
+        telemetry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return None
+
+        try:
+            server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as e:
+            logging.warning(f"Metrics endpoint not started on port {port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+        return server
+
+
+# Create a single telemetry registry for the process
+telemetry = Telemetry()
+
+
+def span(stage: str, **fields) -> Span:
+    """
+    Starts timing a stage on the process-wide telemetry.
+
+    Args:
+        stage: Name of the stage.
+        **fields: Structured fields for the log.
+
+    Returns:
+        A Span, to be used as a context manager.
+    """
+    return telemetry.span(stage, **fields)
@@ -0,0 +1,38 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Shared fixtures for the tests
+#
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def app_settings(tmp_path, monkeypatch):
+    """
+    Points the app's caches and stores at a temporary directory and its cloud clients at local stand-ins.
+
+    Yields:
+        The settings object, changes are undone after the test.
+    """
+    import streamlit as st
+    from benchmarks import fake_cloud
+    from config import settings
+
+    # app.py opens its assets relative to the working directory
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "COMMISSION_STORE", f"sqlite:{tmp_path / 'commissions.db'}")
+    monkeypatch.setattr(settings, "DUPLICATE_INDEX_PATH", str(tmp_path / "duplicates.jsonl"))
+    fake_cloud.install()
+    # shared resources are created once per process, start each test with fresh ones
+    st.cache_resource.clear()
+    yield settings
+    st.cache_resource.clear()
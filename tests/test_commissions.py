@@ -0,0 +1,114 @@
+# Clawdia Monet
+#
+# Author: Peter Jakubowski
+# Date: 10/16/2026
+# Description: Tests of the commission checkpoints and resuming a commission from the page url
+#
+
+import os
+
+import pytest
+from PIL import Image
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fake_gemini import CHECK, IMAGE, TEXT, FakeBackend, FakeClient, Latency
+from storage.artifacts import artifact_store
+from storage.commissions import (CommissionStore, FileCommissionStore, SQLiteCommissionStore, new_token,
+                                 open_commission_store)
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def store(request, tmp_path):
+    store = open_commission_store(f"{request.param}:{tmp_path / 'commissions'}")
+    yield store
+    store.close()
+
+
+def test_open_commission_store(tmp_path):
+    assert isinstance(open_commission_store(f"sqlite:{tmp_path / 'c.db'}"), SQLiteCommissionStore)
+    assert isinstance(open_commission_store(f"file:{tmp_path / 'c'}"), FileCommissionStore)
+    assert open_commission_store("") is None
+    assert open_commission_store("redis://localhost") is None
+
+
+def test_incomplete_backend_cannot_be_created():
+    class WriteOnlyStore(CommissionStore):
+        def save(self, token, stage, data, metadata=None):
+            pass
+
+    with pytest.raises(TypeError):
+        WriteOnlyStore()
+
+
+def test_save_load_discard(store):
+    store.save("abc", "image", b"\x89PNG", {"mime_type": "image/png"})
+    store.save("abc", "is_cat", b'{"is_cat": true}')
+    store.save("abc", "image", b"\xff\xd8", {"mime_type": "image/jpeg"})
+
+    checkpoints = store.load("abc")
+    assert set(checkpoints) == {"image", "is_cat"}
+    assert checkpoints["image"].data == b"\xff\xd8"
+    assert checkpoints["image"].metadata == {"mime_type": "image/jpeg"}
+    assert checkpoints["is_cat"].metadata == {}
+
+    store.discard("abc", ["is_cat"])
+    assert set(store.load("abc")) == {"image"}
+    store.discard("abc")
+    assert store.load("abc") == {}
+    assert store.load("unknown") == {}
+
+
+def test_sweep(store):
+    store.save("old", "image", b"1")
+    store.save("new", "image", b"2")
+    assert store.sweep(max_age_seconds=3600) == 0
+    assert store.sweep(max_age_seconds=-1) == 2
+    assert store.load("new") == {}
+
+
+def _session(client: FakeClient) -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["client"] = client
+    at.session_state["locale"] = "us"
+    return at
+
+
+def test_checkpoint_and_resume(app_settings, monkeypatch):
+    monkeypatch.setattr(app_settings, "PRESCREEN", False)
+    monkeypatch.setattr(app_settings, "DUPLICATES", False)
+    instant = Latency(0)
+    client = FakeClient(FakeBackend(latency={CHECK: instant, TEXT: instant, IMAGE: instant}, seed=0))
+    gradient = Image.linear_gradient("L")
+    image = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_90), gradient))
+
+    # AppTest cannot upload a file, so checkpoint the photo as the upload would
+    store = open_commission_store(app_settings.COMMISSION_STORE)
+    photo = artifact_store.put_image(image)
+    token = new_token()
+    store.save(token, "image", photo.data, {"mime_type": photo.mime_type})
+
+    # the first session checks the photo and sketches it, checkpointing each stage
+    at = _session(client)
+    at.session_state["commission"] = token
+    at.session_state["image"] = photo
+    at.run()
+    assert not at.exception
+    assert "drawing" in at.session_state
+
+    checkpoints = store.load(token)
+    assert set(checkpoints) == {"image", "is_cat", "drawing"}
+    assert checkpoints["drawing"].data == at.session_state["drawing"].data
+
+    # a reloaded page starts a new session with only the url
+    resumed = _session(client)
+    resumed.query_params["commission"] = token
+    resumed.run()
+    assert not resumed.exception
+    assert resumed.session_state["commission"] == token
+    assert resumed.session_state["image"].digest == photo.digest
+    assert resumed.session_state["drawing"].digest == at.session_state["drawing"].digest
+    assert resumed.session_state["is_cat"].is_cat
+    # the resumed sketch is shown again instead of being drawn again
+    assert any(b.label == "Start Painting" for b in resumed.button)